@@ -1,10 +1,33 @@
 from django.contrib import admin
+from django.db import transaction
 from .models import AnalyzedString
+from .signals import strings_deleted
 # Register your models here.
 
 @admin.register(AnalyzedString)
 class AnalyzedStringAdmin(admin.ModelAdmin):
+    """Browse and delete strings.
+
+    Adding and editing go through the API only: a string's analysis, character
+    index, body, stat counters and cache entries are all written together there.
+    Deletes announce strings_deleted like the API's.
+    """
     list_display = ('id', 'value', 'length', 'is_palindrome', 'unique_characters', 'word_count', 'created_at')
     search_fields = ('value',)
     list_filter = ('is_palindrome',)
-    readonly_fields = ('created_at',)
\ No newline at end of file
+    readonly_fields = ('created_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, AnalyzedString.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            strings = list(queryset)
+            queryset.delete()
+            strings_deleted.send(sender=AnalyzedString, ids=[s.pk for s in strings], strings=strings)
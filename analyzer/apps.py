@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class AnalyzerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "analyzer"
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+        from . import bloom, cache, metrics, signals, stats
+
+        signals.strings_created.connect(cache.invalidate_strings, dispatch_uid='analyzer-cache-created')
+        signals.strings_deleted.connect(cache.forget_strings, dispatch_uid='analyzer-cache-deleted')
+        signals.strings_created.connect(stats.count_created, dispatch_uid='analyzer-stats-created')
+        signals.strings_deleted.connect(stats.count_deleted, dispatch_uid='analyzer-stats-deleted')
+        signals.strings_created.connect(bloom.add_created, dispatch_uid='analyzer-bloom-created')
+        signals.strings_deleted.connect(bloom.count_deleted, dispatch_uid='analyzer-bloom-deleted')
+        if settings.ANALYZER_METRICS_ENABLED:
+            connection_created.connect(metrics.install_db_wrapper, dispatch_uid='analyzer-metrics-db')
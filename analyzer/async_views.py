@@ -0,0 +1,208 @@
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import classonlymethod
+from django.views import View
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from .conditional import add_validators, list_cache_control, list_etag, not_modified
+from .conditional import string_cache_control, string_etag
+from .ingest import build_bodies, build_character_rows, build_instance
+from .models import AnalyzedString, StringBody, StringCharacter
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer
+from .serializers import RECORD_PARAMS, instance_record, page_data, parse_fields, parse_layout, record_columns
+from .signals import strings_created, strings_deleted
+from .utils import hash_string, parse_natural_language_query, NaturalLanguageParseError, NaturalLanguageConflictError
+from .views import apply_parsed_filters, filter_strings, StringFilterMixin
+from . import bloom, metrics, parallel
+from . import cache as analyzer_cache
+
+# Async counterparts of the list/create, retrieve/destroy and NL-filter views,
+# routed instead of the DRF views when ANALYZER_ASYNC_VIEWS is on. They return
+# the same payloads, error codes, response cache entries and ETags.
+
+
+_renderer = FastJSONRenderer()
+
+# cache backends may do network I/O: keep it off the event loop
+get_cached = sync_to_async(analyzer_cache.get_cached)
+set_cached = sync_to_async(analyzer_cache.set_cached)
+response_key = sync_to_async(analyzer_cache.response_key)
+
+
+def api_response(data, status=200, headers=None):
+    # the same bytes the DRF views render
+    return HttpResponse(_renderer.render(data), status=status, content_type='application/json', headers=headers)
+
+
+def request_data(request):
+    # request.data as the DRF views see it: the same parsers (JSON, form, multipart)
+    # and the same errors, which the caller renders as DRF's exception handler would
+    parsers = [parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]
+    return Request(request, parsers=parsers).data
+
+
+@sync_to_async
+def store(analysis):
+    # transaction.atomic() has no async form; run the same write as the
+    # serializer's create() (and below, perform_destroy()) on the connection's thread
+    instance = build_instance(analysis)
+    with transaction.atomic():
+        instance.save(force_insert=True)
+        StringBody.objects.bulk_create(build_bodies([instance]))
+        StringCharacter.objects.bulk_create(build_character_rows(analysis))
+        strings_created.send(sender=AnalyzedString, ids=[instance.id], strings=[instance])
+    return instance
+
+
+@sync_to_async
+def remove(instance):
+    sha256 = instance.pk
+    with transaction.atomic():
+        instance.delete()
+        strings_deleted.send(sender=AnalyzedString, ids=[sha256], strings=[instance])
+
+
+class AsyncAPIView(View):
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # JSON API with no sessions or forms, same as the DRF views
+        view.csrf_exempt = True
+        return view
+
+    def page_query(self, request, qs):
+        """The page's lazy queryset and paginator; raises ValidationError for bad params, before any query."""
+        fields = parse_fields(request.GET)
+        layout = parse_layout(request.GET)
+        paginator = KeysetPagination()
+        page_qs = paginator.page_queryset(qs.values(*record_columns(fields)), request)
+        return page_qs, fields, layout, paginator
+
+    async def cached_page(self, request, kind, page_query, **extra):
+        """A list/NL page through the response cache and ETags, as the DRF views serve it."""
+        page_qs, fields, layout, paginator = page_query
+        key = await response_key(kind, request)
+        etag = list_etag(key)
+        response = not_modified(request, etag, **list_cache_control())
+        if response is not None:
+            return response
+        cached = await get_cached(kind, key)
+        if cached is not None:
+            return add_validators(api_response(cached, headers={'X-Cache': 'HIT'}), etag, **list_cache_control())
+
+        rows = paginator.finish_page([row async for row in page_qs])
+        with metrics.serialize_timer():
+            data = page_data(rows, fields, layout)
+        payload = {
+            'data': data,
+            'count': len(rows),
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            **extra,
+        }
+        await set_cached(key, payload)
+        return add_validators(api_response(payload, headers={'X-Cache': 'MISS'}), etag, **list_cache_control())
+
+
+class AsyncListCreateAnalyzedStringsView(AsyncAPIView):
+    async def get(self, request, *args, **kwargs):
+        allowed = StringFilterMixin.filter_params
+        for val in request.GET:
+            if val not in allowed and val not in KeysetPagination.query_params and val not in RECORD_PARAMS:
+                return api_response({'error': f'Invalid filter parameter: {val}'}, status=400)
+        try:
+            page_query = self.page_query(request, filter_strings(AnalyzedString.objects.all(), request.GET))
+        except serializers.ValidationError as e:
+            return api_response(e.detail, status=400)
+        applied = {k: request.GET[k] for k in request.GET if k in allowed}
+        return await self.cached_page(request, 'list', page_query, filter_applied=applied)
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            body = request_data(request)
+        except (ParseError, UnsupportedMediaType) as e:
+            return api_response({'detail': e.detail}, status=e.status_code)
+        raw_value = body.get('value', None) if isinstance(body, dict) else None
+        if raw_value is None:
+            return api_response({'error': "Missing 'value' field"}, status=400)
+        if not isinstance(raw_value, str):
+            return api_response({'error': 'Input must be a string.'}, status=422)
+        if raw_value.strip() == '':
+            return api_response({'error': 'Input string cannot be empty.'}, status=422)
+
+        # hashing a large value is CPU work too: only off the loop, and only with the filter on
+        if bloom.enabled() and await sync_to_async(bloom.is_stored)(raw_value):
+            return api_response({'error': 'String already exists in the system'}, status=409)
+        # CPU-bound: keep it off the event loop (large values go on to the process pool)
+        analysis = await sync_to_async(parallel.analyze, thread_sensitive=False)(raw_value)
+        try:
+            instance = await store(analysis)
+        except IntegrityError:
+            return api_response({'error': 'String already exists in the system'}, status=409)
+        with metrics.serialize_timer():
+            payload = instance_record(instance)
+        return api_response(payload, status=201)
+
+
+class AsyncStringRetrieveDestroyView(AsyncAPIView):
+    async def get_object(self, value):
+        # full_value must not query lazily in async code, so join the body in up front
+        instance = await AnalyzedString.objects.select_related('body').filter(pk=hash_string(value)).afirst()
+        # values that normalise alike share a hash; only the exact stored value matches
+        if instance is None or instance.full_value != value:
+            return None
+        return instance
+
+    async def get(self, request, value, *args, **kwargs):
+        key = analyzer_cache.string_key(hash_string(value))
+        payload = await get_cached('retrieve', key)
+        if payload is not None and payload['value'] == value:
+            cache_status = 'HIT'
+            etag = string_etag(payload['id'], parse_datetime(payload['created_at']))
+        else:
+            instance = await self.get_object(value)
+            if instance is None:
+                return api_response({'detail': 'No AnalyzedString matches the given query.'}, status=404)
+            cache_status = 'MISS'
+            etag = string_etag(instance.id, instance.created_at)
+            payload = None
+
+        cache_control = string_cache_control()
+        response = not_modified(request, etag, **cache_control)
+        if response is not None:
+            return response
+        if payload is None:
+            with metrics.serialize_timer():
+                payload = instance_record(instance)
+            await set_cached(key, payload)
+        return add_validators(api_response(payload, headers={'X-Cache': cache_status}), etag, **cache_control)
+
+    async def delete(self, request, value, *args, **kwargs):
+        instance = await self.get_object(value)
+        if instance is None:
+            return api_response({'detail': 'No AnalyzedString matches the given query.'}, status=404)
+        await remove(instance)
+        return HttpResponse(status=204)
+
+
+class AsyncNaturalLanguageFilterView(AsyncAPIView):
+    async def get(self, request, *args, **kwargs):
+        query = request.GET.get('query')
+        try:
+            interpreted = parse_natural_language_query(query)
+        except NaturalLanguageParseError:
+            return api_response({'error': 'Unable to parse natural language query'}, status=400)
+        except NaturalLanguageConflictError:
+            return api_response({'error': 'Query parsed but resulted in conflicting filters'}, status=422)
+
+        qs = apply_parsed_filters(AnalyzedString.objects.all(), interpreted['parsed_filters'])
+        try:
+            page_query = self.page_query(request, qs)
+        except serializers.ValidationError as e:
+            return api_response(e.detail, status=400)
+        return await self.cached_page(request, 'nl', page_query, interpreted_query=interpreted)
@@ -0,0 +1,204 @@
+import math
+import threading
+from collections import Counter
+from django.conf import settings
+from django.db import connection
+from .models import AnalyzedString
+from .utils import hash_string
+
+# Optional in-process Bloom filter of stored sha256 ids (ANALYZER_BLOOM_ENABLED)
+# for POST /strings/. It only ever answers "definitely new" or "maybe stored": a
+# definite miss goes straight to analysis and INSERT, a probable hit is confirmed
+# with a primary-key lookup and answered 409 without analyzing the value. Every
+# worker keeps its own filter and learns about other workers' inserts only on
+# rebuild; a miss on such an id just costs the failed INSERT, which the primary
+# key still turns into a 409. Bulk ingest keeps its exact id__in lookup, since it
+# must report which rows it really inserted. A missing or stale filter is rebuilt
+# in a background thread while requests keep using the old one (or none).
+
+_lock = threading.Lock()
+_filter = None
+_deleted_since_build = 0
+_building = False
+_counters = Counter()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter keyed on sha256 hex digests."""
+
+    def __init__(self, capacity, error_rate, max_bytes):
+        capacity = max(1, capacity)
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        # a capped filter still works, it just answers "maybe" more often
+        self.bits = max(64, min(bits, max_bytes * 8))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.capacity = capacity
+        self.items = 0
+        self.array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, sha256):
+        # the id is already a uniform hash: take two 64-bit words for double hashing
+        h1 = int(sha256[:16], 16)
+        h2 = int(sha256[16:32], 16) | 1
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hashes)]
+
+    def add(self, sha256):
+        array = self.array
+        for position in self._positions(sha256):
+            array[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+
+    def __contains__(self, sha256):
+        array = self.array
+        return all(array[position >> 3] & (1 << (position & 7)) for position in self._positions(sha256))
+
+    def estimated_error_rate(self):
+        return (1 - math.exp(-self.hashes * self.items / self.bits)) ** self.hashes
+
+
+def enabled():
+    return settings.ANALYZER_BLOOM_ENABLED
+
+
+def build():
+    """(Re)build the filter from every stored id, sized for twice the current count."""
+    global _filter, _deleted_since_build
+    # deletes counted while the ids are read may or may not be in the snapshot: keep them
+    deleted = _deleted_since_build
+    ids = AnalyzedString.objects.values_list('id', flat=True)
+    capacity = max(2 * ids.count(), settings.ANALYZER_BLOOM_MIN_CAPACITY)
+    bloom = BloomFilter(capacity, settings.ANALYZER_BLOOM_ERROR_RATE, settings.ANALYZER_BLOOM_MAX_BYTES)
+    for sha256 in ids.iterator(chunk_size=10000):
+        bloom.add(sha256)
+    with _lock:
+        _filter = bloom
+        _deleted_since_build -= deleted
+        _counters['builds'] += 1
+    return bloom
+
+
+def _stale(bloom):
+    return (
+        bloom is None
+        or bloom.items > bloom.capacity
+        or _deleted_since_build >= settings.ANALYZER_BLOOM_REBUILD_AFTER_DELETES
+    )
+
+
+def _rebuild():
+    global _building
+    try:
+        build()
+    finally:
+        with _lock:
+            _building = False
+
+
+def _start_rebuild():
+    def run():
+        try:
+            _rebuild()
+        finally:
+            # the thread's own connection, which nothing else would close
+            connection.close()
+    threading.Thread(target=run, name='bloom-rebuild', daemon=True).start()
+
+
+def get_filter():
+    """The current filter, or None until the first build has finished.
+
+    Only one thread rebuilds a missing or stale filter; the caller does not wait for it.
+    """
+    global _building
+    if _stale(_filter):
+        with _lock:
+            start = _stale(_filter) and not _building
+            if start:
+                _building = True
+        if start:
+            _start_rebuild()
+    return _filter
+
+
+def reset():
+    global _filter, _deleted_since_build, _building
+    with _lock:
+        _filter = None
+        _deleted_since_build = 0
+        _building = False
+        _counters.clear()
+
+
+def _might_contain(bloom, sha256):
+    with _lock:
+        _counters['checks'] += 1
+        if sha256 in bloom:
+            _counters['probable_hits'] += 1
+            return True
+        _counters['definite_misses'] += 1
+        return False
+
+
+def is_stored(value):
+    """Whether ``value`` is stored, skipping the query on a definite miss.
+
+    Always False when the filter is disabled or not built yet: callers INSERT
+    and rely on the primary key, as without the filter. The value is only
+    hashed when the filter is on.
+    """
+    if not enabled():
+        return False
+    sha256 = hash_string(value)
+    bloom = get_filter()
+    if bloom is None or not _might_contain(bloom, sha256):
+        return False
+    stored = AnalyzedString.objects.filter(pk=sha256).exists()
+    with _lock:
+        _counters['confirmed_hits' if stored else 'false_positives'] += 1
+    return stored
+
+
+def add_created(sender, ids, **kwargs):
+    """Receiver for strings_created. A rolled-back insert only leaves a false positive behind."""
+    bloom = _filter
+    if bloom is None:
+        return
+    with _lock:
+        for sha256 in ids:
+            bloom.add(sha256)
+
+
+def count_deleted(sender, ids, **kwargs):
+    """Receiver for strings_deleted: deleted ids stay set until the next rebuild."""
+    global _deleted_since_build
+    with _lock:
+        _deleted_since_build += len(ids)
+
+
+def stats():
+    with _lock:
+        counters = dict(_counters)
+        bloom = _filter
+        deleted = _deleted_since_build
+    checks = counters.get('checks', 0)
+    payload = {
+        'enabled': enabled(),
+        'checks': checks,
+        'definite_misses': counters.get('definite_misses', 0),
+        'probable_hits': counters.get('probable_hits', 0),
+        'confirmed_hits': counters.get('confirmed_hits', 0),
+        'false_positives': counters.get('false_positives', 0),
+        'builds': counters.get('builds', 0),
+        'deleted_since_build': deleted,
+    }
+    if bloom is not None:
+        payload.update({
+            'items': bloom.items,
+            'capacity': bloom.capacity,
+            'bits': bloom.bits,
+            'hashes': bloom.hashes,
+            'bytes': len(bloom.array),
+            'estimated_error_rate': bloom.estimated_error_rate(),
+        })
+    return payload
@@ -0,0 +1,96 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from .pagination import query_params
+
+# Retrieve entries are keyed by sha256 alone: a stored row never changes, so only its
+# delete has to drop the entry. List and NL entries embed a generation counter kept in
+# the cache itself, which every create and delete bumps, invalidating them all at once.
+# With a shared backend every worker sees the bump. A per-process locmem cache only sees
+# its own process's writes; its generation expires after ANALYZER_CACHE_TIMEOUT like any
+# entry, which bounds how long another worker's write can go unnoticed there.
+GENERATION_KEY = 'analyzer:generation'
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[settings.ANALYZER_CACHE_ALIAS]
+
+
+def string_key(sha256):
+    return f'analyzer:string:{sha256}'
+
+
+def response_key(kind, request):
+    """Key for a list/NL response: the current generation plus the sorted query params."""
+    params = sorted((key, value) for key, values in query_params(request).lists() for value in values)
+    # next/previous links are absolute, so the host is part of the response
+    digest = hashlib.sha256(repr((request.get_host(), params)).encode('utf-8')).hexdigest()
+    return f'analyzer:{kind}:{generation()}:{digest}'
+
+
+def generation():
+    cache = get_cache()
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        # start from the clock, not 1, so a lost generation never revives old entries
+        cache.add(GENERATION_KEY, time.time_ns())
+        value = cache.get(GENERATION_KEY)
+    return value
+
+
+def get_cached(kind, key):
+    payload = get_cache().get(key)
+    with _counters_lock:
+        _counters[kind, 'hits' if payload is not None else 'misses'] += 1
+    return payload
+
+
+def set_cached(key, payload):
+    get_cache().set(key, payload)
+
+
+def stats():
+    with _counters_lock:
+        counters = dict(_counters)
+    kinds = sorted({kind for kind, _ in counters})
+    return {
+        kind: {'hits': counters.get((kind, 'hits'), 0), 'misses': counters.get((kind, 'misses'), 0)}
+        for kind in kinds
+    }
+
+
+def _invalidate():
+    try:
+        get_cache().incr(GENERATION_KEY)
+    except ValueError:
+        # generation was evicted; the next read starts a fresh one
+        pass
+
+
+def _forget(ids):
+    get_cache().delete_many([string_key(sha256) for sha256 in ids])
+
+
+def invalidate_strings(sender, ids, **kwargs):
+    """Receiver for strings_created: drops every list and NL entry.
+
+    Bumps the generation now and again on commit, so a read that repopulates
+    the cache between the write and its commit cannot leave a stale entry behind.
+    """
+    _invalidate()
+    transaction.on_commit(_invalidate)
+
+
+def forget_strings(sender, ids, **kwargs):
+    """Receiver for strings_deleted: drops the strings' retrieve entries and every list and NL entry."""
+    ids = list(ids)
+    invalidate_strings(sender, ids)
+    _forget(ids)
+    transaction.on_commit(lambda: _forget(ids))
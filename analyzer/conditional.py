@@ -0,0 +1,44 @@
+import hashlib
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+
+def string_etag(sha256, created_at):
+    """Strong ETag for a stored string.
+
+    Rows never change once written, so the content hash plus the insert time
+    (a delete and re-create gets a new one) identifies the representation.
+    """
+    return f'"{sha256}-{int(created_at.timestamp() * 1_000_000)}"'
+
+
+def list_etag(key):
+    """ETag for a list/NL response, derived from its cache key.
+
+    The key already covers the kind, host, query params and cache generation,
+    which every create and delete bumps, so the ETag costs no query.
+    """
+    return f'"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:40]}"'
+
+
+def not_modified(request, etag, **cache_control):
+    """A 304 response when the request's If-None-Match matches ``etag``, else None."""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        add_validators(response, etag, **cache_control)
+    return response
+
+
+def add_validators(response, etag, **cache_control):
+    response['ETag'] = etag
+    patch_cache_control(response, **cache_control)
+    return response
+
+
+def string_cache_control():
+    return {'public': True, 'max_age': settings.ANALYZER_HTTP_MAX_AGE}
+
+
+def list_cache_control():
+    # list contents change with every write; let clients and CDNs store but revalidate
+    return {'public': True, 'no_cache': True}
@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.db import connection, transaction
+from .models import BODY_PREFIX_LENGTH, AnalyzedString, StringBody, StringCharacter
+from .signals import strings_created
+
+
+def build_instance(analysis):
+    """Unsaved ``AnalyzedString`` for an analysis.
+
+    A value longer than ANALYZER_BODY_THRESHOLD keeps only its prefix on the row;
+    the full value is on ``instance.body``, an unsaved ``StringBody`` to insert after it.
+    Thresholds below BODY_PREFIX_LENGTH count as BODY_PREFIX_LENGTH: a shorter value
+    would be stored whole twice.
+    """
+    packed = settings.ANALYZER_PACKED_FREQUENCY_MAPS
+    value = analysis['value']
+    threshold = settings.ANALYZER_BODY_THRESHOLD and max(settings.ANALYZER_BODY_THRESHOLD, BODY_PREFIX_LENGTH)
+    has_body = bool(threshold) and len(value) > threshold
+    instance = AnalyzedString(
+        id=analysis['sha256_hash'],
+        value=value[:BODY_PREFIX_LENGTH] if has_body else value,
+        has_body=has_body,
+        length=analysis['length'],
+        is_palindrome=analysis['is_palindrome'],
+        unique_characters=analysis['unique_characters'],
+        word_count=analysis['word_count'],
+        character_frequency_map=None if packed else analysis['character_frequency_map'],
+        character_frequency_packed=analysis['character_frequency_map'] if packed else None,
+    )
+    if has_body:
+        instance.body = StringBody(value=value)
+    return instance
+
+
+def build_bodies(instances):
+    """The ``StringBody`` rows of ``build_instance()`` results that have one."""
+    return [instance.body for instance in instances if instance.has_body]
+
+
+def build_character_rows(analysis):
+    """``StringCharacter`` rows for the distinct characters of an analysis."""
+    string_id = analysis['sha256_hash']
+    return [StringCharacter(string_id=string_id, character=char) for char in analysis['character_frequency_map']]
+
+
+def insert_character_rows(analyses, chunk_size=500):
+    """Insert the ``StringCharacter`` rows of ``analyses``, skipping rows already stored.
+
+    Same rows as ``bulk_create(build_character_rows(...), ignore_conflicts=True)``,
+    but sent as plain tuples in multi-row INSERT ... ON CONFLICT DO NOTHING
+    statements: there are about a dozen per string and a model instance apiece
+    made them the slowest part of a bulk insert.
+    """
+    rows = [(char, analysis['sha256_hash']) for analysis in analyses for char in analysis['character_frequency_map']]
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    table = qn(StringCharacter._meta.db_table)
+    character = qn(StringCharacter._meta.get_field('character').column)
+    string = qn(StringCharacter._meta.get_field('string').column)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            placeholders = ', '.join(['(%s, %s)'] * len(chunk))
+            cursor.execute(
+                f'INSERT INTO {table} ({character}, {string}) VALUES {placeholders} ON CONFLICT DO NOTHING',
+                [param for row in chunk for param in row],
+            )
+
+
+def insert_strings(instances):
+    """INSERT ``instances`` (unsaved AnalyzedStrings), skipping ids already stored.
+
+    Sent as multi-row INSERT ... ON CONFLICT (id) DO NOTHING RETURNING id
+    (PostgreSQL, SQLite >= 3.35), so the result is exactly the set of ids this
+    call inserted: a row another writer stored first is left out.
+    """
+    if not instances:
+        return set()
+    opts = AnalyzedString._meta
+    fields = opts.concrete_fields
+    qn = connection.ops.quote_name
+    table = qn(opts.db_table)
+    columns = ', '.join(qn(field.column) for field in fields)
+    pk = qn(opts.pk.column)
+    row_placeholder = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    batch_size = connection.ops.bulk_batch_size(fields, instances)
+    inserted = set()
+    with connection.cursor() as cursor:
+        for start in range(0, len(instances), batch_size):
+            chunk = instances[start:start + batch_size]
+            params = [field.get_db_prep_save(field.pre_save(obj, True), connection) for obj in chunk for field in fields]
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) VALUES {", ".join([row_placeholder] * len(chunk))} '
+                f'ON CONFLICT ({pk}) DO NOTHING RETURNING {pk}',
+                params,
+            )
+            inserted.update(row[0] for row in cursor.fetchall())
+    for obj in instances:
+        if obj.pk in inserted:
+            obj._state.adding = False
+            obj._state.db = connection.alias
+    return inserted
+
+
+def _stored_ids(ids):
+    return set(AnalyzedString.objects.filter(id__in=ids).values_list('id', flat=True))
+
+
+def bulk_store(analyses, chunk_size=None):
+    """Insert the analyses whose hash is not stored yet.
+
+    Existing hashes are fetched with a single ``id__in`` query to skip analyses
+    already stored, then new rows go in with chunked ``insert_strings()``.
+    Returns the set of ids this call inserted; a row inserted concurrently by
+    another writer is skipped, gets no character or body rows from this call
+    and is not announced in ``strings_created``.
+    """
+    chunk_size = chunk_size or settings.ANALYZER_BULK_CHUNK_SIZE
+    pending = {}
+    for analysis in analyses:
+        pending.setdefault(analysis['sha256_hash'], analysis)
+    if not pending:
+        return set()
+
+    existing = _stored_ids(list(pending))
+    new = [a for key, a in pending.items() if key not in existing]
+    created = set()
+    instances = []
+    with transaction.atomic():
+        for start in range(0, len(new), chunk_size):
+            chunk = new[start:start + chunk_size]
+            strings = [build_instance(a) for a in chunk]
+            inserted = insert_strings(strings)
+            strings = [string for string in strings if string.pk in inserted]
+            StringBody.objects.bulk_create(build_bodies(strings))
+            insert_character_rows([a for a in chunk if a['sha256_hash'] in inserted])
+            instances.extend(strings)
+            created |= inserted
+        if created:
+            strings_created.send(sender=AnalyzedString, ids=created, strings=instances)
+    return created
@@ -0,0 +1,127 @@
+import gzip
+import io
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from analyzer.ingest import bulk_store
+from analyzer.parallel import analyze_batch
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def open_input(path, encoding):
+    """Text stream over a file or stdin (``-``), gunzipped when the content is gzip."""
+    raw = sys.stdin.buffer if path == '-' else open(path, 'rb')
+    if raw.peek(2)[:2] == GZIP_MAGIC:
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding=encoding)
+
+
+def read_lines(paths, encoding):
+    """Every line of ``paths`` in order, without its line ending."""
+    for path in paths:
+        stream = open_input(path, encoding)
+        try:
+            for line in stream:
+                yield line[:-1] if line.endswith('\n') else line
+        finally:
+            if path == '-':
+                stream.detach()  # leave stdin open
+            else:
+                stream.close()
+
+
+def batches(lines, size):
+    """(values, lines consumed) per ``size`` lines; blank lines are dropped but still counted."""
+    while True:
+        chunk = list(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield [line for line in chunk if line.strip()], len(chunk)
+
+
+class Command(BaseCommand):
+    help = (
+        "Analyze and store every line of the given files (plain or gzip; '-' reads stdin). "
+        "Blank lines are skipped and values already stored are counted as duplicates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', metavar='path')
+        parser.add_argument('--batch-size', type=int, default=5000, help='lines analyzed and written per batch')
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='analysis processes (default ANALYZER_PROCESS_WORKERS or min(4, cpus); 0 analyzes in this process)',
+        )
+        parser.add_argument('--offset', type=int, default=0, help='skip this many input lines, e.g. to resume a run')
+        parser.add_argument('--progress-every', type=float, default=5.0, help='seconds between progress lines')
+        parser.add_argument('--encoding', default='utf-8')
+
+    def handle(self, *args, **options):
+        paths = options['paths']
+        for path in paths:
+            if path != '-' and not os.path.isfile(path):
+                raise CommandError(f"No such file: {path}")
+        if options['batch_size'] < 1 or options['offset'] < 0:
+            raise CommandError("--batch-size must be positive and --offset non-negative")
+        workers = options['workers']
+        if workers is None:
+            workers = settings.ANALYZER_PROCESS_WORKERS or min(4, os.cpu_count() or 1)
+
+        offset = options['offset']
+        lines = itertools.islice(read_lines(paths, options['encoding']), offset, None)
+        self.offset = self.committed = offset
+        self.created = self.duplicates = self.blank = 0
+        self.start = time.perf_counter()
+        last_report = self.start
+        try:
+            for analyses, consumed in self.analyzed(batches(lines, options['batch_size']), workers):
+                # one transaction per batch: every line up to self.committed is stored
+                created = len(bulk_store(analyses))
+                self.created += created
+                self.duplicates += len(analyses) - created
+                self.blank += consumed - len(analyses)
+                self.committed += consumed
+                if time.perf_counter() - last_report >= options['progress_every']:
+                    self.stdout.write(self.progress())
+                    last_report = time.perf_counter()
+        except KeyboardInterrupt:
+            raise CommandError(f"Interrupted. {self.progress()}")
+        self.stdout.write(self.style.SUCCESS(self.progress()))
+
+    def analyzed(self, batches, workers):
+        """(analyses, lines consumed) per batch, in input order.
+
+        With workers, batches are analyzed in a process pool while this process
+        writes the previous ones; at most two batches per worker are in flight,
+        so memory stays bounded however long the input is.
+        """
+        if not workers:
+            for values, consumed in batches:
+                yield analyze_batch(values), consumed
+            return
+        # spawn, not fork: this process holds an open db connection
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            pending = deque()
+            for values, consumed in batches:
+                pending.append((executor.submit(analyze_batch, values), consumed))
+                if len(pending) >= 2 * workers:
+                    future, consumed = pending.popleft()
+                    yield future.result(), consumed
+            while pending:
+                future, consumed = pending.popleft()
+                yield future.result(), consumed
+
+    def progress(self):
+        elapsed = time.perf_counter() - self.start
+        rate = (self.committed - self.offset) / elapsed if elapsed else 0.0
+        return (
+            f"{self.committed} lines read: {self.created} created, {self.duplicates} duplicates, "
+            f"{self.blank} blank ({rate:.0f} lines/s). Resume with --offset {self.committed}"
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from analyzer.models import AnalyzedString, StringCharacter
+
+
+class Command(BaseCommand):
+    help = "Write StringCharacter rows for analyzed strings stored before the character index existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # strings that already have index rows are skipped, so the command can be re-run after an interruption
+        rows = (
+            AnalyzedString.objects.filter(characters__isnull=True)
+            .values_list('id', 'character_frequency_map', 'character_frequency_packed')
+            .iterator(chunk_size=batch_size)
+        )
+        strings = 0
+        batch = []
+        for string_id, frequency_map, packed in rows:
+            frequency_map = frequency_map if packed is None else packed
+            batch.extend(StringCharacter(string_id=string_id, character=char) for char in frequency_map)
+            strings += 1
+            if strings % batch_size == 0:
+                self.write_batch(batch)
+                batch = []
+                self.stdout.write(f"Indexed {strings} strings...")
+        self.write_batch(batch)
+        self.stdout.write(self.style.SUCCESS(f"Indexed characters for {strings} strings."))
+
+    def write_batch(self, batch):
+        with transaction.atomic():
+            StringCharacter.objects.bulk_create(batch, ignore_conflicts=True)
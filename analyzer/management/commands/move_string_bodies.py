@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Length
+from analyzer.models import BODY_PREFIX_LENGTH, AnalyzedString, StringBody
+
+
+class Command(BaseCommand):
+    help = (
+        "Move stored values longer than ANALYZER_BODY_THRESHOLD (or --threshold) into the StringBody "
+        "table, leaving a prefix on the string row, or back inline with --inline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=int, default=None, help='default ANALYZER_BODY_THRESHOLD')
+        parser.add_argument('--inline', action='store_true', help='move every body back into the string row')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        inlining = options['inline']
+        if inlining:
+            pending = AnalyzedString.objects.filter(has_body=True).values_list('pk', 'body__value')
+        else:
+            threshold = settings.ANALYZER_BODY_THRESHOLD if options['threshold'] is None else options['threshold']
+            if threshold < BODY_PREFIX_LENGTH:
+                raise CommandError(f"Set a threshold of at least {BODY_PREFIX_LENGTH} characters")
+            pending = (
+                AnalyzedString.objects.filter(has_body=False)
+                .alias(value_length=Length('value'))
+                .filter(value_length__gt=threshold)
+                .values_list('pk', 'value')
+            )
+        # moved rows drop out of the filter, so the command can be re-run after an interruption
+        pending = pending.order_by('pk')
+        strings = 0
+        last_pk = ''
+        while True:
+            rows = list(pending.filter(pk__gt=last_pk)[:batch_size])
+            if not rows:
+                break
+            instances = [
+                AnalyzedString(
+                    pk=pk, value=value if inlining else value[:BODY_PREFIX_LENGTH], has_body=not inlining,
+                )
+                for pk, value in rows
+            ]
+            with transaction.atomic():
+                if inlining:
+                    AnalyzedString.objects.bulk_update(instances, ['value', 'has_body'])
+                    StringBody.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+                else:
+                    StringBody.objects.bulk_create([StringBody(string_id=pk, value=value) for pk, value in rows])
+                    AnalyzedString.objects.bulk_update(instances, ['value', 'has_body'])
+            strings += len(rows)
+            last_pk = rows[-1][0]
+            self.stdout.write(f"Moved {strings} values...")
+        target = 'inline' if inlining else 'to StringBody'
+        self.stdout.write(self.style.SUCCESS(f"Moved {strings} values {target}."))
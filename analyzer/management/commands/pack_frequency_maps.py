@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from analyzer.frequency import unpack
+from analyzer.models import AnalyzedString
+
+
+class Command(BaseCommand):
+    help = (
+        "Move stored character frequency maps into the packed column (set ANALYZER_PACKED_FREQUENCY_MAPS "
+        "for new rows too), or back to JSON with --unpack."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--unpack', action='store_true', help='convert packed maps back to JSON objects')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        unpacking = options['unpack']
+        source = 'character_frequency_packed' if unpacking else 'character_frequency_map'
+        # converted rows drop out of the filter, so the command can be re-run after an interruption
+        pending = AnalyzedString.objects.filter(**{f'{source}__isnull': False}).order_by('pk')
+        strings = 0
+        last_pk = ''
+        while True:
+            rows = list(pending.filter(pk__gt=last_pk).values_list('pk', source)[:batch_size])
+            if not rows:
+                break
+            instances = [
+                AnalyzedString(
+                    pk=pk,
+                    character_frequency_map=unpack(value.packed) if unpacking else None,
+                    character_frequency_packed=None if unpacking else value,
+                )
+                for pk, value in rows
+            ]
+            with transaction.atomic():
+                AnalyzedString.objects.bulk_update(instances, ['character_frequency_map', 'character_frequency_packed'])
+            strings += len(rows)
+            last_pk = rows[-1][0]
+            self.stdout.write(f"Converted {strings} strings...")
+        target = 'JSON' if unpacking else 'packed'
+        self.stdout.write(self.style.SUCCESS(f"Converted {strings} frequency maps to the {target} form."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from analyzer import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the StatCounter rows behind GET /stats from the stored strings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        strings = stats.rebuild(chunk_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics for {strings} strings."))
@@ -0,0 +1,198 @@
+import bisect
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Per-worker request metrics (ANALYZER_METRICS_ENABLED), served in Prometheus text
+# format at /metrics. analyzer.middleware opens a RequestMetrics for every request;
+# the database execute wrapper, analyze_string and the views' serialize timers add
+# to it through a context variable, so code running outside a request (management
+# commands, benchmarks) records nothing and pays only the lookup. Histograms are
+# only touched once per request, when the middleware finishes it.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# analysis time is labelled with the smallest of these (chars) the input fits in
+LENGTH_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000)
+METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+
+# name: (help, buckets, label names)
+HISTOGRAMS = {
+    'analyzer_request_duration_seconds': (
+        'Time from the first middleware to the rendered response.', LATENCY_BUCKETS, ('endpoint', 'method'),
+    ),
+    'analyzer_request_db_queries': ('Database queries per request.', QUERY_COUNT_BUCKETS, ('endpoint',)),
+    'analyzer_request_db_seconds': ('Time spent in database queries per request.', LATENCY_BUCKETS, ('endpoint',)),
+    'analyzer_request_serialize_seconds': (
+        'Time spent building response payloads per request.', LATENCY_BUCKETS, ('endpoint',),
+    ),
+    'analyzer_analysis_seconds': ('analyze_string time per value, by input length.', LATENCY_BUCKETS, ('length_le',)),
+}
+
+_current = ContextVar('analyzer_request_metrics', default=None)
+_lock = threading.Lock()
+_requests = Counter()
+_histograms = {name: {} for name in HISTOGRAMS}
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        # le is inclusive: a value equal to a bound lands in that bucket
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class RequestMetrics:
+    """What one request spent, filled in while it runs."""
+    __slots__ = ('start', 'queries', 'db', 'serialize', 'serialized', 'analyses')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.serialized = False
+        self.analyses = []
+
+    def add_analysis(self, length, seconds):
+        self.analyses.append((length, seconds))
+
+
+def current():
+    """The RequestMetrics of the request being served, or None."""
+    return _current.get()
+
+
+def begin():
+    request_metrics = RequestMetrics()
+    return request_metrics, _current.set(request_metrics)
+
+
+def end(token):
+    _current.reset(token)
+
+
+@contextmanager
+def serialize_timer():
+    """Count the enclosed block as serialization time of the current request."""
+    request_metrics = _current.get()
+    if request_metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_metrics.serialize += time.perf_counter() - start
+        request_metrics.serialized = True
+
+
+def db_wrapper(execute, sql, params, many, context):
+    request_metrics = _current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.queries += 1
+        request_metrics.db += time.perf_counter() - start
+
+
+def install_db_wrapper(sender, connection, **kwargs):
+    """Receiver for connection_created; the wrapper list outlives reconnects."""
+    if db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_wrapper)
+
+
+def _observe(name, labels, value):
+    histograms = _histograms[name]
+    histogram = histograms.get(labels)
+    if histogram is None:
+        histogram = histograms[labels] = Histogram(HISTOGRAMS[name][1])
+    histogram.observe(value)
+
+
+def _length_label(length):
+    index = bisect.bisect_left(LENGTH_BUCKETS, length)
+    return str(LENGTH_BUCKETS[index]) if index < len(LENGTH_BUCKETS) else '+Inf'
+
+
+def finish(request, response, request_metrics, server_timing=False):
+    """Record a finished request; adds a Server-Timing header when ``server_timing``."""
+    total = time.perf_counter() - request_metrics.start
+    match = getattr(request, 'resolver_match', None)
+    endpoint = (match.url_name or match.view_name) if match is not None else 'unmatched'
+    method = request.method if request.method in METHODS else 'other'
+    with _lock:
+        _requests[endpoint, method, str(response.status_code)] += 1
+        _observe('analyzer_request_duration_seconds', (endpoint, method), total)
+        _observe('analyzer_request_db_queries', (endpoint,), request_metrics.queries)
+        _observe('analyzer_request_db_seconds', (endpoint,), request_metrics.db)
+        if request_metrics.serialized:
+            _observe('analyzer_request_serialize_seconds', (endpoint,), request_metrics.serialize)
+        for length, seconds in request_metrics.analyses:
+            _observe('analyzer_analysis_seconds', (_length_label(length),), seconds)
+    if server_timing:
+        parts = [f'db;dur={request_metrics.db * 1000:.3f};desc="{request_metrics.queries} queries"']
+        if request_metrics.analyses:
+            analysis = sum(seconds for _, seconds in request_metrics.analyses)
+            parts.append(f'analysis;dur={analysis * 1000:.3f}')
+        if request_metrics.serialized:
+            parts.append(f'serialize;dur={request_metrics.serialize * 1000:.3f}')
+        parts.append(f'total;dur={total * 1000:.3f}')
+        response['Server-Timing'] = ', '.join(parts)
+    return response
+
+
+def reset():
+    with _lock:
+        _requests.clear()
+        for histograms in _histograms.values():
+            histograms.clear()
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def exposition():
+    """Every metric of this worker in the Prometheus text exposition format."""
+    with _lock:
+        requests = dict(_requests)
+        snapshot = {
+            name: {labels: (list(h.counts), h.sum) for labels, h in histograms.items()}
+            for name, histograms in _histograms.items()
+        }
+    lines = [
+        '# HELP analyzer_requests_total Requests served by this worker.',
+        '# TYPE analyzer_requests_total counter',
+    ]
+    for labels, count in sorted(requests.items()):
+        lines.append(f'analyzer_requests_total{_labels(("endpoint", "method", "status"), labels)} {count}')
+    for name, (help_text, buckets, label_names) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, (counts, total) in sorted(snapshot[name].items()):
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), counts):
+                cumulative += count
+                le = bound if isinstance(bound, str) else f'{bound:g}'
+                lines.append(f'{name}_bucket{_labels(label_names, labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(label_names, labels)} {total!r}')
+            lines.append(f'{name}_count{_labels(label_names, labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,32 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+from . import metrics
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """Record every request in analyzer.metrics, under WSGI and ASGI alike.
+
+    Listed first, so the timings include the rest of the middleware and rendering.
+    Streaming responses are recorded when the view returns, before the body is sent.
+    """
+    server_timing = settings.ANALYZER_SERVER_TIMING
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            request_metrics, token = metrics.begin()
+            try:
+                response = await get_response(request)
+            finally:
+                metrics.end(token)
+            return metrics.finish(request, response, request_metrics, server_timing)
+    else:
+        def middleware(request):
+            request_metrics, token = metrics.begin()
+            try:
+                response = get_response(request)
+            finally:
+                metrics.end(token)
+            return metrics.finish(request, response, request_metrics, server_timing)
+    return middleware
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['created_at', 'id'], name='analyzed_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(condition=models.Q(('is_palindrome', True)), fields=['length'], name='analyzed_palindrome_len_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(condition=models.Q(('is_palindrome', False)), fields=['length'], name='analyzed_other_len_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['word_count', 'length'], name='analyzed_words_len_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyzedstring',
+            index=models.Index(fields=['length'], name='analyzed_length_idx'),
+        ),
+    ]
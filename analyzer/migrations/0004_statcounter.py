@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:26
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def bucket(n):
+    # frozen copy of analyzer.stats.bucket as of this migration
+    if n <= 0:
+        return '0'
+    low = 1 << (n.bit_length() - 1)
+    high = 2 * low - 1
+    return str(low) if low == high else f'{low}-{high}'
+
+
+def count_existing_strings(apps, schema_editor):
+    AnalyzedString = apps.get_model('analyzer', 'AnalyzedString')
+    StatCounter = apps.get_model('analyzer', 'StatCounter')
+    db = schema_editor.connection.alias
+    deltas = Counter()
+    rows = AnalyzedString.objects.using(db).values_list('length', 'is_palindrome', 'word_count', 'character_frequency_map')
+    for length, is_palindrome, word_count, frequency_map in rows.iterator(chunk_size=2000):
+        deltas['strings', ''] += 1
+        deltas['total_length', ''] += length
+        if is_palindrome:
+            deltas['palindromes', ''] += 1
+        deltas['length', bucket(length)] += 1
+        deltas['word_count', bucket(word_count)] += 1
+        for char, count in frequency_map.items():
+            deltas['character', char] += count
+    # the table was created above, so plain inserts are enough
+    StatCounter.objects.using(db).bulk_create(
+        [StatCounter(metric=metric, key=key, value=value) for (metric, key), value in deltas.items() if value],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0003_stringcharacter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=32)),
+                ('key', models.CharField(blank=True, max_length=32)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('metric', 'key'), name='unique_stat_counter')],
+            },
+        ),
+        migrations.RunPython(count_existing_strings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:03
+
+import analyzer.frequency
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0004_statcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyzedstring',
+            name='character_frequency_packed',
+            field=analyzer.frequency.PackedFrequencyMapField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='analyzedstring',
+            name='character_frequency_map',
+            field=models.JSONField(null=True),
+        ),
+    ]
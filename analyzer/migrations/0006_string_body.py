@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0005_packed_frequency_map'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StringBody',
+            fields=[
+                ('string', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='body', serialize=False, to='analyzer.analyzedstring')),
+                ('value', models.TextField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='analyzedstring',
+            name='has_body',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='analyzedstring',
+            name='value',
+            field=models.TextField(),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0007_cache_generation'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='statcounter',
+            name='unique_stat_counter',
+        ),
+        migrations.AddField(
+            model_name='statcounter',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='statcounter',
+            constraint=models.UniqueConstraint(fields=('metric', 'key', 'shard'), name='unique_stat_counter_shard'),
+        ),
+    ]
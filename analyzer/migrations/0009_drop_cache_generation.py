@@ -0,0 +1,16 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:38
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0008_stat_counter_shards'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='CacheGeneration',
+        ),
+    ]
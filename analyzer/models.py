@@ -1,15 +1,119 @@
 from django.db import models
+from .frequency import PackedFrequencyMapField
+
+# characters of a long value kept in AnalyzedString.value when the rest is in StringBody
+BODY_PREFIX_LENGTH = 64
+
+
+class AnalyzedStringQuerySet(models.QuerySet):
+    def containing(self, substring):
+        """Case-insensitive "value contains substring" filter.
+
+        A single non-whitespace character is answered from the indexed
+        ``StringCharacter`` rows written at analysis time; anything else falls
+        back to ``value__icontains`` (on the StringBody for long values).
+        """
+        key = substring.lower()
+        if len(substring) == 1 and len(key) == 1 and not substring.isspace():
+            return self.filter(characters__character=key)
+        # the value column only holds a prefix of strings that have a StringBody
+        return self.filter(
+            models.Q(value__icontains=substring) | models.Q(has_body=True, body__value__icontains=substring)
+        )
+
 
 # Create your models here.
 class AnalyzedString(models.Model):
     id = models.CharField(primary_key=True, max_length=64)  
-    value = models.TextField(unique=True)  
+    # the full value, or its first BODY_PREFIX_LENGTH characters when has_body is set
+    # and the value lives in StringBody (see ANALYZER_BODY_THRESHOLD). No unique
+    # index: id is the hash of the normalised value, so it already keeps values apart
+    value = models.TextField()
+    has_body = models.BooleanField(default=False)
     length = models.PositiveIntegerField()
     is_palindrome = models.BooleanField()
     unique_characters = models.PositiveIntegerField()
     word_count = models.PositiveIntegerField()
-    character_frequency_map = models.JSONField()
+    # one of the two is set: the packed form is written instead of the JSON object
+    # when ANALYZER_PACKED_FREQUENCY_MAPS is on (manage.py pack_frequency_maps converts)
+    character_frequency_map = models.JSONField(null=True)
+    character_frequency_packed = PackedFrequencyMapField(null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = AnalyzedStringQuerySet.as_manager()
+
+    class Meta:
+        # match the list/NL filters; (created_at, id) backs keyset pagination.
+        # is_palindrome uses partial indexes because SQLite renders the filter as a
+        # bare "WHERE is_palindrome", which only a matching index condition can serve
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='analyzed_created_id_idx'),
+            models.Index(fields=['length'], condition=models.Q(is_palindrome=True), name='analyzed_palindrome_len_idx'),
+            models.Index(fields=['length'], condition=models.Q(is_palindrome=False), name='analyzed_other_len_idx'),
+            models.Index(fields=['word_count', 'length'], name='analyzed_words_len_idx'),
+            models.Index(fields=['length'], name='analyzed_length_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.value[:50]}..." 
+
+    @property
+    def full_value(self):
+        """The complete value, read from StringBody when only a prefix is stored here."""
+        return self.body.value if self.has_body else self.value
+
+    @property
+    def frequency_map(self):
+        """The character frequency map, whichever column holds it."""
+        packed = self.character_frequency_packed
+        return self.character_frequency_map if packed is None else packed
+
+
+class StringBody(models.Model):
+    """Full value of a string longer than ANALYZER_BODY_THRESHOLD.
+
+    Kept out of the AnalyzedString row so the columns every filter reads stay on
+    small rows; only reads that return ``value`` join it in.
+    """
+    string = models.OneToOneField(AnalyzedString, primary_key=True, on_delete=models.CASCADE, related_name='body')
+    value = models.TextField()
+
+    def __str__(self):
+        return f"body of {self.string_id}"
+
+
+class StringCharacter(models.Model):
+    """One row per distinct character of an analyzed string's normalised value."""
+    string = models.ForeignKey(AnalyzedString, on_delete=models.CASCADE, related_name='characters')
+    character = models.CharField(max_length=1)
+
+    class Meta:
+        constraints = [
+            # leading on character so contains_character lookups are an index range
+            models.UniqueConstraint(fields=['character', 'string'], name='unique_string_character'),
+        ]
+
+    def __str__(self):
+        return f"{self.character} in {self.string_id}"
+
+
+class StatCounter(models.Model):
+    """One shard of a running total behind GET /stats, e.g. ('length', '8-15') -> 42.
+
+    Kept up to date by the strings_created/strings_deleted receivers in
+    ``analyzer.stats``; ``manage.py rebuild_stats`` recomputes it from scratch.
+    Each write transaction updates the rows of one shard, so concurrent writers
+    rarely wait on each other's row locks; reads sum the shards.
+    """
+    metric = models.CharField(max_length=32)
+    key = models.CharField(max_length=32, blank=True)
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'key', 'shard'], name='unique_stat_counter_shard'),
+        ]
+
     def __str__(self):
-        return f"{self.value[:50]}..." 
\ No newline at end of file
+        return f"{self.metric}[{self.key}]#{self.shard} = {self.value}"
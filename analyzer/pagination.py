@@ -0,0 +1,101 @@
+import base64
+import json
+from datetime import datetime
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.utils.urls import replace_query_param
+
+
+def query_params(request):
+    # DRF requests expose query_params; plain Django requests (async views) only GET
+    return getattr(request, 'query_params', request.GET)
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination ordered on ``(created_at, id)``.
+
+    Each page is a single ``WHERE (created_at, id) > cursor ORDER BY ... LIMIT n``
+    query, so deep pages cost the same as the first one. Cursors are opaque
+    base64 tokens; ``limit`` sets the page size, capped at ``ANALYZER_MAX_PAGE_SIZE``.
+    Pages are ``.values()`` rows, which must include ``created_at`` and ``id``.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    query_params = (cursor_query_param, page_size_query_param)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.page_queryset(queryset, request)))
+
+    def page_queryset(self, queryset, request):
+        """The (lazy) queryset for the requested page; raises ValidationError for a bad cursor or limit."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        self.has_cursor = cursor is not None
+        self.reverse = False
+
+        if cursor is None:
+            queryset = queryset.order_by('created_at', 'id')
+        else:
+            created_at, pk, self.reverse = cursor
+            if self.reverse:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                ).order_by('-created_at', '-id')
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                ).order_by('created_at', 'id')
+        # fetch one extra row to learn whether there is another page in this direction
+        return queryset[:self.page_size + 1]
+
+    def finish_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        has_next = self.has_cursor if self.reverse else has_more
+        has_previous = has_more if self.reverse else self.has_cursor
+        self.next_position = rows[-1] if rows and has_next else None
+        self.previous_position = rows[0] if rows and has_previous else None
+        return rows
+
+    def get_page_size(self, request):
+        default = settings.ANALYZER_PAGE_SIZE
+        raw = query_params(request).get(self.page_size_query_param)
+        if raw is None:
+            return default
+        try:
+            size = int(raw)
+        except ValueError:
+            raise ValidationError("Invalid integer for limit")
+        return max(1, min(size, settings.ANALYZER_MAX_PAGE_SIZE))
+
+    def decode_cursor(self, request):
+        encoded = query_params(request).get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return datetime.fromisoformat(payload['c']), str(payload['i']), bool(payload['r'])
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise ValidationError("Invalid cursor")
+
+    def encode_cursor(self, row, reverse):
+        payload = {'c': row['created_at'].isoformat(), 'i': row['id'], 'r': int(reverse)}
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('ascii'))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
@@ -0,0 +1,117 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict
+from django.conf import settings
+from .utils import analyze_string, analyze_strings
+from . import metrics
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def pool_size():
+    """Processes in each web worker's pool: ANALYZER_PROCESS_WORKERS, or its share of the CPUs.
+
+    Every web worker process starts its own pool, so by default the CPUs are
+    split between the ANALYZER_WEB_WORKERS of them (at most 4 each) instead of
+    each starting min(4, cpus) processes.
+    """
+    if settings.ANALYZER_PROCESS_WORKERS:
+        return settings.ANALYZER_PROCESS_WORKERS
+    return min(4, max(1, (os.cpu_count() or 1) // max(1, settings.ANALYZER_WEB_WORKERS)))
+
+
+def get_executor():
+    """This web worker's process pool, created on first use.
+
+    It shortens the analysis of one large value by counting its chunks on
+    several cores; a sync worker still waits for the result, so the pool does
+    not let it serve more requests at once.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: the web worker may hold threads and open db connections
+            _executor = ProcessPoolExecutor(max_workers=pool_size(), mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def analyze(input_string: str) -> Dict[str, Any]:
+    """analyze_string, moved to the process pool for values at or above ANALYZER_PARALLEL_THRESHOLD chars."""
+    threshold = settings.ANALYZER_PARALLEL_THRESHOLD
+    if threshold and len(input_string) >= threshold:
+        start = time.perf_counter()
+        result = analyze_large_string(input_string, get_executor())
+        request_metrics = metrics.current()
+        if request_metrics is not None:
+            request_metrics.add_analysis(len(input_string), time.perf_counter() - start)
+        return result
+    return analyze_string(input_string)
+
+
+def analyze_batch(values):
+    """analyze_strings over ``values`` as a list; runs in pool workers (see analyze_file)."""
+    return list(analyze_strings(values))
+
+
+def _count_characters(chunk):
+    return Counter(chunk)
+
+
+def _count_words(chunk):
+    # word count plus whether the chunk starts/ends inside a word, to fix up splits at chunk edges
+    return len(chunk.split()), not chunk[0].isspace(), not chunk[-1].isspace()
+
+
+def _split(value, parts):
+    size = max(1, -(-len(value) // parts))
+    return [value[start:start + size] for start in range(0, len(value), size)]
+
+
+def analyze_large_string(input_string: str, executor, parts: int = 0) -> Dict[str, Any]:
+    """Same result as analyze_string, with counting spread over ``executor``.
+
+    Character counts and word counts run per chunk in the pool and are merged
+    in chunk order (so the frequency map keeps first-occurrence order); the
+    SHA-256 is fed chunk by chunk in this process meanwhile.
+    """
+    parts = parts or getattr(executor, '_max_workers', 1) * 2
+    raw = input_string
+    stripped = raw.strip()
+    normalised = stripped.replace(" ", "").lower()
+
+    normalised_chunks = _split(normalised, parts)
+    count_futures = [executor.submit(_count_characters, chunk) for chunk in normalised_chunks]
+    word_futures = [executor.submit(_count_words, chunk) for chunk in _split(raw, parts)]
+
+    hasher = hashlib.sha256()
+    for chunk in normalised_chunks:
+        hasher.update(chunk.encode('utf-8'))
+    is_palindrome = normalised == normalised[::-1]
+
+    character_frequency_map = Counter()
+    for future in count_futures:
+        character_frequency_map.update(future.result())
+
+    word_count = 0
+    previous_ends_in_word = False
+    for future in word_futures:
+        words, starts_in_word, ends_in_word = future.result()
+        # a word cut by the chunk edge was counted on both sides
+        word_count += words - (1 if previous_ends_in_word and starts_in_word else 0)
+        previous_ends_in_word = ends_in_word
+
+    return {
+        "value": raw,
+        "length": len(stripped),
+        "is_palindrome": is_palindrome,
+        "unique_characters": len(character_frequency_map),
+        "word_count": word_count,
+        "sha256_hash": hasher.hexdigest(),
+        "character_frequency_map": dict(character_frequency_map),
+    }
@@ -0,0 +1,72 @@
+import json
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from .frequency import PackedFrequencyMap
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; JSONRenderer's stdlib path is used without it
+    orjson = None
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Selected with ``?format=ndjson``. Streaming views write their own body;
+    this only renders non-streamed data such as error responses."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return (json.dumps(data, ensure_ascii=False) + '\n').encode(self.charset)
+
+
+class CSVRenderer(NDJSONRenderer):
+    """Selected with ``?format=csv``; errors are still rendered as a JSON line."""
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Prometheus text exposition format; the view hands over the finished text."""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not isinstance(data, str):
+            # error responses
+            data = json.dumps(data, ensure_ascii=False) + '\n'
+        return data.encode(self.charset)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson when it is installed, with byte-identical output.
+
+    orjson writes the same compact, non-ASCII-escaping JSON as DRF's defaults;
+    datetimes and other non-native types still go through DRF's encoder, and
+    U+2028/U+2029 are escaped like JSONRenderer does. Anything orjson cannot
+    encode (e.g. ints beyond 64 bits) and indented output fall back to
+    JSONRenderer. Floats are not guaranteed to match (orjson writes ``1e-5``
+    where ``json`` writes ``1e-05``), so only use it for float-free payloads.
+    """
+    _options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+    _encoder_default = JSONEncoder().default
+
+    def _default(self, obj):
+        if isinstance(obj, PackedFrequencyMap):
+            return obj.decoded()
+        return self._encoder_default(obj)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self._default, option=self._options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # same as JSONRenderer: keep the output valid inside <script> tags / JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
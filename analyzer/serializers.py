@@ -1,5 +1,11 @@
-from rest_framework import serializers
-from .models import AnalyzedString
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .models import AnalyzedString, StringBody, StringCharacter
+from .ingest import build_bodies, build_character_rows, build_instance
+from .signals import strings_created
 from .utils import analyze_string
 
 class AnalyzedStringSerializer(serializers.ModelSerializer):
@@ -14,15 +20,23 @@ class AnalyzedStringSerializer(serializers.ModelSerializer):
             'properties',
         ]
         read_only_fields = ['id', 'created_at', 'properties']
+        # duplicates are caught by the database constraints on INSERT,
+        # so skip the UniqueValidator query DRF would run on every create
+        extra_kwargs = {'value': {'validators': []}}
     def get_properties(self, obj):
         return {
             "length": obj.length,
             "is_palindrome": obj.is_palindrome,
             "unique_characters": obj.unique_characters,
             "word_count": obj.word_count,
-            "character_frequency_map": obj.character_frequency_map,
+            "character_frequency_map": obj.frequency_map,
             "sha256_hash": obj.id,
         }
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if 'value' in data:
+            data['value'] = instance.full_value
+        return data
     def validate_value(self, value):
         if not isinstance(value, str):
             raise serializers.ValidationError("Input must be a string.")
@@ -30,18 +44,170 @@ class AnalyzedStringSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Input string cannot be empty.")
         return value
     def create(self, validated_data):
-        input_string = validated_data['value']
-        analysis_result = analyze_string(input_string)
-        if AnalyzedString.objects.filter(id=analysis_result['sha256_hash']).exists():
+        # the view passes the analysis it already ran via save(analysis=...)
+        analysis_result = validated_data.get('analysis') or analyze_string(validated_data['value'])
+        try:
+            with transaction.atomic():
+                analyzed_string_instance = build_instance(analysis_result)
+                analyzed_string_instance.save(force_insert=True)
+                StringBody.objects.bulk_create(build_bodies([analyzed_string_instance]))
+                StringCharacter.objects.bulk_create(build_character_rows(analysis_result))
+                strings_created.send(
+                    sender=AnalyzedString, ids=[analyzed_string_instance.id], strings=[analyzed_string_instance],
+                )
+        except IntegrityError:
+            # primary key: sha256 of the normalised value;
             # raise a proper ValidationError so the view can catch and format it
             raise serializers.ValidationError("String already exists in the system")
-        analyzed_string_instance = AnalyzedString.objects.create(
-            id=analysis_result['sha256_hash'],
-            value=analysis_result['value'],
-            length=analysis_result['length'],
-            is_palindrome=analysis_result['is_palindrome'],
-            unique_characters=analysis_result['unique_characters'],
-            word_count=analysis_result['word_count'],
-            character_frequency_map=analysis_result['character_frequency_map'],
-        )
-        return analyzed_string_instance
\ No newline at end of file
+        return analyzed_string_instance
+
+
+# columns string_record() reads, for .values()/.values_list() querysets
+STRING_COLUMNS = (
+    'id', 'value', 'body__value', 'created_at', 'length', 'is_palindrome',
+    'unique_characters', 'word_count', 'character_frequency_map', 'character_frequency_packed',
+)
+_created_at_field = serializers.DateTimeField()
+
+
+def datetime_formatter():
+    """``serializers.DateTimeField().to_representation`` with the active timezone looked up once.
+
+    DateTimeField resolves the current timezone on every call, which dominates
+    the cost of rendering a large page; build one formatter per response instead.
+    """
+    if not settings.USE_TZ or (api_settings.DATETIME_FORMAT or '').lower() != ISO_8601:
+        return _created_at_field.to_representation
+    tz = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        if not value or timezone.is_naive(value):
+            return _created_at_field.to_representation(value)
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return format_datetime
+
+
+# names accepted by ?fields=, in output order, and the column each one reads
+TOP_LEVEL_FIELDS = ('id', 'value', 'created_at')
+PROPERTY_FIELDS = ('length', 'is_palindrome', 'unique_characters', 'word_count', 'character_frequency_map', 'sha256_hash')
+FIELD_COLUMNS = {field: field for field in TOP_LEVEL_FIELDS + PROPERTY_FIELDS}
+FIELD_COLUMNS['sha256_hash'] = 'id'
+# fields read from more than one column (see string_value() and frequency_map());
+# the StringBody join is only added when the response includes value
+EXTRA_COLUMNS = {'value': ('body__value',), 'character_frequency_map': ('character_frequency_packed',)}
+
+
+# query params the list endpoints read through parse_fields() and parse_layout()
+RECORD_PARAMS = ('fields', 'exclude', 'layout')
+LAYOUTS = ('rows', 'columnar')
+
+
+def _field_names(raw, param):
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    for name in fields:
+        if name not in FIELD_COLUMNS:
+            raise serializers.ValidationError(f"Invalid field: {name}")
+    if not fields:
+        raise serializers.ValidationError(f"{param} cannot be empty")
+    return set(fields)
+
+
+def parse_fields(params):
+    """The fields selected by ``?fields=`` and ``?exclude=`` (comma-separated), or None for all."""
+    fields = params.get('fields')
+    exclude = params.get('exclude')
+    if fields is None and exclude is None:
+        return None
+    selected = _field_names(fields, 'fields') if fields is not None else set(FIELD_COLUMNS)
+    if exclude is not None:
+        selected -= _field_names(exclude, 'exclude')
+    if not selected:
+        raise serializers.ValidationError("No fields left to return")
+    return selected
+
+
+def parse_layout(params):
+    layout = params.get('layout', 'rows')
+    if layout not in LAYOUTS:
+        raise serializers.ValidationError(f"Invalid layout: {layout}")
+    return layout
+
+
+def record_columns(fields, always=('id', 'created_at')):
+    """Columns to select for ``fields`` (None means all), plus the keyset columns in ``always``."""
+    if fields is None:
+        return STRING_COLUMNS
+    needed = {FIELD_COLUMNS[name] for name in fields} | set(always)
+    needed.update(column for name in fields for column in EXTRA_COLUMNS.get(name, ()))
+    return tuple(column for column in STRING_COLUMNS if column in needed)
+
+
+def string_record(row, fields=None, format_datetime=None):
+    """AnalyzedStringSerializer's output for a ``.values(*STRING_COLUMNS)`` row, without model instances.
+
+    With ``fields`` only those keys are emitted (``properties`` is dropped when
+    none of its keys are asked for); ``row`` then only needs ``record_columns(fields)``.
+    Pass a ``datetime_formatter()`` when rendering many rows.
+    """
+    format_datetime = format_datetime or _created_at_field.to_representation
+    if fields is not None:
+        record = {name: _field_value(row, name, format_datetime) for name in TOP_LEVEL_FIELDS if name in fields}
+        properties = {name: _field_value(row, name, format_datetime) for name in PROPERTY_FIELDS if name in fields}
+        if properties:
+            record['properties'] = properties
+        return record
+    return {
+        'id': row['id'],
+        'value': string_value(row),
+        'created_at': format_datetime(row['created_at']),
+        'properties': {
+            'length': row['length'],
+            'is_palindrome': row['is_palindrome'],
+            'unique_characters': row['unique_characters'],
+            'word_count': row['word_count'],
+            'character_frequency_map': frequency_map(row),
+            'sha256_hash': row['id'],
+        },
+    }
+
+
+def instance_record(instance):
+    """string_record() for a model instance; same output as AnalyzedStringSerializer(instance).data."""
+    row = {column: getattr(instance, column) for column in STRING_COLUMNS if column != 'body__value'}
+    row['value'] = instance.full_value
+    row['body__value'] = None
+    return string_record(row)
+
+
+def page_data(rows, fields=None, layout='rows'):
+    """The ``data`` of a list response: a record per row, or with ``layout='columnar'``
+    one array per field (``properties`` keys flattened), e.g. ``{"id": [...], "length": [...]}``.
+    """
+    format_datetime = datetime_formatter()
+    if layout == 'columnar':
+        names = [name for name in TOP_LEVEL_FIELDS + PROPERTY_FIELDS if fields is None or name in fields]
+        return {name: [_field_value(row, name, format_datetime) for row in rows] for name in names}
+    return [string_record(row, fields, format_datetime) for row in rows]
+
+
+def string_value(row):
+    """A row's value: the StringBody's when the string has one, else the value column."""
+    body = row['body__value']
+    return row['value'] if body is None else body
+
+
+def frequency_map(row):
+    """A row's character frequency map: the packed column when set (a lazy
+    PackedFrequencyMap), else the JSON one."""
+    packed = row['character_frequency_packed']
+    return row['character_frequency_map'] if packed is None else packed
+
+
+def _field_value(row, name, format_datetime):
+    if name == 'character_frequency_map':
+        return frequency_map(row)
+    if name == 'value':
+        return string_value(row)
+    value = row[FIELD_COLUMNS[name]]
+    return format_datetime(value) if name == 'created_at' else value
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Sent inside the write transaction with ``ids``, the sha256 ids of the rows
+# that were inserted or removed, and ``strings``, the AnalyzedString instances
+# themselves. Unlike post_save/post_delete they also cover bulk inserts.
+strings_created = Signal()
+strings_deleted = Signal()
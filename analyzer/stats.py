@@ -0,0 +1,125 @@
+import random
+from collections import Counter
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from .models import AnalyzedString, StatCounter
+
+# Aggregates for GET /stats, kept as (metric, key, shard) -> value rows so a
+# read touches a bounded number of rows however many strings are stored. Lengths and
+# word counts go into power-of-two buckets ("0", "1", "2-3", "4-7", ...). Every write
+# transaction adds to the rows of one random shard of ANALYZER_STAT_SHARDS: the
+# upserts hold row locks until commit, and with a single shard every writer would
+# queue behind the rows every string touches, such as ('strings', '').
+
+UPSERT_BATCH = 300
+
+
+def bucket(n):
+    if n <= 0:
+        return '0'
+    low = 1 << (n.bit_length() - 1)
+    high = 2 * low - 1
+    return str(low) if low == high else f'{low}-{high}'
+
+
+def add_string(deltas, length, is_palindrome, word_count, frequency_map, sign=1):
+    """Add (sign=1) or remove (sign=-1) one string's contribution to ``deltas``."""
+    deltas['strings', ''] += sign
+    deltas['total_length', ''] += sign * length
+    if is_palindrome:
+        deltas['palindromes', ''] += sign
+    deltas['length', bucket(length)] += sign
+    deltas['word_count', bucket(word_count)] += sign
+    for char, count in frequency_map.items():
+        deltas['character', char] += sign * count
+
+
+def apply_deltas(deltas, shard=0):
+    """Add ``deltas`` to the counters of ``shard`` with INSERT ... ON CONFLICT DO UPDATE.
+
+    The increment happens in the database, so concurrent writers never lose
+    updates (PostgreSQL and SQLite >= 3.24).
+    """
+    # sorted, so transactions that do share a shard lock its rows in the same order
+    rows = sorted((metric, key, shard, value) for (metric, key), value in deltas.items() if value)
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    table, metric, key, value = qn(StatCounter._meta.db_table), qn('metric'), qn('key'), qn('value')
+    shard_column = qn('shard')
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH):
+            chunk = rows[start:start + UPSERT_BATCH]
+            placeholders = ', '.join(['(%s, %s, %s, %s)'] * len(chunk))
+            cursor.execute(
+                f'INSERT INTO {table} ({metric}, {key}, {shard_column}, {value}) VALUES {placeholders} '
+                f'ON CONFLICT ({metric}, {key}, {shard_column}) '
+                f'DO UPDATE SET {value} = {table}.{value} + excluded.{value}',
+                [param for row in chunk for param in row],
+            )
+
+
+def _count(strings, sign):
+    deltas = Counter()
+    for s in strings:
+        add_string(deltas, s.length, s.is_palindrome, s.word_count, s.frequency_map, sign)
+    apply_deltas(deltas, shard=random.randrange(settings.ANALYZER_STAT_SHARDS))
+
+
+def count_created(sender, strings, **kwargs):
+    """Receiver for strings_created; runs in the write transaction."""
+    _count(strings, 1)
+
+
+def count_deleted(sender, strings, **kwargs):
+    """Receiver for strings_deleted; runs in the write transaction."""
+    _count(strings, -1)
+
+
+def rebuild(chunk_size=2000):
+    """Recompute every counter from the stored strings. Returns the number of strings."""
+    deltas = Counter()
+    strings = 0
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # hold off writers so no create/delete lands between the scan and the swap
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {connection.ops.quote_name(AnalyzedString._meta.db_table)} IN SHARE MODE')
+        rows = AnalyzedString.objects.values_list(
+            'length', 'is_palindrome', 'word_count', 'character_frequency_map', 'character_frequency_packed',
+        ).iterator(chunk_size=chunk_size)
+        for length, is_palindrome, word_count, frequency_map, packed in rows:
+            add_string(deltas, length, is_palindrome, word_count, frequency_map if packed is None else packed)
+            strings += 1
+        StatCounter.objects.all().delete()
+        apply_deltas(deltas)
+    return strings
+
+
+def _histogram(counters):
+    return {key: counters[key] for key in sorted(counters, key=lambda key: int(key.split('-')[0]))}
+
+
+def total_strings():
+    """Number of stored strings, from the ('strings', '') counter shards."""
+    return StatCounter.objects.filter(metric='strings', key='').aggregate(total=Sum('value'))['total'] or 0
+
+
+def summary():
+    counters = {}
+    totals = StatCounter.objects.values_list('metric', 'key').annotate(total=Sum('value')).exclude(total=0)
+    for metric, key, value in totals:
+        counters.setdefault(metric, {})[key] = value
+    totals = {metric: values.get('', 0) for metric, values in counters.items()}
+    strings = totals.get('strings', 0)
+    characters = counters.get('character', {})
+    return {
+        'total_strings': strings,
+        'palindromes': totals.get('palindromes', 0),
+        'palindrome_ratio': totals.get('palindromes', 0) / strings if strings else 0.0,
+        'average_length': totals.get('total_length', 0) / strings if strings else 0.0,
+        'length_histogram': _histogram(counters.get('length', {})),
+        'word_count_distribution': _histogram(counters.get('word_count', {})),
+        'character_frequency': dict(sorted(characters.items(), key=lambda item: (-item[1], item[0]))),
+    }
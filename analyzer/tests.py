@@ -1,13 +1,40 @@
+import csv
+import datetime
+import decimal
+import hashlib
+import json
+import random
+import string
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from unittest import mock
 from urllib import response
 from django.urls import reverse
-from django.test import TestCase
-from .models import AnalyzedString
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from .models import AnalyzedString, StatCounter, StringBody, StringCharacter
+from . import parallel
+from .parallel import analyze_large_string
+from .utils import analyze_string, analyze_strings
+from .utils import parse_natural_language_query, NaturalLanguageConflictError, NaturalLanguageParseError
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient, APITestCase
+from .renderers import FastJSONRenderer
+from .serializers import datetime_formatter
 
 # Create your tests here.
 class AnalyzedStringModelTest(TestCase):
     def setUp(self):
         self.url = reverse('create-string')
+        caches[settings.ANALYZER_CACHE_ALIAS].clear()
 
     def test_analyzed_string_creation(self):
         response = self.client.post(self.url, {
@@ -21,7 +48,7 @@ class AnalyzedStringModelTest(TestCase):
         self.assertEqual(analyzed_string.is_palindrome, True)
         self.assertEqual(analyzed_string.unique_characters, 4)
         self.assertEqual(analyzed_string.word_count, 2)
-        self.assertEqual(analyzed_string.character_frequency_map["r"], 2)
+        self.assertEqual(analyzed_string.frequency_map["r"], 2)
 
     def test_duplicate_string_creation(self):
         response1 = self.client.post(self.url, {
@@ -33,21 +60,21 @@ class AnalyzedStringModelTest(TestCase):
         }, content_type='application/json')
         # view returns 409 Conflict for duplicate strings
         self.assertEqual(response2.status_code, 409)
-        self.assertIn("String already exists in the system", str(response2.data))
+        self.assertIn("String already exists in the system", str(response2.json()))
     def test_empty_string_creation(self):
         response = self.client.post(self.url, {
             "value": "   ",
         }, content_type='application/json')
         # view returns 422 Unprocessable Entity for empty input
         self.assertEqual(response.status_code, 422)
-        self.assertIn("Input string cannot be empty.", str(response.data))
+        self.assertIn("Input string cannot be empty.", str(response.json()))
     def test_non_string_input(self):
         response = self.client.post(self.url, {
             "value": 12345,
         }, content_type='application/json')
         # view returns 422 Unprocessable Entity for non-string input
         self.assertEqual(response.status_code, 422)
-        self.assertIn("Input must be a string.", str(response.data))
+        self.assertIn("Input must be a string.", str(response.json()))
     def test_retrieve_analyzed_string(self):
         create_response = self.client.post(self.url, {
             "value": "madam",
@@ -56,8 +83,8 @@ class AnalyzedStringModelTest(TestCase):
         retrieve_url = reverse('get-string', args=["madam"])
         retrieve_response = self.client.get(retrieve_url)
         self.assertEqual(retrieve_response.status_code, 200)
-        self.assertEqual(retrieve_response.data['value'], "madam")
-        self.assertEqual(retrieve_response.data['properties']['is_palindrome'], True)
+        self.assertEqual(retrieve_response.json()['value'], "madam")
+        self.assertEqual(retrieve_response.json()['properties']['is_palindrome'], True)
     def test_delete_analyzed_string(self):
         create_response = self.client.post(self.url, {
             "value": "teststring",
@@ -79,9 +106,9 @@ class AnalyzedStringModelTest(TestCase):
             "is_palindrome": True
         })
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data['data']), 2)  
-        self.assertIn("level", [item['value'] for item in response.data['data']])
-        self.assertIn("A man a plan a canal Panama", [item['value'] for item in response.data['data']])
+        self.assertEqual(len(response.json()['data']), 2)  
+        self.assertIn("level", [item['value'] for item in response.json()['data']])
+        self.assertIn("A man a plan a canal Panama", [item['value'] for item in response.json()['data']])
     def test_list_analyzed_strings_with_length_filters(self):
         strings = ["level", "hello world", "A man a plan a canal Panama", "test"]
         list_url = reverse('list-strings')
@@ -94,9 +121,9 @@ class AnalyzedStringModelTest(TestCase):
             "max_length": 35
         })
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data['data']), 3)  
-        self.assertIn("hello world", [item['value'] for item in response.data['data']])
-        self.assertIn("A man a plan a canal Panama", [item['value'] for item in response.data['data']])
+        self.assertEqual(len(response.json()['data']), 3)  
+        self.assertIn("hello world", [item['value'] for item in response.json()['data']])
+        self.assertIn("A man a plan a canal Panama", [item['value'] for item in response.json()['data']])
     def test_list_analyzed_strings_with_invalid_filters(self):
         strings = ["level", "hello world", "A man a plan a canal Panama", "test"]
         list_url = reverse('list-strings')
@@ -109,7 +136,7 @@ class AnalyzedStringModelTest(TestCase):
             "max_length": 10
         })
         self.assertEqual(response.status_code, 400)
-        self.assertIn("min_length cannot be greater than max_length", str(response.data))
+        self.assertIn("min_length cannot be greater than max_length", str(response.json()))
     def test_list_analyzed_strings_with_malformed_filters(self):
         strings = ["level", "hello world", "A man a plan a canal Panama", "test"]
         list_url = reverse('list-strings')
@@ -121,7 +148,7 @@ class AnalyzedStringModelTest(TestCase):
             "is_palindrome": "notabool"
         })
         self.assertEqual(response.status_code, 400)
-        self.assertIn("Invalid boolean for is_palindrome", str(response.data))
+        self.assertIn("Invalid boolean for is_palindrome", str(response.json()))
     def test_list_analyzed_strings_with_malformed_length_integer_filters(self):
         strings = ["level", "hello world", "A man a plan a canal Panama", "test"]
         list_url = reverse('list-strings')
@@ -133,7 +160,7 @@ class AnalyzedStringModelTest(TestCase):
             "min_length": "notanint"
         })
         self.assertEqual(response.status_code, 400)
-        self.assertIn("Invalid integer for min_length", str(response.data))   
+        self.assertIn("Invalid integer for min_length", str(response.json()))   
     def test_list_analyzed_strings_with_malformed_word_count_integer_filters(self):
         strings = ["level", "hello world", "A man a plan a canal Panama", "test"]
         list_url = reverse('list-strings')
@@ -145,7 +172,7 @@ class AnalyzedStringModelTest(TestCase):
             "word_count": "notanint"
         })
         self.assertEqual(response.status_code, 400)
-        self.assertIn("Invalid integer for word_count", str(response.data))
+        self.assertIn("Invalid integer for word_count", str(response.json()))
     def test_list_analyzed_strings_with_malformed_contains_character_filter(self):
         strings = ["level", "hello world", "A man a plan a canal Panama", "test"]
         list_url = reverse('list-strings')
@@ -157,8 +184,8 @@ class AnalyzedStringModelTest(TestCase):
             "contains_character": 123
         })
         self.assertEqual(response.status_code, 200)
-        self.assertIn("[]", str(response.data))
-        self.assertEqual(len(response.data['data']), 0) 
+        self.assertIn("[]", str(response.json()))
+        self.assertEqual(len(response.json()['data']), 0) 
 
     # Natural language filter endpoint tests
     def test_nl_filter_single_word_palindromic(self):
@@ -170,9 +197,9 @@ class AnalyzedStringModelTest(TestCase):
         nl_url = reverse('nl-filter')
         response = self.client.get(nl_url, {"query": "all single word palindromic strings"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data['interpreted_query']['parsed_filters']['word_count'], 1)
-        self.assertTrue(response.data['interpreted_query']['parsed_filters']['is_palindrome'])
-        self.assertGreaterEqual(response.data['count'], 2)
+        self.assertEqual(response.json()['interpreted_query']['parsed_filters']['word_count'], 1)
+        self.assertTrue(response.json()['interpreted_query']['parsed_filters']['is_palindrome'])
+        self.assertGreaterEqual(response.json()['count'], 2)
 
     def test_nl_filter_length_and_contains(self):
         samples = ["abcdefghijklmnopqrstuvwxyz", "short", "zzzzzzzzzzz"]
@@ -182,8 +209,8 @@ class AnalyzedStringModelTest(TestCase):
         nl_url = reverse('nl-filter')
         response = self.client.get(nl_url, {"query": "strings longer than 10 characters"})
         self.assertEqual(response.status_code, 200)
-        self.assertGreaterEqual(response.data['count'], 2)
-        self.assertIn('min_length', response.data['interpreted_query']['parsed_filters'])
+        self.assertGreaterEqual(response.json()['count'], 2)
+        self.assertIn('min_length', response.json()['interpreted_query']['parsed_filters'])
 
     def test_nl_filter_contains_letter_z(self):
         samples = ["amazing", "buzz", "fizz"]
@@ -192,7 +219,7 @@ class AnalyzedStringModelTest(TestCase):
         nl_url = reverse('nl-filter')
         response = self.client.get(nl_url, {"query": "strings containing the letter z"})
         self.assertEqual(response.status_code, 200)
-        self.assertIn('contains_character', response.data['interpreted_query']['parsed_filters'])
+        self.assertIn('contains_character', response.json()['interpreted_query']['parsed_filters'])
 
     def test_nl_filter_unable_to_parse(self):
         nl_url = reverse('nl-filter')
@@ -205,3 +232,1353 @@ class AnalyzedStringModelTest(TestCase):
         # the parser currently won't synthesize conflicting numeric filters except via explicit numbers
         response = self.client.get(nl_url, {"query": "strings longer than 20 and shorter than 10"})
         self.assertEqual(response.status_code, 422)
+
+    # Create path tests
+    def test_create_runs_single_insert_and_no_lookups(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {"value": "single pass"}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        statements = [q['sql'].upper() for q in ctx.captured_queries]
+        self.assertEqual(len([s for s in statements if s.startswith('SELECT')]), 0)
+        self.assertEqual(len([s for s in statements if s.startswith('INSERT INTO "ANALYZER_ANALYZEDSTRING"')]), 1)
+
+    def test_duplicate_hash_with_different_value_returns_conflict(self):
+        response1 = self.client.post(self.url, {"value": "Race car"}, content_type='application/json')
+        self.assertEqual(response1.status_code, 201)
+        # same normalised value, so same sha256 primary key
+        response2 = self.client.post(self.url, {"value": "racecar"}, content_type='application/json')
+        self.assertEqual(response2.status_code, 409)
+        self.assertIn("String already exists in the system", str(response2.json()))
+        self.assertEqual(AnalyzedString.objects.count(), 1)
+
+    # Bulk ingest endpoint tests
+    def test_bulk_create_reports_one_result_per_item(self):
+        self.client.post(self.url, {"value": "existing"}, content_type='application/json')
+        bulk_url = reverse('bulk-create-strings')
+        response = self.client.post(bulk_url, ["level", {"value": "existing"}, "  ", 42, "Level", "new one"], content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        statuses = [item['status'] for item in response.json()['results']]
+        self.assertEqual(statuses, ['created', 'duplicate', 'invalid', 'invalid', 'duplicate', 'created'])
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(response.json()['duplicates'], 2)
+        self.assertEqual(response.json()['invalid'], 2)
+        self.assertEqual(response.json()['results'][2]['error'], 'Input string cannot be empty.')
+        self.assertEqual(response.json()['results'][3]['error'], 'Input must be a string.')
+        self.assertEqual(AnalyzedString.objects.count(), 3)
+
+    def test_bulk_create_accepts_ndjson(self):
+        bulk_url = reverse('bulk-create-strings')
+        body = '"madam"\n{"value": "hello world"}\n\n"rotor"\n'
+        response = self.client.post(bulk_url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 3)
+        self.assertTrue(AnalyzedString.objects.get(value="hello world").word_count == 2)
+
+    def test_bulk_create_uses_one_lookup_query(self):
+        bulk_url = reverse('bulk-create-strings')
+        values = [f"value {i}" for i in range(50)]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(bulk_url, values, content_type='application/json')
+        self.assertEqual(response.json()['created'], 50)
+        statements = [q['sql'].upper() for q in ctx.captured_queries]
+        self.assertEqual(len([s for s in statements if s.startswith('SELECT')]), 1)
+
+    def test_bulk_create_does_not_claim_rows_another_writer_inserted(self):
+        bulk_url = reverse('bulk-create-strings')
+        self.client.post(bulk_url, ["raced", "level"], content_type='application/json')
+        # as if another writer inserted both between the existence check and the INSERT
+        with mock.patch('analyzer.ingest._stored_ids', return_value=set()):
+            response = self.client.post(bulk_url, ["raced", "level", "fresh"], content_type='application/json')
+        self.assertEqual([item['status'] for item in response.json()['results']], ['duplicate', 'duplicate', 'created'])
+        self.assertEqual(self.client.get(reverse('string-stats')).json()['total_strings'], 3)
+        self.assertEqual(StringCharacter.objects.filter(string__value="fresh").count(), 5)
+
+    def test_bulk_create_rejects_non_array_body(self):
+        bulk_url = reverse('bulk-create-strings')
+        response = self.client.post(bulk_url, {"value": "single"}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    # Keyset pagination tests
+    def test_list_paginates_with_cursors(self):
+        strings = ["one", "two", "three", "four", "five"]
+        for s in strings:
+            self.client.post(self.url, {"value": s}, content_type='application/json')
+        list_url = reverse('list-strings')
+        response = self.client.get(list_url, {"limit": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['previous'])
+        seen = [item['value'] for item in response.json()['data']]
+        pages = [response]
+        while response.json()['next']:
+            response = self.client.get(response.json()['next'])
+            self.assertLessEqual(response.json()['count'], 2)
+            seen.extend(item['value'] for item in response.json()['data'])
+            pages.append(response)
+        self.assertEqual(seen, strings)
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(response.json()['filter_applied'], {})
+        # walking back from the last page returns the middle page
+        back = self.client.get(response.json()['previous'])
+        self.assertEqual([item['value'] for item in back.json()['data']], ["three", "four"])
+        self.assertIsNotNone(back.json()['next'])
+
+    def test_list_page_size_is_capped(self):
+        for s in ["one", "two", "three"]:
+            self.client.post(self.url, {"value": s}, content_type='application/json')
+        list_url = reverse('list-strings')
+        with self.settings(ANALYZER_MAX_PAGE_SIZE=2):
+            response = self.client.get(list_url, {"limit": 500})
+        self.assertEqual(response.json()['count'], 2)
+        self.assertIsNotNone(response.json()['next'])
+
+    def test_list_rejects_malformed_cursor(self):
+        response = self.client.get(reverse('list-strings'), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid cursor", str(response.json()))
+
+    def test_nl_filter_is_paginated(self):
+        for s in ["level", "rotor", "kayak"]:
+            self.client.post(self.url, {"value": s}, content_type='application/json')
+        nl_url = reverse('nl-filter')
+        response = self.client.get(nl_url, {"query": "single word palindromes", "limit": 2})
+        self.assertEqual(response.json()['count'], 2)
+        response = self.client.get(response.json()['next'])
+        self.assertEqual([item['value'] for item in response.json()['data']], ["kayak"])
+        self.assertIsNone(response.json()['next'])
+
+    # Character index tests
+    def test_create_writes_character_index(self):
+        self.client.post(self.url, {"value": "Hello World"}, content_type='application/json')
+        analyzed_string = AnalyzedString.objects.get()
+        characters = set(analyzed_string.characters.values_list('character', flat=True))
+        self.assertEqual(characters, set(analyzed_string.frequency_map))
+
+    def test_contains_character_uses_character_index(self):
+        for s in ["amazing", "buzz", "hello", "ZEBRA"]:
+            self.client.post(self.url, {"value": s}, content_type='application/json')
+        self.client.post(reverse('bulk-create-strings'), ["fizz", "plain"], content_type='application/json')
+        list_url = reverse('list-strings')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(list_url, {"contains_character": "Z"})
+        self.assertEqual(sorted(item['value'] for item in response.json()['data']), ["ZEBRA", "amazing", "buzz", "fizz"])
+        self.assertNotIn('LIKE', ctx.captured_queries[-1]['sql'].upper())
+        nl_response = self.client.get(reverse('nl-filter'), {"query": "strings containing the letter z"})
+        self.assertEqual(nl_response.json()['count'], 4)
+
+    def test_contains_substring_falls_back_to_icontains(self):
+        for s in ["hello world", "world peace", "hello"]:
+            self.client.post(self.url, {"value": s}, content_type='application/json')
+        response = self.client.get(reverse('list-strings'), {"contains_character": "O W"})
+        self.assertEqual([item['value'] for item in response.json()['data']], ["hello world"])
+
+    def test_backfill_character_index_command(self):
+        self.client.post(self.url, {"value": "backfill me"}, content_type='application/json')
+        StringCharacter.objects.all().delete()
+        out = StringIO()
+        call_command('backfill_character_index', stdout=out)
+        self.assertIn("Indexed characters for 1 strings.", out.getvalue())
+        self.assertEqual(StringCharacter.objects.count(), len(AnalyzedString.objects.get().frequency_map))
+        call_command('backfill_character_index', stdout=out)
+        self.assertIn("Indexed characters for 0 strings.", out.getvalue())
+
+    # Hash lookup tests
+    def test_retrieve_looks_up_by_primary_key(self):
+        self.client.post(self.url, {"value": "Race car"}, content_type='application/json')
+        retrieve_url = reverse('get-string', args=["Race car"])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(retrieve_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['value'], "Race car")
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('"id" =', ctx.captured_queries[0]['sql'])
+
+    def test_values_named_like_other_endpoints_can_be_retrieved_and_deleted(self):
+        for value in ["bulk", "export", "stats", "bloom-stats", "cache-stats"]:
+            self.client.post(self.url, {"value": value}, content_type='application/json')
+            url = reverse('get-string', args=[value])
+            self.assertEqual(self.client.get(url).json()['value'], value)
+            self.assertEqual(self.client.delete(url).status_code, 204)
+        response = self.client.post(self.url, {"value": "filter-by-natural-language"}, content_type='application/json')
+        hash_url = reverse('get-string-by-hash', args=[response.json()['id']])
+        self.assertEqual(self.client.get(hash_url).json()['value'], "filter-by-natural-language")
+
+    def test_retrieve_requires_exact_value(self):
+        self.client.post(self.url, {"value": "Race car"}, content_type='application/json')
+        # same sha256 as "Race car", but not the stored value
+        response = self.client.get(reverse('get-string', args=["racecar"]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.delete(reverse('get-string', args=["racecar"]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(AnalyzedString.objects.count(), 1)
+
+    def test_retrieve_and_delete_by_hash(self):
+        create_response = self.client.post(self.url, {"value": "by hash"}, content_type='application/json')
+        sha256 = create_response.json()['id']
+        hash_url = reverse('get-string-by-hash', args=[sha256])
+        response = self.client.get(hash_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.client.get(reverse('get-string', args=["by hash"])).json())
+        self.assertEqual(self.client.delete(hash_url).status_code, 204)
+        self.assertEqual(self.client.get(hash_url).status_code, 404)
+    # Response cache tests
+    def test_retrieve_is_cached_until_delete(self):
+        self.client.post(self.url, {"value": "cached"}, content_type='application/json')
+        retrieve_url = reverse('get-string', args=["cached"])
+        self.assertEqual(self.client.get(retrieve_url)['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(retrieve_url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['value'], "cached")
+        self.assertEqual(ctx.captured_queries, [])
+        # the by-hash route shares the entry
+        hash_response = self.client.get(reverse('get-string-by-hash', args=[response.json()['id']]))
+        self.assertEqual(hash_response['X-Cache'], 'HIT')
+        self.assertEqual(self.client.delete(retrieve_url).status_code, 204)
+        self.assertEqual(self.client.get(retrieve_url).status_code, 404)
+
+    def test_creates_keep_retrieve_entries_and_deletes_drop_them(self):
+        from .cache import get_cache, string_key
+        self.client.post(self.url, {"value": "kept"}, content_type='application/json')
+        retrieve_url = reverse('get-string', args=["kept"])
+        list_url = reverse('list-strings')
+        for url in (retrieve_url, list_url):
+            self.client.get(url)
+        self.client.post(self.url, {"value": "another"}, content_type='application/json')
+        # rows never change once stored: only the list has to be read again
+        self.assertEqual(self.client.get(retrieve_url)['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(list_url)['X-Cache'], 'MISS')
+
+        key = string_key(hashlib.sha256(b'kept').hexdigest())
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.delete(retrieve_url)
+        self.assertIsNone(get_cache().get(key))
+        # a read that repopulated the entry before the delete committed
+        self.client.get(reverse('get-string', args=["another"]))
+        get_cache().set(key, {'value': 'kept'})
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(get_cache().get(key))
+
+    def test_list_cache_is_invalidated_by_writes(self):
+        self.client.post(self.url, {"value": "level"}, content_type='application/json')
+        list_url = reverse('list-strings')
+        self.assertEqual(self.client.get(list_url, {"is_palindrome": "true"})['X-Cache'], 'MISS')
+        response = self.client.get(list_url, {"is_palindrome": "true"})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['count'], 1)
+        self.client.post(reverse('bulk-create-strings'), ["rotor"], content_type='application/json')
+        response = self.client.get(list_url, {"is_palindrome": "true"})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['count'], 2)
+        self.client.delete(reverse('get-string', args=["level"]))
+        self.assertEqual(self.client.get(list_url, {"is_palindrome": "true"}).json()['count'], 1)
+
+    def test_nl_filter_is_cached_and_counted(self):
+        self.client.post(self.url, {"value": "level"}, content_type='application/json')
+        nl_url = reverse('nl-filter')
+        self.client.get(nl_url, {"query": "palindromic strings"})
+        response = self.client.get(nl_url, {"query": "palindromic strings"})
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json()['interpreted_query']['original'], "palindromic strings")
+        stats = self.client.get(reverse('cache-stats')).json()
+        self.assertEqual(stats['backend'], 'LocMemCache')
+        self.assertGreaterEqual(stats['counters']['nl']['hits'], 1)
+        self.assertGreaterEqual(stats['counters']['nl']['misses'], 1)
+    # Conditional GET tests
+    def test_retrieve_returns_not_modified_for_matching_etag(self):
+        self.client.post(self.url, {"value": "etag me"}, content_type='application/json')
+        retrieve_url = reverse('get-string', args=["etag me"])
+        response = self.client.get(retrieve_url)
+        etag = response['ETag']
+        self.assertIn('max-age=', response['Cache-Control'])
+        # once from the cached payload, once from the row
+        for clear_cache in (False, True):
+            if clear_cache:
+                caches[settings.ANALYZER_CACHE_ALIAS].clear()
+            not_modified = self.client.get(retrieve_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(not_modified.status_code, 304)
+            self.assertEqual(not_modified['ETag'], etag)
+            self.assertEqual(not_modified.content, b'')
+        # a deleted and re-created string is a new representation
+        self.client.delete(retrieve_url)
+        self.client.post(self.url, {"value": "etag me"}, content_type='application/json')
+        response = self.client.get(retrieve_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_changes_with_table_state(self):
+        self.client.post(self.url, {"value": "level"}, content_type='application/json')
+        list_url = reverse('list-strings')
+        response = self.client.get(list_url, {"is_palindrome": "true"})
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual(self.client.get(list_url, {"is_palindrome": "true"}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # different filters are a different representation
+        self.assertEqual(self.client.get(list_url, {"is_palindrome": "false"}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.client.post(self.url, {"value": "not a palindrome"}, content_type='application/json')
+        self.assertEqual(self.client.get(list_url, {"is_palindrome": "true"}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_etag_follows_the_cache_generation(self):
+        from .cache import _invalidate
+        self.client.post(self.url, {"value": "level"}, content_type='application/json')
+        list_url = reverse('list-strings')
+        etag = self.client.get(list_url)['ETag']
+        # revalidating a cached list needs no query
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get(list_url)['X-Cache'], 'HIT')
+        # what another worker's write does through a shared cache
+        _invalidate()
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_nl_filter_supports_conditional_get(self):
+        self.client.post(self.url, {"value": "level"}, content_type='application/json')
+        nl_url = reverse('nl-filter')
+        etag = self.client.get(nl_url, {"query": "palindromic strings"})['ETag']
+        response = self.client.get(nl_url, {"query": "palindromic strings"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+    # Streaming export tests
+    def test_export_ndjson_matches_api_records(self):
+        for s in ["level", "hello world", "rotor"]:
+            self.client.post(self.url, {"value": s}, content_type='application/json')
+        response = self.client.get(reverse('export-strings'), {"format": "ndjson", "is_palindrome": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([r['value'] for r in records], ["level", "rotor"])
+        self.assertEqual(records[0], self.client.get(reverse('get-string', args=["level"])).json())
+
+    def test_export_csv(self):
+        self.client.post(self.url, {"value": "hello, world"}, content_type='application/json')
+        response = self.client.get(reverse('export-strings'), {"format": "csv"})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:2], ['id', 'value'])
+        self.assertEqual(rows[1][1], "hello, world")
+        self.assertEqual(json.loads(rows[1][7])['l'], 3)
+
+    def test_export_rejects_unknown_params(self):
+        response = self.client.get(reverse('export-strings'), {"format": "ndjson", "sort": "value"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('export-strings'), {"min_length": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ANALYZER_EXPORT_CHUNK_SIZE=50)
+    def test_export_memory_does_not_grow_with_row_count(self):
+        def peak_while_exporting():
+            tracemalloc.start()
+            response = self.client.get(reverse('export-strings'), {"format": "ndjson"})
+            for _ in response.streaming_content:
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+
+        self.client.post(reverse('bulk-create-strings'), [f"row {i} " * 20 for i in range(300)], content_type='application/json')
+        small = peak_while_exporting()
+        self.client.post(reverse('bulk-create-strings'), [f"more {i} " * 20 for i in range(2700)], content_type='application/json')
+        large = peak_while_exporting()
+        # 10x the rows must not need anywhere near 10x the memory
+        self.assertLess(large, small * 2)
+    @override_settings(ANALYZER_PARALLEL_THRESHOLD=1000, ANALYZER_PROCESS_WORKERS=2)
+    def test_create_large_value_through_process_pool(self):
+        value = "Large value with Ünïcode and words " * 100
+        response = self.client.post(self.url, {"value": value}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        expected = analyze_string(value)
+        self.assertEqual(response.json()['id'], expected['sha256_hash'])
+        self.assertEqual(response.json()['properties']['word_count'], expected['word_count'])
+        self.assertEqual(response.json()['properties']['character_frequency_map'], expected['character_frequency_map'])
+
+    # Aggregate statistics tests
+    def test_stats_follow_creates_and_deletes(self):
+        self.client.post(self.url, {"value": "level"}, content_type='application/json')
+        self.client.post(self.url, {"value": "hello world"}, content_type='application/json')
+        self.client.post(reverse('bulk-create-strings'), ["noon", "abc", "level"], content_type='application/json')
+        self.client.delete(reverse('get-string', args=["abc"]))
+
+        response = self.client.get(reverse('string-stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_strings'], 3)
+        self.assertEqual(response.json()['palindromes'], 2)
+        self.assertAlmostEqual(response.json()['palindrome_ratio'], 2 / 3)
+        self.assertAlmostEqual(response.json()['average_length'], (5 + 11 + 4) / 3)
+        self.assertEqual(response.json()['length_histogram'], {'4-7': 2, '8-15': 1})
+        self.assertEqual(response.json()['word_count_distribution'], {'1': 2, '2-3': 1})
+        self.assertEqual(response.json()['character_frequency']['l'], 5)
+        self.assertNotIn('a', response.json()['character_frequency'])
+        self.assertNotIn('c', response.json()['character_frequency'])
+
+    def test_stats_read_is_a_single_query(self):
+        for value in ["one", "two words", "racecar"]:
+            self.client.post(self.url, {"value": value}, content_type='application/json')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('string-stats'))
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('analyzer_statcounter', ctx.captured_queries[0]['sql'])
+
+    def test_stat_counters_are_sharded_per_write_and_summed_on_read(self):
+        from .stats import total_strings
+        with mock.patch('analyzer.stats.random.randrange', side_effect=[0, 3, 1]):
+            for value in ["one", "level"]:
+                self.client.post(self.url, {"value": value}, content_type='application/json')
+            self.client.delete(reverse('get-string', args=["one"]))
+        shards = dict(StatCounter.objects.filter(metric='strings', key='').values_list('shard', 'value'))
+        self.assertEqual(shards, {0: 1, 3: 1, 1: -1})
+        self.assertEqual(total_strings(), 1)
+        stats = self.client.get(reverse('string-stats')).json()
+        self.assertEqual(stats['total_strings'], 1)
+        self.assertEqual(stats['length_histogram'], {'4-7': 1})
+        self.assertEqual(stats['character_frequency'], {'l': 2, 'e': 2, 'v': 1})
+
+    def test_admin_is_read_only_and_deletes_through_strings_deleted(self):
+        from django.contrib.auth.models import User
+        for value in ["admin me", "keep"]:
+            self.client.post(self.url, {"value": value}, content_type='application/json')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.assertEqual(self.client.get(reverse('admin:analyzer_analyzedstring_add')).status_code, 403)
+        sha256 = AnalyzedString.objects.get(value="admin me").pk
+        change_url = reverse('admin:analyzer_analyzedstring_change', args=[sha256])
+        self.assertEqual(self.client.get(change_url).status_code, 200)
+        self.assertEqual(self.client.post(change_url, {'value': 'edited'}).status_code, 403)
+
+        response = self.client.post(reverse('admin:analyzer_analyzedstring_changelist'), {
+            'action': 'delete_selected', '_selected_action': [sha256], 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(AnalyzedString.objects.filter(pk=sha256).exists())
+        self.assertEqual(self.client.get(reverse('string-stats')).json()['total_strings'], 1)
+        self.assertEqual(self.client.get(reverse('list-strings')).json()['count'], 1)
+
+        sha256 = AnalyzedString.objects.get().pk
+        self.client.post(reverse('admin:analyzer_analyzedstring_delete', args=[sha256]), {'post': 'yes'})
+        self.assertEqual(self.client.get(reverse('string-stats')).json()['total_strings'], 0)
+        self.assertFalse(StringCharacter.objects.exists())
+
+    def test_rebuild_stats_command(self):
+        for value in ["madam", "two words", "xyz"]:
+            self.client.post(self.url, {"value": value}, content_type='application/json')
+        expected = self.client.get(reverse('string-stats')).json()
+        StatCounter.objects.all().delete()
+        StatCounter.objects.create(metric='strings', key='', value=99)
+        out = StringIO()
+        call_command('rebuild_stats', stdout=out)
+        self.assertIn("3 strings", out.getvalue())
+        self.assertEqual(self.client.get(reverse('string-stats')).json(), expected)
+
+
+    # Single-evaluation list tests
+    def test_list_runs_one_page_query(self):
+        for value in ["level", "hello world", "noon"]:
+            self.client.post(self.url, {"value": value}, content_type='application/json')
+        list_url = reverse('list-strings')
+        self.client.get(list_url, {'is_palindrome': 'true'})
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(list_url, {'is_palindrome': 'true', 'limit': 5})
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('is_palindrome', ctx.captured_queries[0]['sql'])
+        self.assertNotIn('COUNT(', ctx.captured_queries[0]['sql'].upper())
+
+    def test_list_rejects_bad_params_without_queries(self):
+        list_url = reverse('list-strings')
+        for params in [{'bogus': '1'}, {'min_length': 'x'}, {'limit': 'x'}, {'cursor': 'x'}, {'fields': 'id,nope'}]:
+            with self.subTest(params=params), CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(list_url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(ctx.captured_queries, [])
+
+    def test_list_fields_limit_selected_columns(self):
+        self.client.post(self.url, {"value": "Race car"}, content_type='application/json')
+        list_url = reverse('list-strings')
+        self.client.get(list_url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(list_url, {'fields': 'value,length'})
+        self.assertEqual(response.json()['data'], [{'value': 'Race car', 'properties': {'length': 8}}])
+        self.assertNotIn('character_frequency_map', ctx.captured_queries[-1]['sql'])
+
+        response = self.client.get(list_url, {'fields': 'id,character_frequency_map'})
+        item = response.json()['data'][0]
+        self.assertEqual(set(item), {'id', 'properties'})
+        self.assertEqual(item['properties'], {'character_frequency_map': {'r': 2, 'a': 2, 'c': 2, 'e': 1}})
+
+    def test_nl_filter_accepts_fields(self):
+        self.client.post(self.url, {"value": "madam"}, content_type='application/json')
+        response = self.client.get(reverse('nl-filter'), {'query': 'palindromes', 'fields': 'value'})
+        self.assertEqual(response.json()['data'], [{'value': 'madam'}])
+
+
+    # Sparse fieldset and columnar layout tests
+    def test_list_exclude_drops_fields_and_columns(self):
+        self.client.post(self.url, {"value": "noon"}, content_type='application/json')
+        list_url = reverse('list-strings')
+        self.client.get(list_url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(list_url, {'exclude': 'character_frequency_map,created_at'})
+        item = response.json()['data'][0]
+        self.assertEqual(set(item), {'id', 'value', 'properties'})
+        self.assertNotIn('character_frequency_map', item['properties'])
+        self.assertEqual(item['properties']['sha256_hash'], item['id'])
+        self.assertNotIn('character_frequency_map', ctx.captured_queries[-1]['sql'])
+
+        response = self.client.get(list_url, {'fields': 'id,value', 'exclude': 'id'})
+        self.assertEqual(response.json()['data'], [{'value': 'noon'}])
+        response = self.client.get(list_url, {'fields': 'id', 'exclude': 'id'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_columnar_layout(self):
+        for value in ["level", "hello world"]:
+            self.client.post(self.url, {"value": value}, content_type='application/json')
+        list_url = reverse('list-strings')
+        rows = self.client.get(list_url).json()['data']
+        response = self.client.get(list_url, {'layout': 'columnar', 'fields': 'value,word_count'})
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(response.json()['data'], {'value': ['level', 'hello world'], 'word_count': [1, 2]})
+
+        columns = self.client.get(list_url, {'layout': 'columnar'}).json()['data']
+        self.assertEqual(list(columns)[:3], ['id', 'value', 'created_at'])
+        self.assertEqual(columns['created_at'], [row['created_at'] for row in rows])
+        self.assertEqual(columns['character_frequency_map'], [row['properties']['character_frequency_map'] for row in rows])
+
+        response = self.client.get(list_url, {'layout': 'tabular'})
+        self.assertEqual(response.status_code, 400)
+
+
+    # Duplicate-check Bloom filter tests
+    @override_settings(ANALYZER_BLOOM_ENABLED=True, ANALYZER_BLOOM_MIN_CAPACITY=1000)
+    def test_bloom_filter_short_circuits_resubmissions(self):
+        from . import bloom
+        bloom.reset()
+        self.addCleanup(bloom.reset)
+        # build in the request thread instead of a background one
+        self.enterContext(mock.patch('analyzer.bloom._start_rebuild', bloom._rebuild))
+        self.client.post(self.url, {"value": "stored before"}, content_type='application/json')
+
+        # a definite miss goes straight to INSERT with no existence check
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {"value": "brand new"}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(any(q['sql'].startswith('SELECT 1') for q in ctx.captured_queries))
+
+        # a resubmission is confirmed by primary key and never analyzed or inserted
+        with mock.patch('analyzer.views.parallel.analyze') as analyze, CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {"value": "Brand New"}, content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json(), {'error': 'String already exists in the system'})
+        analyze.assert_not_called()
+        self.assertFalse(any('INSERT' in q['sql'] for q in ctx.captured_queries))
+
+        stats = self.client.get(reverse('bloom-stats')).json()
+        self.assertEqual(stats['builds'], 1)
+        self.assertEqual(stats['items'], 2)
+        self.assertEqual(stats['confirmed_hits'], 1)
+        self.assertGreaterEqual(stats['definite_misses'], 1)
+        self.assertLessEqual(stats['bytes'], 16 * 1024 * 1024)
+
+    @override_settings(ANALYZER_BLOOM_ENABLED=True, ANALYZER_BLOOM_REBUILD_AFTER_DELETES=1)
+    def test_bloom_filter_rebuilds_after_deletes(self):
+        from . import bloom
+        bloom.reset()
+        self.addCleanup(bloom.reset)
+        self.enterContext(mock.patch('analyzer.bloom._start_rebuild', bloom._rebuild))
+        self.client.post(self.url, {"value": "short lived"}, content_type='application/json')
+        self.client.delete(reverse('get-string', args=["short lived"]))
+        response = self.client.post(self.url, {"value": "short lived"}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        stats = bloom.stats()
+        self.assertEqual(stats['builds'], 2)
+        self.assertEqual(stats['false_positives'], 0)
+
+    def test_create_does_not_hash_for_a_disabled_bloom_filter(self):
+        with mock.patch('analyzer.bloom.hash_string') as hash_for_bloom:
+            response = self.client.post(self.url, {"value": "not hashed twice"}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        hash_for_bloom.assert_not_called()
+
+    @override_settings(ANALYZER_BLOOM_ENABLED=True, ANALYZER_BLOOM_REBUILD_AFTER_DELETES=1)
+    def test_bloom_filter_rebuilds_once_without_blocking_requests(self):
+        from . import bloom
+        from .utils import hash_string
+        bloom.reset()
+        self.addCleanup(bloom.reset)
+        with mock.patch('analyzer.bloom._start_rebuild') as start:
+            # no filter until the first build finishes: requests fall back to the primary key
+            response = self.client.post(self.url, {"value": "before the build"}, content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+            response = self.client.post(self.url, {"value": "before the build"}, content_type='application/json')
+            self.assertEqual(response.status_code, 409)
+            self.assertIsNone(bloom.get_filter())
+        start.assert_called_once()
+
+        bloom._rebuild()
+        old = bloom.get_filter()
+        self.assertIn(hash_string("before the build"), old)
+        bloom.count_deleted(AnalyzedString, ids=[hash_string("before the build")])
+        with mock.patch('analyzer.bloom._start_rebuild') as start:
+            # a stale filter keeps serving until its replacement is ready
+            self.assertIs(bloom.get_filter(), old)
+            self.assertIs(bloom.get_filter(), old)
+        start.assert_called_once()
+
+
+    # Packed character_frequency_map tests
+    def test_packed_frequency_maps_render_identically(self):
+        values = ["Hello World", "ünïcödé 東京 text", "a" * 70000 + "b"]
+        for value in values[:2]:
+            self.client.post(self.url, {"value": value}, content_type='application/json')
+        with override_settings(ANALYZER_PACKED_FREQUENCY_MAPS=True):
+            self.client.post(self.url, {"value": values[2]}, content_type='application/json')
+            self.client.post(self.url, {"value": "level up"}, content_type='application/json')
+        row = AnalyzedString.objects.values('character_frequency_map', 'character_frequency_packed').get(value="level up")
+        self.assertIsNone(row['character_frequency_map'])
+        self.assertEqual(row['character_frequency_packed'], {'l': 2, 'e': 2, 'v': 1, 'u': 1, 'p': 1})
+
+        caches[settings.ANALYZER_CACHE_ALIAS].clear()
+        mixed = self.client.get(reverse('list-strings')).content
+        detail = self.client.get(reverse('get-string', args=[values[2]])).json()
+        self.assertEqual(detail['properties']['character_frequency_map'], {'a': 70000, 'b': 1})
+
+        call_command('pack_frequency_maps', stdout=StringIO())
+        self.assertFalse(AnalyzedString.objects.filter(character_frequency_map__isnull=False).exists())
+        caches[settings.ANALYZER_CACHE_ALIAS].clear()
+        self.assertEqual(self.client.get(reverse('list-strings')).content, mixed)
+
+        call_command('pack_frequency_maps', unpack=True, stdout=StringIO())
+        self.assertFalse(AnalyzedString.objects.filter(character_frequency_packed__isnull=False).exists())
+        caches[settings.ANALYZER_CACHE_ALIAS].clear()
+        self.assertEqual(self.client.get(reverse('list-strings')).content, mixed)
+
+    @override_settings(ANALYZER_PACKED_FREQUENCY_MAPS=True)
+    def test_packed_frequency_maps_feed_stats_export_and_filters(self):
+        self.client.post(self.url, {"value": "zebra"}, content_type='application/json')
+        self.client.post(self.url, {"value": "racecar"}, content_type='application/json')
+        self.assertEqual(self.client.get(reverse('string-stats')).json()['character_frequency']['r'], 3)
+        self.assertEqual(self.client.get(reverse('list-strings'), {'contains_character': 'z'}).json()['count'], 1)
+
+        response = self.client.get(reverse('export-strings'), {'format': 'ndjson'})
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(records[1]['properties']['character_frequency_map'], {'r': 2, 'a': 2, 'c': 2, 'e': 1})
+
+        self.client.delete(reverse('get-string', args=["racecar"]))
+        self.assertEqual(self.client.get(reverse('string-stats')).json()['character_frequency']['r'], 1)
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(self.client.get(reverse('string-stats')).json()['character_frequency']['r'], 1)
+
+    def test_pack_round_trips_and_is_smaller(self):
+        from .frequency import PackedFrequencyMap, pack, unpack
+        import pickle
+        for mapping in ({'a': 1}, {'z': 300, 'é': 2}, {'東': 1, '😀': 70000}, {}):
+            packed = pack(mapping)
+            self.assertEqual(list(unpack(packed).items()), list(mapping.items()))
+        ascii_map = analyze_string("The quick brown fox jumps over the lazy dog")['character_frequency_map']
+        # JSONField stores json.dumps() output
+        self.assertLess(len(pack(ascii_map)) * 3, len(json.dumps(ascii_map)))
+        lazy = PackedFrequencyMap(pack(ascii_map))
+        self.assertIsNone(lazy._decoded)
+        self.assertEqual(pickle.loads(pickle.dumps(lazy)).packed, lazy.packed)
+        self.assertEqual(lazy, ascii_map)
+
+
+    @override_settings(ANALYZER_BODY_THRESHOLD=100)
+    def test_long_values_keep_a_prefix_and_a_string_body(self):
+        long_value = "the quick brown fox " * 10 + "zebra tail"
+        response = self.client.post(self.url, {"value": long_value}, content_type='application/json')
+        self.assertEqual(response.json()['value'], long_value)
+        bulk = self.client.post(reverse('bulk-create-strings'), ["short one", long_value + "!"], content_type='application/json')
+        self.assertEqual(bulk.json()['created'], 2)
+
+        instance = AnalyzedString.objects.get(pk=response.json()['id'])
+        self.assertTrue(instance.has_body)
+        self.assertEqual(instance.value, long_value[:64])
+        self.assertEqual(instance.full_value, long_value)
+        self.assertEqual(str(instance), long_value[:50] + "...")
+        self.assertEqual(StringBody.objects.count(), 2)
+        self.assertFalse(AnalyzedString.objects.get(value="short one").has_body)
+
+        self.assertEqual(self.client.get(reverse('get-string', args=[long_value])).json()['value'], long_value)
+        self.assertEqual(self.client.get(reverse('get-string', args=[long_value[:64]])).status_code, 404)
+        listed = self.client.get(reverse('list-strings'), {'min_length': 100}).json()['data']
+        self.assertEqual({record['value'] for record in listed}, {long_value, long_value + "!"})
+        # text past the stored prefix is still searchable
+        self.assertEqual(AnalyzedString.objects.containing('zebra tail').count(), 2)
+
+        response = self.client.get(reverse('export-strings'), {'format': 'ndjson'})
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(records[0]['value'], long_value)
+
+        self.client.delete(reverse('get-string', args=[long_value]))
+        self.assertEqual(StringBody.objects.count(), 1)
+
+    @override_settings(ANALYZER_BODY_THRESHOLD=10)
+    def test_thresholds_below_the_prefix_length_do_not_store_values_twice(self):
+        from .ingest import build_instance
+        instance = build_instance(analyze_string("x" * 64))
+        self.assertFalse(instance.has_body)
+        self.assertFalse(hasattr(instance, 'body'))
+        self.assertTrue(build_instance(analyze_string("x" * 65)).has_body)
+
+    def test_string_body_is_only_read_when_value_is_returned(self):
+        from .serializers import record_columns
+        self.assertNotIn('body__value', record_columns({'id', 'length', 'word_count'}))
+        self.assertIn('body__value', record_columns({'value'}))
+        self.assertNotIn('analyzer_stringbody', str(AnalyzedString.objects.values(*record_columns({'id'})).query))
+
+    def test_move_string_bodies_round_trips(self):
+        long_value = "x" * 300
+        for value in ("short", long_value):
+            self.client.post(self.url, {"value": value}, content_type='application/json')
+        before = self.client.get(reverse('list-strings')).content
+
+        call_command('move_string_bodies', threshold=100, stdout=StringIO())
+        self.assertEqual(list(AnalyzedString.objects.filter(has_body=True).values_list('value', flat=True)), ["x" * 64])
+        self.assertEqual(StringBody.objects.get().value, long_value)
+        caches[settings.ANALYZER_CACHE_ALIAS].clear()
+        self.assertEqual(self.client.get(reverse('list-strings')).content, before)
+
+        call_command('move_string_bodies', inline=True, stdout=StringIO())
+        self.assertFalse(StringBody.objects.exists())
+        self.assertEqual(AnalyzedString.objects.get(has_body=False, length=300).value, long_value)
+
+
+@override_settings(ANALYZER_PACKED_FREQUENCY_MAPS=True)
+class PackedFrequencyMapsModelTest(AnalyzedStringModelTest):
+    """The API tests again, with new strings storing their frequency maps packed."""
+
+    def test_new_strings_are_stored_packed(self):
+        self.client.post(self.url, {"value": "packed"}, content_type='application/json')
+        row = AnalyzedString.objects.values('character_frequency_map', 'character_frequency_packed').get()
+        self.assertIsNone(row['character_frequency_map'])
+        self.assertIsNotNone(row['character_frequency_packed'])
+
+
+class AsyncApiTest(AnalyzedStringModelTest):
+    """The API tests again, with the async views routed (ANALYZER_ASYNC_VIEWS)."""
+
+    @classmethod
+    def setUpClass(cls):
+        # registered first so it runs last, once the setting is restored
+        cls.addClassCleanup(cls.reload_urls)
+        cls.enterClassContext(override_settings(ANALYZER_ASYNC_VIEWS=True))
+        cls.reload_urls()
+        super().setUpClass()
+
+    @staticmethod
+    def reload_urls():
+        import importlib
+        from django.urls import clear_url_caches
+        import string_analyzer.urls
+        from . import urls
+        importlib.reload(urls)
+        importlib.reload(string_analyzer.urls)
+        clear_url_caches()
+
+    def test_async_views_are_routed(self):
+        from django.urls import resolve
+        self.assertEqual(resolve(reverse('list-strings')).func.view_class.__module__, 'analyzer.async_views')
+
+
+class QueryPlanTest(TestCase):
+    """EXPLAIN the common list filter combinations and fail on full-table scans."""
+
+    def plan(self, qs):
+        if connection.vendor == 'postgresql':
+            # tiny test tables always favour a seq scan; disable it so only a missing index falls back to one
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return qs.explain()
+
+    def assertUsesIndex(self, qs):
+        plan = self.plan(qs)
+        table = AnalyzedString._meta.db_table
+        if connection.vendor == 'sqlite':
+            full_scans = [line for line in plan.splitlines() if line.rstrip().endswith(f'SCAN {table}')]
+            self.assertEqual(full_scans, [], plan)
+        elif connection.vendor == 'postgresql':
+            self.assertNotIn(f'Seq Scan on {table}', plan)
+        else:
+            self.skipTest(f'No plan check for {connection.vendor}')
+
+    def test_common_filter_combinations_use_indexes(self):
+        qs = AnalyzedString.objects.all()
+        combinations = [
+            qs.filter(is_palindrome=True),
+            qs.filter(is_palindrome=False, length__gte=5, length__lte=20),
+            qs.filter(length__gte=10),
+            qs.filter(length__gte=5, length__lte=20),
+            qs.filter(word_count=1),
+            qs.filter(word_count=2, length__gte=5),
+            qs.containing('z'),
+        ]
+        for combination in combinations:
+            with self.subTest(query=str(combination.query)):
+                self.assertUsesIndex(combination)
+
+    def test_keyset_page_uses_created_at_index(self):
+        page = AnalyzedString.objects.order_by('created_at', 'id')[:100]
+        self.assertUsesIndex(page)
+        plan = self.plan(page)
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+
+def reference_analyze_string(input_string):
+    """analyze_string as first written: the oracle for the optimised version."""
+    raw = input_string
+    normalised = raw.strip().replace(" ", "").lower()
+    character_frequency_map = {}
+    for char in normalised:
+        if char in character_frequency_map:
+            character_frequency_map[char] += 1
+        else:
+            character_frequency_map[char] = 1
+    return {
+        "value": raw,
+        "length": len(raw.strip()),
+        "is_palindrome": normalised == normalised[::-1],
+        "unique_characters": len(set(normalised)),
+        "word_count": len(raw.split()),
+        "sha256_hash": hashlib.sha256(normalised.encode('utf-8')).hexdigest(),
+        "character_frequency_map": character_frequency_map,
+    }
+
+
+class AnalyzeStringEquivalenceTest(SimpleTestCase):
+    """Property-style check: random inputs must analyze exactly like the reference."""
+    alphabets = [
+        string.ascii_letters + string.digits + string.punctuation,
+        ' \t\n\r\x0b\x0c  ',
+        'ÀÉÎõüßİıΣσςĲǅﬁ',
+        'пример文字🙂́‍',
+    ]
+
+    def random_strings(self, count, seed=2024):
+        rng = random.Random(seed)
+        for _ in range(count):
+            alphabet = ''.join(rng.sample(self.alphabets, rng.randint(1, len(self.alphabets))))
+            yield ''.join(rng.choice(alphabet) for _ in range(rng.choice([0, 1, 2, 5, 30, 500])))
+
+    def assertSameAnalysis(self, actual, expected):
+        self.assertEqual(actual, expected)
+        self.assertEqual(list(actual), list(expected))
+        self.assertEqual(list(actual['character_frequency_map']), list(expected['character_frequency_map']))
+        self.assertIs(type(actual['character_frequency_map']), dict)
+
+    def test_matches_reference_on_random_inputs(self):
+        for value in self.random_strings(1000):
+            with self.subTest(value=value):
+                self.assertSameAnalysis(analyze_string(value), reference_analyze_string(value))
+
+    def test_matches_reference_on_edge_cases(self):
+        for value in ["", " ", "A man a plan a canal Panama", "ΟΔΟΣ", "Straße", "İstanbul", "áa", "  x  "]:
+            with self.subTest(value=value):
+                self.assertSameAnalysis(analyze_string(value), reference_analyze_string(value))
+
+    def test_batch_matches_single(self):
+        values = list(self.random_strings(200, seed=7))
+        values += values[:50]
+        batch = list(analyze_strings(values, memo_size=16))
+        self.assertEqual(len(batch), len(values))
+        for value, result in zip(values, batch):
+            self.assertSameAnalysis(result, reference_analyze_string(value))
+
+
+def reference_parse_filters(query):
+    """parse_natural_language_query's filter rules as first written, for the compiled parser."""
+    import re
+    q = query.lower()
+    parsed = {}
+    if 'single word' in q or 'one word' in q or 'single-word' in q:
+        parsed['word_count'] = 1
+    if 'palindrom' in q:
+        parsed['is_palindrome'] = True
+    m = re.search(r'longer than (\d+)', q)
+    if m:
+        parsed['min_length'] = int(m.group(1)) + 1
+    m = re.search(r'shorter than (\d+)', q)
+    if m:
+        n = int(m.group(1))
+        parsed['max_length'] = n - 1 if n > 0 else 0
+    m = re.search(r'at least (\d+)', q)
+    if m:
+        parsed['min_length'] = int(m.group(1))
+    m = re.search(r'more than (\d+) characters', q)
+    if m:
+        parsed['min_length'] = int(m.group(1)) + 1
+    m = re.search(r'contains(?: the)? (?:letter |char |character )?([a-z])', q)
+    if m:
+        parsed['contains_character'] = m.group(1)
+    if 'first vowel' in q:
+        parsed['contains_character'] = 'a'
+    m = re.search(r'containing the letter ([a-z])', q)
+    if m:
+        parsed['contains_character'] = m.group(1)
+    return parsed
+
+
+class NaturalLanguageParserEquivalenceTest(SimpleTestCase):
+    corpus = [
+        'all single word palindromic strings',
+        'strings longer than 10 characters',
+        'palindromic strings that contain the first vowel',
+        'strings containing the letter z',
+        'Single-Word strings shorter than 0',
+        'one word strings at least 3 long and longer than 7',
+        'more than 4 characters, contains the letter q, containing the letter r',
+        'contains palindromes',
+        'contains the character x first vowel',
+        'longer than 5 longer than 9 shorter than 3 shorter than 20',
+        'CONTAINS CHAR B',
+        'strings with no recognisable filters',
+        'contains 7',
+        'shorter than ٣',
+    ]
+    fragments = [
+        'single word', 'one word', 'single-word', 'palindrom', 'longer than 4', 'shorter than 12',
+        'at least 2', 'more than 6 characters', 'more than 6', 'contains', 'contains the letter k',
+        'contains char', 'first vowel', 'containing the letter m', 'strings', 'the', ' ', '-',
+    ]
+
+    def assertParsesLikeReference(self, query):
+        expected = reference_parse_filters(query)
+        try:
+            parsed = parse_natural_language_query(query)['parsed_filters']
+        except NaturalLanguageParseError:
+            self.assertEqual(expected, {})
+        except NaturalLanguageConflictError:
+            self.assertGreater(expected['min_length'], expected['max_length'])
+        else:
+            self.assertEqual(parsed, expected)
+            self.assertEqual(list(parsed), list(expected))
+
+    def test_corpus_matches_reference(self):
+        for query in self.corpus:
+            with self.subTest(query=query):
+                self.assertParsesLikeReference(query)
+
+    def test_random_queries_match_reference(self):
+        rng = random.Random(5)
+        for _ in range(2000):
+            query = ' '.join(rng.choice(self.fragments) for _ in range(rng.randint(1, 6)))
+            if rng.random() < 0.3:
+                query = query.upper()
+            with self.subTest(query=query):
+                self.assertParsesLikeReference(query)
+
+    def test_cached_results_are_independent(self):
+        first = parse_natural_language_query('single word palindromes')
+        first['parsed_filters']['word_count'] = 99
+        second = parse_natural_language_query('SINGLE WORD palindromes')
+        self.assertEqual(second['parsed_filters'], {'word_count': 1, 'is_palindrome': True})
+        self.assertEqual(second['original'], 'SINGLE WORD palindromes')
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    samples = [
+        {'value': 'line\u2028sep\u2029para', 'emoji': '🙂', 'quote': '"\\/', 'control': '\x00\x1f'},
+        {'created_at': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)},
+        {'nested': [{'a': 1}, (2, 3), None, True, False], 'decimal': decimal.Decimal('1.5')},
+        {1: 'int key', 'big': 2 ** 70},
+        [ErrorDetail('bad', code='invalid')],
+        {},
+    ]
+
+    def test_matches_drf_json_renderer(self):
+        for data in self.samples:
+            with self.subTest(data=data):
+                self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch('analyzer.renderers.orjson', None):
+            for data in self.samples:
+                self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class FastPathSerializationTest(TestCase):
+    def test_records_match_model_serializer_bytes(self):
+        from .serializers import AnalyzedStringSerializer, STRING_COLUMNS, instance_record, page_data, string_record
+        for value in ["Race car", "ΟΔΟΣ\u2028x", "  spaced  out  ", "emoji 🙂 é"]:
+            AnalyzedStringSerializer().create({'value': value})
+        instances = list(AnalyzedString.objects.order_by('created_at', 'id'))
+        expected = JSONRenderer().render(AnalyzedStringSerializer(instances, many=True).data)
+        rows = AnalyzedString.objects.order_by('created_at', 'id').values(*STRING_COLUMNS)
+        self.assertEqual(FastJSONRenderer().render([string_record(row) for row in rows]), expected)
+        self.assertEqual(FastJSONRenderer().render([instance_record(i) for i in instances]), expected)
+        self.assertEqual(FastJSONRenderer().render(page_data(rows)), expected)
+
+    def test_datetime_formatter_matches_drf_field(self):
+        field = serializers.DateTimeField()
+        values = [
+            datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2024, 7, 1, 23, 59, 59, 999999, tzinfo=datetime.timezone(datetime.timedelta(hours=-5))),
+            datetime.datetime(2024, 3, 10, 8, 0),
+            None,
+        ]
+        for zone in ['UTC', 'America/New_York', 'Asia/Kolkata']:
+            with timezone.override(zone):
+                format_datetime = datetime_formatter()
+                for value in values:
+                    with self.subTest(zone=zone, value=value):
+                        self.assertEqual(format_datetime(value), field.to_representation(value))
+
+
+class DatabaseSettingsTest(SimpleTestCase):
+    """The env-driven DATABASES block, evaluated in a fresh copy of the settings module."""
+    postgres_env = {
+        'SECRET_KEY': 'x', 'DEBUG': '0', 'PGDATABASE_NAME': 'strings', 'PGDATABASE_USER': 'u',
+        'PGDATABASE_PASSWORD': 'p', 'PGDATABASE_HOST': 'db', 'PGDATABASE_PORT': '5432',
+    }
+
+    def load_settings(self, **env):
+        import runpy
+        from pathlib import Path
+        with mock.patch.dict('os.environ', env, clear=True):
+            return runpy.run_path(str(Path(settings.BASE_DIR) / 'string_analyzer' / 'settings.py'))
+
+    def test_persistent_connections_and_statement_timeout(self):
+        db = self.load_settings(**self.postgres_env, DB_CONN_MAX_AGE='300', DB_STATEMENT_TIMEOUT='5000')['DATABASES']['default']
+        self.assertEqual(db['CONN_MAX_AGE'], 300)
+        self.assertTrue(db['CONN_HEALTH_CHECKS'])
+        self.assertEqual(db['OPTIONS'], {'options': '-c statement_timeout=5000'})
+
+    def test_pool_replaces_persistent_connections(self):
+        db = self.load_settings(**self.postgres_env, DB_POOL='1', DB_POOL_MAX_SIZE='20')['DATABASES']['default']
+        self.assertEqual(db['CONN_MAX_AGE'], 0)
+        self.assertEqual(db['OPTIONS']['pool'], {'min_size': 2, 'max_size': 20, 'timeout': 10})
+
+    def test_sqlite_defaults(self):
+        db = self.load_settings(SECRET_KEY='x', DEBUG='1')['DATABASES']['default']
+        self.assertEqual(db['CONN_MAX_AGE'], 60)
+        self.assertNotIn('OPTIONS', db)
+
+    def test_async_views_close_connections_by_default(self):
+        db = self.load_settings(SECRET_KEY='x', DEBUG='1', ANALYZER_ASYNC_VIEWS='1')['DATABASES']['default']
+        self.assertEqual(db['CONN_MAX_AGE'], 0)
+        db = self.load_settings(**self.postgres_env, ANALYZER_ASYNC_VIEWS='1', DB_CONN_MAX_AGE='30')['DATABASES']['default']
+        self.assertEqual(db['CONN_MAX_AGE'], 30)
+
+
+class ApiProfileTest(SimpleTestCase):
+    """DJANGO_PROFILE=api against the default profile, in fresh copies of the settings module.
+
+    The boot-time and per-request comparison lives in benchmarks/bench_profile.py.
+    """
+    load_settings = DatabaseSettingsTest.load_settings
+
+    def test_api_profile_drops_middleware_and_apps(self):
+        full = self.load_settings(SECRET_KEY='x', DEBUG='1')
+        api = self.load_settings(SECRET_KEY='x', DEBUG='1', DJANGO_PROFILE='api')
+        self.assertEqual(api['MIDDLEWARE'], [
+            'analyzer.middleware.metrics_middleware',
+            'django.middleware.security.SecurityMiddleware',
+            'whitenoise.middleware.WhiteNoiseMiddleware',
+            'corsheaders.middleware.CorsMiddleware',
+            'django.middleware.common.CommonMiddleware',
+        ])
+        self.assertIn('django.middleware.clickjacking.XFrameOptionsMiddleware', full['MIDDLEWARE'])
+        for app in ('django.contrib.admin', 'django.contrib.sessions', 'django.contrib.messages'):
+            self.assertIn(app, full['INSTALLED_APPS'])
+            self.assertNotIn(app, api['INSTALLED_APPS'])
+        self.assertEqual(api['REST_FRAMEWORK']['DEFAULT_RENDERER_CLASSES'], ['rest_framework.renderers.JSONRenderer'])
+        self.assertNotIn('DEFAULT_RENDERER_CLASSES', full['REST_FRAMEWORK'])
+
+
+class BloomFilterTest(SimpleTestCase):
+    def test_no_false_negatives_and_bounded_error_rate(self):
+        from .bloom import BloomFilter
+        bloom = BloomFilter(capacity=5000, error_rate=0.01, max_bytes=1 << 20)
+        stored = [hashlib.sha256(f'stored {i}'.encode()).hexdigest() for i in range(5000)]
+        for sha256 in stored:
+            bloom.add(sha256)
+        self.assertTrue(all(sha256 in bloom for sha256 in stored))
+        probes = [hashlib.sha256(f'probe {i}'.encode()).hexdigest() for i in range(20000)]
+        rate = sum(sha256 in bloom for sha256 in probes) / len(probes)
+        self.assertLess(rate, 0.02)
+        self.assertAlmostEqual(bloom.estimated_error_rate(), 0.01, delta=0.005)
+
+    def test_memory_budget_caps_the_filter(self):
+        from .bloom import BloomFilter
+        bloom = BloomFilter(capacity=1_000_000, error_rate=0.001, max_bytes=1024)
+        self.assertEqual(len(bloom.array), 1024)
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        from . import metrics
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        return response.content.decode()
+
+    def test_requests_are_recorded_per_endpoint(self):
+        self.client.post(reverse('create-string'), {"value": "racecar"}, content_type='application/json')
+        self.client.post(reverse('create-string'), {"value": "racecar"}, content_type='application/json')
+        self.client.get(reverse('list-strings'), {'limit': 5})
+        text = self.scrape()
+        self.assertIn('analyzer_requests_total{endpoint="create-string",method="POST",status="201"} 1', text)
+        self.assertIn('analyzer_requests_total{endpoint="create-string",method="POST",status="409"} 1', text)
+        self.assertIn('analyzer_requests_total{endpoint="list-strings",method="GET",status="200"} 1', text)
+        self.assertIn('analyzer_request_duration_seconds_count{endpoint="list-strings",method="GET"} 1', text)
+        # with the Bloom filter off the duplicate is analyzed too before its INSERT fails
+        self.assertIn('analyzer_analysis_seconds_bucket{length_le="100",le="+Inf"} 2', text)
+        self.assertIn('analyzer_request_serialize_seconds_count{endpoint="list-strings"} 1', text)
+
+    def test_query_counts_match_the_executed_queries(self):
+        self.client.post(reverse('create-string'), {"value": "query count"}, content_type='application/json')
+        caches[settings.ANALYZER_CACHE_ALIAS].clear()
+        with self.assertNumQueries(1):
+            self.client.get(reverse('get-string', args=["query count"]))
+        self.assertIn('analyzer_request_db_queries_sum{endpoint="get-string"} 1.0', self.scrape())
+
+    def test_histogram_buckets_are_cumulative(self):
+        from . import metrics
+        for _ in range(3):
+            self.client.get(reverse('cache-stats'))
+        lines = [
+            line for line in metrics.exposition().splitlines()
+            if line.startswith('analyzer_request_db_queries_bucket{endpoint="cache-stats"')
+        ]
+        counts = [int(line.rsplit(' ', 1)[1]) for line in lines]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[0], 3)  # le="0": no queries
+        self.assertTrue(lines[-1].endswith('le="+Inf"} 3'))
+
+    def test_server_timing_header_is_opt_in(self):
+        response = self.client.get(reverse('cache-stats'))
+        self.assertNotIn('Server-Timing', response)
+        with override_settings(ANALYZER_SERVER_TIMING=True):
+            self.client = self.client_class()
+            response = self.client.post(reverse('create-string'), {"value": "timed"}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="\d+ queries", analysis;dur=[\d.]+, serialize;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+
+    def test_nothing_is_recorded_outside_a_request(self):
+        from . import metrics
+        analyze_string("outside any request")
+        AnalyzedString.objects.count()
+        self.assertNotIn('_count', metrics.exposition())
+
+
+class BenchmarkSuiteTest(SimpleTestCase):
+    def test_synthetic_corpus_is_deterministic_and_distinct(self):
+        from benchmarks.run import synthetic_value
+        from .utils import hash_string
+        values = [synthetic_value(index) for index in range(5000)]
+        self.assertEqual(values, [synthetic_value(index) for index in range(5000)])
+        self.assertEqual(len({hash_string(value) for value in values}), 5000)
+        palindromes = sum(analyze_string(value)['is_palindrome'] for value in values)
+        self.assertTrue(100 < palindromes < 500)
+
+    def test_compare_flags_slowdowns_beyond_the_threshold(self):
+        from benchmarks.run import compare
+        baseline = {'results': {'list/unfiltered': {'p50': 0.010}, 'retrieve': {'p50': 0.002}, 'gone': {'p50': 1}}}
+        current = {'results': {'list/unfiltered': {'p50': 0.014}, 'retrieve': {'p50': 0.0021}, 'new': {'p50': 1}}}
+        rows = {name: regressed for name, _, _, _, regressed in compare(baseline, current, threshold=0.25)}
+        self.assertEqual(rows, {'list/unfiltered': True, 'retrieve': False})
+
+
+class AnalyzeFileCommandTest(TestCase):
+    def write(self, name, text, compress=False):
+        import gzip
+        import os
+        import shutil
+        import tempfile
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, name)
+        with (gzip.open if compress else open)(path, 'wt', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def run_command(self, *paths, **options):
+        out = StringIO()
+        call_command('analyze_file', *paths, stdout=out, **{'workers': 0, **options})
+        return out.getvalue()
+
+    def test_ingests_plain_and_gzip_files(self):
+        plain = self.write('a.txt', 'racecar\nhello world\n\n  \nRacecar\r\n')
+        archive = self.write('b.txt.gz', 'hello world\nnew one\nlast line without newline', compress=True)
+        out = self.run_command(plain, archive, batch_size=2)
+        self.assertIn('8 lines read: 4 created, 2 duplicates, 2 blank', out)
+        self.assertEqual(
+            set(AnalyzedString.objects.values_list('value', flat=True)),
+            {'racecar', 'hello world', 'new one', 'last line without newline'},
+        )
+        stored = AnalyzedString.objects.get(value='new one')
+        self.assertEqual(stored.word_count, 2)
+        self.assertTrue(StringCharacter.objects.filter(string=stored, character='w').exists())
+        self.assertEqual(self.client.get(reverse('string-stats')).json()['total_strings'], 4)
+
+    def test_offset_resumes_where_a_run_stopped(self):
+        path = self.write('a.txt', ''.join(f'line {i}\n' for i in range(10)))
+        out = self.run_command(path, offset=6, batch_size=3)
+        self.assertIn('10 lines read: 4 created', out)
+        self.assertIn('Resume with --offset 10', out)
+        self.assertEqual(sorted(AnalyzedString.objects.values_list('value', flat=True)), [f'line {i}' for i in range(6, 10)])
+
+    def test_reads_stdin(self):
+        import io
+        stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO('from stdin\nanother\n'.encode('utf-8'))))
+        with mock.patch('sys.stdin', stdin):
+            out = self.run_command('-')
+        self.assertIn('2 created', out)
+        self.assertFalse(stdin.closed)
+
+    def test_process_pool_keeps_input_order(self):
+        path = self.write('a.txt', ''.join(f'pooled {i % 7}\n' for i in range(40)))
+        out = self.run_command(path, workers=1, batch_size=4)
+        self.assertIn('40 lines read: 7 created, 33 duplicates', out)
+
+    def test_missing_file_is_an_error(self):
+        from django.core.management.base import CommandError
+        with self.assertRaises(CommandError):
+            self.run_command('/nonexistent/corpus.txt')
+
+
+class ParallelAnalysisTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.executor = ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+        super().tearDownClass()
+
+    def test_chunked_analysis_matches_serial(self):
+        rng = random.Random(11)
+        alphabet = 'ab cΣσς\t\nÉé🙂 '
+        values = ["", " ", "x", "  hello   world  ", "word " * 50]
+        values += [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 400))) for _ in range(30)]
+        for value in values:
+            for parts in (1, 3, 7):
+                with self.subTest(value=value, parts=parts):
+                    self.assertEqual(analyze_large_string(value, self.executor, parts=parts), analyze_string(value))
+                    self.assertEqual(
+                        list(analyze_large_string(value, self.executor, parts=parts)['character_frequency_map']),
+                        list(analyze_string(value)['character_frequency_map']),
+                    )
+
+    @override_settings(ANALYZER_PARALLEL_THRESHOLD=10)
+    def test_analyze_dispatches_on_threshold(self):
+        with mock.patch('analyzer.parallel.analyze_large_string', wraps=lambda value, executor: analyze_string(value)) as large:
+            parallel.analyze("short")
+            self.assertFalse(large.called)
+            parallel.analyze("long enough to be parallel")
+            self.assertTrue(large.called)
+
+    def test_pool_size_splits_the_cpus_between_web_workers(self):
+        with mock.patch('analyzer.parallel.os.cpu_count', return_value=8):
+            for web_workers, processes in [(1, 4), (2, 4), (4, 2), (8, 1), (16, 1)]:
+                with self.subTest(web_workers=web_workers), override_settings(ANALYZER_WEB_WORKERS=web_workers):
+                    self.assertEqual(parallel.pool_size(), processes)
+            with override_settings(ANALYZER_WEB_WORKERS=8, ANALYZER_PROCESS_WORKERS=3):
+                self.assertEqual(parallel.pool_size(), 3)
+
+
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        from django.test import AsyncRequestFactory
+        from .async_views import AsyncListCreateAnalyzedStringsView, AsyncNaturalLanguageFilterView, AsyncStringRetrieveDestroyView
+        self.factory = AsyncRequestFactory()
+        self.list_create = AsyncListCreateAnalyzedStringsView.as_view()
+        self.nl_filter = AsyncNaturalLanguageFilterView.as_view()
+        self.retrieve_destroy = AsyncStringRetrieveDestroyView.as_view()
+        caches[settings.ANALYZER_CACHE_ALIAS].clear()
+
+    async def create(self, value):
+        request = self.factory.post('/strings/', json.dumps({'value': value}), content_type='application/json')
+        return await self.list_create(request)
+
+    async def test_create_retrieve_and_delete(self):
+        response = await self.create('Racecar')
+        self.assertEqual(response.status_code, 201)
+        body = json.loads(response.content)
+        self.assertEqual(body['id'], hashlib.sha256('racecar'.encode()).hexdigest())
+        self.assertTrue(body['properties']['is_palindrome'])
+        self.assertTrue(await StringCharacter.objects.filter(string_id=body['id']).aexists())
+
+        response = await self.create('Racecar')
+        self.assertEqual(response.status_code, 409)
+
+        response = await self.retrieve_destroy(self.factory.get('/strings/Racecar'), value='Racecar')
+        self.assertEqual(json.loads(response.content), body)
+        response = await self.retrieve_destroy(self.factory.get('/strings/racecar'), value='racecar')
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.retrieve_destroy(self.factory.delete('/strings/Racecar'), value='Racecar')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(await AnalyzedString.objects.aexists())
+
+    @override_settings(ANALYZER_BODY_THRESHOLD=100)
+    async def test_long_values_round_trip_through_string_body(self):
+        value = 'async body ' * 20
+        response = await self.create(value)
+        self.assertEqual(json.loads(response.content)['value'], value)
+        self.assertTrue(await StringBody.objects.aexists())
+        response = await self.retrieve_destroy(self.factory.get('/strings/x'), value=value)
+        self.assertEqual(json.loads(response.content)['value'], value)
+        response = await self.list_create(self.factory.get('/strings'))
+        self.assertEqual(json.loads(response.content)['data'][0]['value'], value)
+
+    async def test_create_validation_matches_sync_views(self):
+        request = self.factory.post('/strings/', json.dumps({}), content_type='application/json')
+        self.assertEqual((await self.list_create(request)).status_code, 400)
+        request = self.factory.post('/strings/', json.dumps({'value': 5}), content_type='application/json')
+        self.assertEqual((await self.list_create(request)).status_code, 422)
+        request = self.factory.post('/strings/', json.dumps({'value': '  '}), content_type='application/json')
+        self.assertEqual((await self.list_create(request)).status_code, 422)
+
+    async def test_create_does_not_hash_for_a_disabled_bloom_filter(self):
+        with mock.patch('analyzer.bloom.is_stored') as is_stored:
+            response = await self.create('not hashed on the loop')
+        self.assertEqual(response.status_code, 201)
+        is_stored.assert_not_called()
+
+    def test_create_parses_bodies_like_sync_views(self):
+        from asgiref.sync import async_to_sync
+        from django.test.client import MULTIPART_CONTENT
+        url = reverse('create-string')
+        bodies = [
+            ('{"value": ', 'application/json'),
+            ('value=from+a+form', 'application/x-www-form-urlencoded'),
+            ({'value': 'from multipart'}, MULTIPART_CONTENT),
+            ('value', 'text/plain'),
+        ]
+        for body, content_type in bodies:
+            with self.subTest(content_type=content_type):
+                expected = self.client.post(url, body, content_type=content_type)
+                AnalyzedString.objects.all().delete()
+                request = self.factory.post(url, body, content_type=content_type)
+                response = async_to_sync(self.list_create)(request)
+                AnalyzedString.objects.all().delete()
+                self.assertEqual(response.status_code, expected.status_code)
+                body, expected = json.loads(response.content), expected.json()
+                body.pop('created_at', None)
+                expected.pop('created_at', None)
+                self.assertEqual(body, expected)
+
+    async def test_list_pages_and_filters(self):
+        for value in ('level', 'hello world', 'noon', 'abc'):
+            await self.create(value)
+        response = await self.list_create(self.factory.get('/strings', {'is_palindrome': 'true', 'limit': 1}))
+        body = json.loads(response.content)
+        self.assertEqual(body['count'], 1)
+        self.assertEqual(body['filter_applied'], {'is_palindrome': 'true'})
+        self.assertIsNotNone(body['next'])
+
+        response = await self.list_create(self.factory.get('/strings', {'bogus': '1'}))
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.nl_filter(self.factory.get('/strings/filter-by-natural-language', {'query': 'single word palindromic strings'}))
+        values = sorted(item['value'] for item in json.loads(response.content)['data'])
+        self.assertEqual(values, ['level', 'noon'])
@@ -1,9 +1,26 @@
+from django.conf import settings
 from django.urls import path
-from .views import ListCreateAnalyzedStringsView, StringRetrieveDestroyView, NaturalLanguageFilterView
+from .views import ListCreateAnalyzedStringsView, StringRetrieveDestroyView, NaturalLanguageFilterView, BulkCreateAnalyzedStringsView
+from .views import StringByHashRetrieveDestroyView, CacheStatsView, ExportAnalyzedStringsView, StringStatsView, BloomStatsView
+from .views import MetricsView
 
+if settings.ANALYZER_ASYNC_VIEWS:
+    from .async_views import AsyncListCreateAnalyzedStringsView as ListCreateAnalyzedStringsView
+    from .async_views import AsyncNaturalLanguageFilterView as NaturalLanguageFilterView
+    from .async_views import AsyncStringRetrieveDestroyView as StringRetrieveDestroyView
+
+# strings/<value> takes every single-segment path under strings/, so other endpoints
+# live outside it; only filter-by-natural-language is reserved (use by-hash/ for that value)
 urlpatterns = [
-    path('strings/', ListCreateAnalyzedStringsView.as_view(), name='list-create-strings-slash'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('stats', StringStatsView.as_view(), name='string-stats'),
+    path('bulk/strings', BulkCreateAnalyzedStringsView.as_view(), name='bulk-create-strings'),
+    path('export/strings', ExportAnalyzedStringsView.as_view(), name='export-strings'),
+    path('_ops/bloom-stats', BloomStatsView.as_view(), name='bloom-stats'),
+    path('_ops/cache-stats', CacheStatsView.as_view(), name='cache-stats'),
+    path('strings/', ListCreateAnalyzedStringsView.as_view(), name='create-string'),
     path('strings', ListCreateAnalyzedStringsView.as_view(), name='list-strings'),
     path('strings/filter-by-natural-language', NaturalLanguageFilterView.as_view(), name='nl-filter'),
+    path('strings/by-hash/<str:sha256>', StringByHashRetrieveDestroyView.as_view(), name='get-string-by-hash'),
     path('strings/<str:value>', StringRetrieveDestroyView.as_view(), name='get-string'),
-]       
\ No newline at end of file
+]
@@ -1,6 +1,10 @@
 import hashlib
-from typing import Dict, Any
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, Iterable, Iterator
 import re
+from . import metrics
 
 
 class NaturalLanguageParseError(Exception):
@@ -10,32 +14,59 @@ class NaturalLanguageParseError(Exception):
 class NaturalLanguageConflictError(Exception):
     pass
 
+def normalise_string(input_string: str) -> str:
+    return input_string.strip().replace(" ", "").lower()
+
+
+def hash_string(input_string: str) -> str:
+    """The sha256 primary key analyze_string derives for ``input_string``."""
+    return hashlib.sha256(normalise_string(input_string).encode('utf-8')).hexdigest()
+
+
 def analyze_string(input_string: str) -> Dict[str, Any]:
+    request_metrics = metrics.current()
+    if request_metrics is None:
+        return _analyze_string(input_string)
+    start = time.perf_counter()
+    result = _analyze_string(input_string)
+    request_metrics.add_analysis(len(input_string), time.perf_counter() - start)
+    return result
+
 
+def _analyze_string(input_string: str) -> Dict[str, Any]:
     raw = input_string
-    normalised = raw.strip().replace(" ", "").lower()
-    length = len(raw.strip())
-    is_palindrome = normalised == normalised[::-1]
-    unique_characters = len(set(normalised))
-    word_count = len(raw.split())
-    character_frequency_map = {}
-    for char in normalised:
-        if char in character_frequency_map:
-            character_frequency_map[char] += 1
-        else:
-            character_frequency_map[char] = 1
-    sha256_hash = hashlib.sha256(normalised.encode('utf-8')).hexdigest()
+    stripped = raw.strip()
+    normalised = stripped.replace(" ", "").lower()
+    # Counter counts in C and keeps first-occurrence order, like the dict it replaces
+    character_frequency_map = dict(Counter(normalised))
     return {
         "value": raw,
-        "length": length,
-        "is_palindrome": is_palindrome,
-        "unique_characters": unique_characters,
-        "word_count": word_count,
-        "sha256_hash": sha256_hash,
+        "length": len(stripped),
+        "is_palindrome": normalised == normalised[::-1],
+        "unique_characters": len(character_frequency_map),
+        "word_count": len(raw.split()),
+        "sha256_hash": hashlib.sha256(normalised.encode('utf-8')).hexdigest(),
         "character_frequency_map": character_frequency_map
     }
 
 
+def analyze_strings(input_strings: Iterable[str], memo_size: int = 4096) -> Iterator[Dict[str, Any]]:
+    """Yield ``analyze_string`` results for ``input_strings`` in order.
+
+    Repeated inputs (common in resubmitted batches) are analyzed once; they
+    yield the same result dict, so treat results as read-only.
+    """
+    seen: Dict[str, Dict[str, Any]] = {}
+    analyze = analyze_string
+    for input_string in input_strings:
+        result = seen.get(input_string)
+        if result is None:
+            if len(seen) >= memo_size:
+                seen.clear()
+            result = seen[input_string] = analyze(input_string)
+        yield result
+
+
 def parse_bool(value: str):
     if value.lower() in ("1", "true", "t", "yes", "y"):
         return True
@@ -50,6 +81,54 @@ def parse_int(value: str):
         raise ValueError("Invalid integer")
 
 
+# (filter, literal trigger, pattern for the text after it, value from the captured
+# text) in the order the original if-chain applied them: the first occurrence of
+# each rule counts and later rules overwrite earlier ones for the same filter
+_NL_RULES = (
+    ('word_count', 'single word', None, lambda text: 1),
+    ('word_count', 'one word', None, lambda text: 1),
+    ('word_count', 'single-word', None, lambda text: 1),
+    ('is_palindrome', 'palindrom', None, lambda text: True),
+    ('min_length', 'longer than ', r'(\d+)', lambda text: int(text) + 1),
+    ('max_length', 'shorter than ', r'(\d+)', lambda text: int(text) - 1 if int(text) > 0 else 0),
+    ('min_length', 'at least ', r'(\d+)', lambda text: int(text)),
+    ('min_length', 'more than ', r'(\d+) characters', lambda text: int(text) + 1),
+    ('contains_character', 'contain', r's(?: the)? (?:letter |char |character )?([a-z])', lambda text: text),
+    ('contains_character', 'first vowel', None, lambda text: 'a'),
+    ('contains_character', 'contain', r'ing the letter ([a-z])', lambda text: text),
+)
+
+_NL_TRIGGERS = {}
+for _index, (_, _trigger, _tail, _) in enumerate(_NL_RULES):
+    _NL_TRIGGERS.setdefault(_trigger, []).append((_index, _tail and re.compile(_tail)))
+# one scan for every trigger; each hit only tries the few rules starting with it
+_NL_TRIGGER_PATTERN = re.compile('|'.join(re.escape(trigger) for trigger in _NL_TRIGGERS))
+
+
+@lru_cache(maxsize=1024)
+def _parse_filters(q: str):
+    found = {}
+    search = _NL_TRIGGER_PATTERN.search
+    m = search(q)
+    while m is not None:
+        for index, tail in _NL_TRIGGERS[m.group()]:
+            if index in found:
+                continue
+            if tail is None:
+                found[index] = None
+            else:
+                t = tail.match(q, m.end())
+                if t:
+                    found[index] = t.group(1)
+        # resume one character on: triggers may overlap ("palindromore than 3 characters")
+        m = search(q, m.start() + 1)
+    parsed = {}
+    for index in sorted(found):
+        key, _, _, value = _NL_RULES[index]
+        parsed[key] = value(found[index])
+    return tuple(parsed.items())
+
+
 def parse_natural_language_query(query: str) -> Dict[str, Any]:
     """Very small heuristic parser that converts a natural language query into filter dict.
 
@@ -59,43 +138,8 @@ def parse_natural_language_query(query: str) -> Dict[str, Any]:
     if not query or not isinstance(query, str):
         raise NaturalLanguageParseError("Empty or invalid query")
 
-    q = query.lower()
-    parsed = {}
-
-    if 'single word' in q or 'one word' in q or 'single-word' in q:
-        parsed['word_count'] = 1
-
-    if 'palindrom' in q:  
-        parsed['is_palindrome'] = True
-
-    m = re.search(r'longer than (\d+)', q)
-    if m:
-        n = int(m.group(1))
-        parsed['min_length'] = n + 1
-
-    m = re.search(r'shorter than (\d+)', q)
-    if m:
-        n = int(m.group(1))
-        parsed['max_length'] = n - 1 if n > 0 else 0
-
-    m = re.search(r'at least (\d+)', q)
-    if m:
-        parsed['min_length'] = int(m.group(1))
-
-    m = re.search(r'more than (\d+) characters', q)
-    if m:
-        parsed['min_length'] = int(m.group(1)) + 1
-
-    m = re.search(r'contains(?: the)? (?:letter |char |character )?([a-z])', q)
-    if m:
-        parsed['contains_character'] = m.group(1)
-
-    if 'first vowel' in q:
-        parsed['contains_character'] = 'a'
-
-    m = re.search(r'containing the letter ([a-z])', q)
-    if m:
-        parsed['contains_character'] = m.group(1)
+    # parsed once per distinct lowercased query; a fresh dict per call keeps callers apart
+    parsed = dict(_parse_filters(query.lower()))
 
     if not parsed:
         raise NaturalLanguageParseError('Unable to parse natural language query')
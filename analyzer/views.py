@@ -1,13 +1,41 @@
-from django.shortcuts import render
+import csv
+import json
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils.dateparse import parse_datetime
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
 from rest_framework import status, generics
-from .serializers import AnalyzedStringSerializer
+from .serializers import AnalyzedStringSerializer, STRING_COLUMNS, RECORD_PARAMS, page_data, parse_fields, parse_layout
+from .serializers import datetime_formatter, instance_record, record_columns, string_record
 from .models import AnalyzedString
 from rest_framework import serializers
-from .utils import analyze_string , parse_bool, parse_int
+from .utils import analyze_strings, hash_string, parse_bool, parse_int
 from .utils import parse_natural_language_query, NaturalLanguageParseError, NaturalLanguageConflictError
+from .ingest import bulk_store
+from .pagination import KeysetPagination
+from .parsers import NDJSONParser
+from .renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer, PrometheusRenderer
+from .signals import strings_deleted
+from . import cache as analyzer_cache
+from . import bloom, metrics, parallel
+from . import stats as analyzer_stats
+from .conditional import add_validators, list_cache_control, list_etag, not_modified
+from .conditional import string_cache_control, string_etag
+from .frequency import json_default
 # Create your views here.
 
+# read endpoints build plain dicts (string_record) and render them with orjson when available;
+# otherwise the configured renderers (the api profile has no browsable API)
+READ_RENDERER_CLASSES = [
+    FastJSONRenderer if renderer is JSONRenderer else renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+]
+
+
 class AnalyzedStringCreateView(generics.CreateAPIView):
     serializer_class = AnalyzedStringSerializer
 
@@ -19,13 +47,6 @@ class AnalyzedStringCreateView(generics.CreateAPIView):
             return Response({'error': 'Input string cannot be empty.'}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
         serializer= self.get_serializer(data = request.data)
-        try:
-            analysis = analyze_string(raw_value) if raw_value is not None else None
-            if analysis and AnalyzedString.objects.filter(id=analysis['sha256_hash']).exists():
-                return Response({'error': 'String already exists in the system'}, status=status.HTTP_409_CONFLICT)
-        except Exception:
-            pass
-
         try:
             serializer.is_valid(raise_exception=True)
             self.perform_create(serializer)
@@ -42,11 +63,76 @@ class AnalyzedStringCreateView(generics.CreateAPIView):
             
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
-    
-class StringRetrieveDestroyView(generics.RetrieveDestroyAPIView):
+
+    def perform_create(self, serializer):
+        serializer.save(analysis=parallel.analyze(serializer.validated_data['value']))
+
+class CachedStringMixin:
+    """Read-through cache for retrieve payloads; deletes announce strings_deleted."""
+    renderer_classes = READ_RENDERER_CLASSES
+
+    def get_lookup_hash(self):
+        return self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+
+    def is_cached_match(self, payload):
+        return True
+
+    def retrieve(self, request, *args, **kwargs):
+        key = analyzer_cache.string_key(self.get_lookup_hash())
+        payload = analyzer_cache.get_cached('retrieve', key)
+        if payload is not None and self.is_cached_match(payload):
+            cache_status = 'HIT'
+            etag = string_etag(payload['id'], parse_datetime(payload['created_at']))
+        else:
+            cache_status = 'MISS'
+            instance = self.get_object()
+            etag = string_etag(instance.id, instance.created_at)
+            payload = None
+
+        cache_control = string_cache_control()
+        response = not_modified(request, etag, **cache_control)
+        if response is not None:
+            return response
+        if payload is None:
+            with metrics.serialize_timer():
+                payload = instance_record(instance)
+            analyzer_cache.set_cached(key, payload)
+        return add_validators(Response(payload, headers={'X-Cache': cache_status}), etag, **cache_control)
+
+    def perform_destroy(self, instance):
+        sha256 = instance.pk
+        with transaction.atomic():
+            instance.delete()
+            strings_deleted.send(sender=AnalyzedString, ids=[sha256], strings=[instance])
+
+
+class StringRetrieveDestroyView(CachedStringMixin, generics.RetrieveDestroyAPIView):
     serializer_class = AnalyzedStringSerializer
     lookup_field = 'value'
-    queryset = AnalyzedString.objects.all()
+    # retrieve always returns the value, so join the body of long strings in
+    queryset = AnalyzedString.objects.select_related('body')
+
+    def get_lookup_hash(self):
+        # the lookup value may be a long string; look it up by its 64-char hash instead
+        return hash_string(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+
+    def is_cached_match(self, payload):
+        return payload['value'] == self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+
+    def get_object(self):
+        obj = get_object_or_404(self.get_queryset(), pk=self.get_lookup_hash())
+        # values that normalise alike share a hash; only the exact stored value matches
+        if not self.is_cached_match({'value': obj.full_value}):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+class StringByHashRetrieveDestroyView(CachedStringMixin, generics.RetrieveDestroyAPIView):
+    serializer_class = AnalyzedStringSerializer
+    lookup_field = 'pk'
+    lookup_url_kwarg = 'sha256'
+    queryset = AnalyzedString.objects.select_related('body')
 
 class ListAnalyzedStringsView(generics.ListAPIView):
     serializer_class = AnalyzedStringSerializer
@@ -88,7 +174,7 @@ class ListAnalyzedStringsView(generics.ListAPIView):
 
         if 'contains_character' in qp:
             substring = qp['contains_character']
-            qs = qs.filter(value__icontains=substring)
+            qs = qs.containing(substring)
 
         if 'word_count' in qp:
             try:
@@ -113,8 +199,25 @@ class ListAnalyzedStringsView(generics.ListAPIView):
         })
 
 
+def apply_parsed_filters(qs, filters):
+    """Apply the filters parse_natural_language_query produced to ``qs``."""
+    if 'word_count' in filters:
+        qs = qs.filter(word_count=filters['word_count'])
+    if 'is_palindrome' in filters:
+        qs = qs.filter(is_palindrome=filters['is_palindrome'])
+    if 'min_length' in filters:
+        qs = qs.filter(length__gte=filters['min_length'])
+    if 'max_length' in filters:
+        qs = qs.filter(length__lte=filters['max_length'])
+    if 'contains_character' in filters:
+        qs = qs.containing(filters['contains_character'])
+    return qs
+
+
 class NaturalLanguageFilterView(generics.GenericAPIView):
     serializer_class = AnalyzedStringSerializer
+    renderer_classes = READ_RENDERER_CLASSES
+    pagination_class = KeysetPagination
 
     def get(self, request, *args, **kwargs):
         query = request.query_params.get('query')
@@ -124,83 +227,126 @@ class NaturalLanguageFilterView(generics.GenericAPIView):
             return Response({'error': 'Unable to parse natural language query'}, status=status.HTTP_400_BAD_REQUEST)
         except NaturalLanguageConflictError:
             return Response({'error': 'Query parsed but resulted in conflicting filters'}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        fields = parse_fields(request.query_params)
+        layout = parse_layout(request.query_params)
+        qs = apply_parsed_filters(AnalyzedString.objects.all(), interpreted['parsed_filters'])
+        page_qs = self.paginator.page_queryset(qs.values(*record_columns(fields)), request)
+
+        key = analyzer_cache.response_key('nl', request)
+        etag = list_etag(key)
+        response = not_modified(request, etag, **list_cache_control())
+        if response is not None:
+            return response
+        cached = analyzer_cache.get_cached('nl', key)
+        if cached is not None:
+            return add_validators(Response(cached, headers={'X-Cache': 'HIT'}), etag, **list_cache_control())
+
+        rows = self.paginator.finish_page(list(page_qs))
+        with metrics.serialize_timer():
+            data = page_data(rows, fields, layout)
+        payload = {
+            'data': data,
+            'count': len(rows),
+            'next': self.paginator.get_next_link(),
+            'previous': self.paginator.get_previous_link(),
+            'interpreted_query': interpreted,
+        }
+        analyzer_cache.set_cached(key, payload)
+        return add_validators(Response(payload, headers={'X-Cache': 'MISS'}), etag, **list_cache_control())
 
-        filters = interpreted['parsed_filters']
-        qs = AnalyzedString.objects.all()
+def filter_strings(qs, qp):
+    """Apply the list query-param filters to ``qs``; raises ValidationError for bad values."""
 
-        if 'word_count' in filters:
-            qs = qs.filter(word_count=filters['word_count'])
-        if 'is_palindrome' in filters:
-            qs = qs.filter(is_palindrome=filters['is_palindrome'])
-        if 'min_length' in filters:
-            qs = qs.filter(length__gte=filters['min_length'])
-        if 'max_length' in filters:
-            qs = qs.filter(length__lte=filters['max_length'])
-        if 'contains_character' in filters:
-            qs = qs.filter(value__icontains=filters['contains_character'])
+    if 'is_palindrome' in qp:
+        try:
+            is_palindrome = parse_bool(qp['is_palindrome'])
+            qs = qs.filter(is_palindrome=is_palindrome)
+        except ValueError:
+            raise serializers.ValidationError("Invalid boolean for is_palindrome")
 
-        serializer = self.get_serializer(qs, many=True)
-        return Response({
-            'data': serializer.data,
-            'count': qs.count(),
-            'interpreted_query': interpreted,
-        })
+    if 'min_length' in qp and 'max_length' in qp:
+        try:
+            min_length = parse_int(qp['min_length'])
+            max_length = parse_int(qp['max_length'])
+        except ValueError:
+            raise serializers.ValidationError("Invalid integer for min_length or max_length")
+        if min_length > max_length:
+            raise serializers.ValidationError("min_length cannot be greater than max_length")
+
+    if 'min_length' in qp:
+        try:
+            min_length = parse_int(qp['min_length'])
+            qs = qs.filter(length__gte=min_length)
+        except ValueError:
+            raise serializers.ValidationError("Invalid integer for min_length")
 
-class ListCreateAnalyzedStringsView(generics.ListCreateAPIView):
-    serializer_class = AnalyzedStringSerializer
+    if 'max_length' in qp:
+        try:
+            max_length = parse_int(qp['max_length'])
+            qs = qs.filter(length__lte=max_length)
+        except ValueError:
+            raise serializers.ValidationError("Invalid integer for max_length")
 
-    def get_queryset(self):
-        qs = AnalyzedString.objects.all()
-        qp = self.request.query_params
+    if 'contains_character' in qp:
+        substring = str(qp['contains_character'])
+        qs = qs.containing(substring)
 
-        if 'is_palindrome' in qp:
-            try:
-                is_palindrome = parse_bool(qp['is_palindrome'])
-                qs = qs.filter(is_palindrome=is_palindrome)
-            except ValueError:
-                raise serializers.ValidationError("Invalid boolean for is_palindrome")
+    if 'word_count' in qp:
+        try:
+            word_count = parse_int(qp['word_count'])
+            qs = qs.filter(word_count=word_count)
+        except ValueError:
+            raise serializers.ValidationError("Invalid integer for word_count")
 
-        if 'min_length' in qp:
-            try:
-                min_length = parse_int(qp['min_length'])
-                qs = qs.filter(length__gte=min_length)
-            except ValueError:
-                raise serializers.ValidationError("Invalid integer for min_length")
+    return qs
 
-        if 'max_length' in qp:
-            try:
-                max_length = parse_int(qp['max_length'])
-                qs = qs.filter(length__lte=max_length)
-            except ValueError:
-                raise serializers.ValidationError("Invalid integer for max_length")
 
-        if 'contains_character' in qp:
-            substring = str(qp['contains_character'])
-            qs = qs.filter(value__icontains=substring)
+class StringFilterMixin:
+    """Query-param filters shared by the list and export endpoints."""
+    filter_params = {'is_palindrome', 'min_length', 'max_length', 'contains_character', 'word_count'}
 
-        if 'word_count' in qp:
-            try:
-                word_count = parse_int(qp['word_count'])
-                qs = qs.filter(word_count=word_count)
-            except ValueError:
-                raise serializers.ValidationError("Invalid integer for word_count")
+    def get_queryset(self):
+        return filter_strings(AnalyzedString.objects.all(), self.request.query_params)
 
-        return qs
+
+class ListCreateAnalyzedStringsView(StringFilterMixin, generics.ListCreateAPIView):
+    serializer_class = AnalyzedStringSerializer
+    renderer_classes = READ_RENDERER_CLASSES
+    pagination_class = KeysetPagination
 
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
-        serializer = self.get_serializer(qs, many=True)
         # validate no unexpected query params
-        allowed = {'is_palindrome', 'min_length', 'max_length', 'contains_character', 'word_count'}
+        allowed = self.filter_params
         for val in request.query_params:
-            if val not in allowed:
+            if val not in allowed and val not in KeysetPagination.query_params and val not in RECORD_PARAMS:
                 return Response({'error': f'Invalid filter parameter: {val}'}, status=status.HTTP_400_BAD_REQUEST)
-        applied = {k: request.query_params[k] for k in request.query_params}
-        return Response({
-            "data": serializer.data,
-            "count": qs.count(),
+        # filters, fields, layout, cursor and limit are all checked here, before any query runs
+        fields = parse_fields(request.query_params)
+        layout = parse_layout(request.query_params)
+        page_qs = self.paginator.page_queryset(self.get_queryset().values(*record_columns(fields)), request)
+
+        key = analyzer_cache.response_key('list', request)
+        etag = list_etag(key)
+        response = not_modified(request, etag, **list_cache_control())
+        if response is not None:
+            return response
+        cached = analyzer_cache.get_cached('list', key)
+        if cached is not None:
+            return add_validators(Response(cached, headers={'X-Cache': 'HIT'}), etag, **list_cache_control())
+
+        rows = self.paginator.finish_page(list(page_qs))
+        with metrics.serialize_timer():
+            data = page_data(rows, fields, layout)
+        applied = {k: request.query_params[k] for k in request.query_params if k in allowed}
+        payload = {
+            "data": data,
+            "count": len(rows),
+            "next": self.paginator.get_next_link(),
+            "previous": self.paginator.get_previous_link(),
             "filter_applied": applied
-        })
+        }
+        analyzer_cache.set_cached(key, payload)
+        return add_validators(Response(payload, headers={'X-Cache': 'MISS'}), etag, **list_cache_control())
 
     def create(self, request, *args, **kwargs):
         # simple pre-validation on raw payload to return the exact error codes/messages you prefer
@@ -211,14 +357,9 @@ class ListCreateAnalyzedStringsView(generics.ListCreateAPIView):
             return Response({'error': 'Input must be a string.'}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
         if isinstance(raw_value, str) and raw_value.strip() == '':
             return Response({'error': 'Input string cannot be empty.'}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
-
-        # pre-check duplicate by hashing the raw input so we can return 409 before attempting save
-        try:
-            analysis = analyze_string(raw_value)
-            if AnalyzedString.objects.filter(id=analysis['sha256_hash']).exists():
-                return Response({'error': 'String already exists in the system'}, status=status.HTTP_409_CONFLICT)
-        except Exception:
-            pass
+        # resubmitted values are answered before analysis when the Bloom filter is on
+        if bloom.is_stored(raw_value):
+            return Response({'error': 'String already exists in the system'}, status=status.HTTP_409_CONFLICT)
 
         serializer = self.get_serializer(data=request.data)
         try:
@@ -234,6 +375,158 @@ class ListCreateAnalyzedStringsView(generics.ListCreateAPIView):
                 return Response({'error': 'Input string cannot be empty.'}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
             return Response({'error': detail_str}, status=status.HTTP_400_BAD_REQUEST)
 
-        headers = self.get_success_headers(serializer.data)
-        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+        with metrics.serialize_timer():
+            data = serializer.data
+        headers = self.get_success_headers(data)
+        return Response(data, status=status.HTTP_201_CREATED, headers=headers)
+
+    def perform_create(self, serializer):
+        # analyze once and hand the result to the serializer; duplicates surface
+        # as an IntegrityError on the single INSERT and are mapped to 409 above
+        serializer.save(analysis=parallel.analyze(serializer.validated_data['value']))
+
+
+class BulkCreateAnalyzedStringsView(generics.GenericAPIView):
+    """Analyze and store a batch of strings sent as a JSON array or NDJSON body.
+
+    Items may be plain strings or ``{"value": ...}`` objects. The response has one
+    result per input item, in order, with status ``created``, ``duplicate`` or ``invalid``.
+    """
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'error': 'Expected a JSON array or NDJSON body of values'}, status=status.HTTP_400_BAD_REQUEST)
+        max_items = settings.ANALYZER_BULK_MAX_ITEMS
+        if len(items) > max_items:
+            return Response({'error': f'Batch exceeds the maximum of {max_items} items'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        values = []
+        for index, item in enumerate(items):
+            value = item.get('value') if isinstance(item, dict) else item
+            if not isinstance(value, str):
+                results.append({'index': index, 'status': 'invalid', 'error': 'Input must be a string.'})
+            elif value.strip() == '':
+                results.append({'index': index, 'status': 'invalid', 'error': 'Input string cannot be empty.'})
+            else:
+                values.append(value)
+                results.append({'index': index, 'status': None})
+
+        analyses = list(analyze_strings(values))
+        pending = (result for result in results if result['status'] is None)
+        for result, analysis in zip(pending, analyses):
+            result['id'] = analysis['sha256_hash']
+
+        created = bulk_store(analyses)
+        claimed = set()
+        for result in results:
+            if result['status'] is None:
+                # only the first item with a given hash can be the one that was inserted
+                is_new = result['id'] in created and result['id'] not in claimed
+                claimed.add(result['id'])
+                result['status'] = 'created' if is_new else 'duplicate'
+
+        statuses = [result['status'] for result in results]
+        return Response({
+            'created': statuses.count('created'),
+            'duplicates': statuses.count('duplicate'),
+            'invalid': statuses.count('invalid'),
+            'results': results,
+        })
 
+
+class CacheStatsView(generics.GenericAPIView):
+    """Hit/miss counters of the response cache in this worker process."""
+
+    def get(self, request, *args, **kwargs):
+        return Response({
+            'backend': analyzer_cache.get_cache().__class__.__name__,
+            'counters': analyzer_cache.stats(),
+        })
+
+
+class BloomStatsView(generics.GenericAPIView):
+    """Counters and sizing of the duplicate-check Bloom filter in this worker process."""
+
+    def get(self, request, *args, **kwargs):
+        return Response(bloom.stats())
+
+
+class MetricsView(generics.GenericAPIView):
+    """Request, database, analysis and serialization metrics of this worker for Prometheus."""
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request, *args, **kwargs):
+        return Response(metrics.exposition())
+
+
+class StringStatsView(generics.GenericAPIView):
+    """Aggregates over every stored string, read from the StatCounter summary table."""
+
+    def get(self, request, *args, **kwargs):
+        return Response(analyzer_stats.summary())
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+class ExportAnalyzedStringsView(StringFilterMixin, generics.GenericAPIView):
+    """Stream every matching string as NDJSON (default) or CSV.
+
+    Rows come from a server-side ``.iterator()`` cursor and are written as they
+    are read, so memory stays flat whatever the table size.
+    """
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    csv_header = ['id', 'value', 'created_at', 'length', 'is_palindrome', 'unique_characters', 'word_count', 'character_frequency_map']
+
+    def get(self, request, *args, **kwargs):
+        for val in request.query_params:
+            if val not in self.filter_params and val != 'format':
+                return Response({'error': f'Invalid filter parameter: {val}'}, status=status.HTTP_400_BAD_REQUEST)
+        rows = (
+            self.get_queryset()
+            .order_by('created_at', 'id')
+            .values(*STRING_COLUMNS)
+            .iterator(chunk_size=settings.ANALYZER_EXPORT_CHUNK_SIZE)
+        )
+        export_format = request.accepted_renderer.format
+        lines = self.csv_lines(rows) if export_format == 'csv' else self.ndjson_lines(rows)
+        response = StreamingHttpResponse(self.batched(lines), content_type=request.accepted_renderer.media_type)
+        response['Content-Disposition'] = f'attachment; filename="strings.{export_format}"'
+        return response
+
+    def ndjson_lines(self, rows):
+        format_datetime = datetime_formatter()
+        for row in rows:
+            record = string_record(row, format_datetime=format_datetime)
+            yield json.dumps(record, ensure_ascii=False, default=json_default) + '\n'
+
+    def csv_lines(self, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(self.csv_header)
+        format_datetime = datetime_formatter()
+        for row in rows:
+            record = string_record(row, format_datetime=format_datetime)
+            properties = record['properties']
+            yield writer.writerow([
+                record['id'], record['value'], record['created_at'], properties['length'],
+                properties['is_palindrome'], properties['unique_characters'], properties['word_count'],
+                json.dumps(properties['character_frequency_map'], ensure_ascii=False, default=json_default),
+            ])
+
+    def batched(self, lines):
+        # one write per chunk rather than per row
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= settings.ANALYZER_EXPORT_CHUNK_SIZE:
+                yield ''.join(batch)
+                batch = []
+        if batch:
+            yield ''.join(batch)
@@ -0,0 +1,63 @@
+"""Microbenchmark of analyze_string / analyze_strings against the original loop.
+
+    python -m benchmarks.bench_analyze
+"""
+import argparse
+import hashlib
+import timeit
+
+from analyzer.utils import analyze_string, analyze_strings
+
+
+def original_analyze_string(input_string):
+    raw = input_string
+    normalised = raw.strip().replace(" ", "").lower()
+    length = len(raw.strip())
+    is_palindrome = normalised == normalised[::-1]
+    unique_characters = len(set(normalised))
+    word_count = len(raw.split())
+    character_frequency_map = {}
+    for char in normalised:
+        if char in character_frequency_map:
+            character_frequency_map[char] += 1
+        else:
+            character_frequency_map[char] = 1
+    sha256_hash = hashlib.sha256(normalised.encode('utf-8')).hexdigest()
+    return {
+        "value": raw,
+        "length": length,
+        "is_palindrome": is_palindrome,
+        "unique_characters": unique_characters,
+        "word_count": word_count,
+        "sha256_hash": sha256_hash,
+        "character_frequency_map": character_frequency_map
+    }
+
+
+INPUTS = {
+    'short': 'Race car',
+    'sentence': 'A man a plan a canal Panama ' * 4,
+    'long': 'the quick brown fox jumps over the lazy dog ' * 2000,
+    'non-ascii': 'Καλημέρα κόσμε, привет мир, 你好世界 🙂 ' * 200,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=0, help='calls per timing (default: auto)')
+    args = parser.parse_args()
+
+    for name, value in INPUTS.items():
+        number = args.number or max(10, 200_000 // max(len(value), 1))
+        old = min(timeit.repeat(lambda: original_analyze_string(value), number=number, repeat=5)) / number
+        new = min(timeit.repeat(lambda: analyze_string(value), number=number, repeat=5)) / number
+        print(f'{name:>10} ({len(value)} chars): original {old * 1e6:9.1f}us  new {new * 1e6:9.1f}us  ({old / new:.1f}x)')
+
+    batch = [f'batch value {i % 500}' for i in range(5000)]
+    old = min(timeit.repeat(lambda: [original_analyze_string(v) for v in batch], number=5, repeat=3)) / 5
+    new = min(timeit.repeat(lambda: list(analyze_strings(batch)), number=5, repeat=3)) / 5
+    print(f'batch of {len(batch)} (10% distinct): original {old * 1e3:.1f}ms  analyze_strings {new * 1e3:.1f}ms  ({old / new:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Ingest throughput of ``manage.py analyze_file`` on a gzip file of synthetic strings.
+
+    python -m benchmarks.bench_analyze_file --lines 200000 --workers 0 2
+"""
+import argparse
+import gzip
+import os
+import tempfile
+import time
+from io import StringIO
+
+from .common import setup_django, teardown_django
+from .run import synthetic_value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 2])
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'corpus.txt.gz')
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for index in range(args.lines):
+            f.write(synthetic_value(index) + '\n')
+
+    old_name = setup_django()
+    try:
+        from django.core.management import call_command
+
+        for workers in args.workers:
+            # start empty, so every run inserts every line
+            call_command('flush', interactive=False, verbosity=0)
+            start = time.perf_counter()
+            out = StringIO()
+            call_command('analyze_file', path, workers=workers, progress_every=3600, stdout=out)
+            elapsed = time.perf_counter() - start
+            print(f'workers={workers}: {args.lines / elapsed:.0f} lines/s ({elapsed:.1f}s)  {out.getvalue().strip()}')
+    finally:
+        teardown_django(old_name)
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
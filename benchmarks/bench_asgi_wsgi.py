@@ -0,0 +1,126 @@
+"""Throughput of the sync (gunicorn/WSGI) and async (uvicorn/ASGI) request paths.
+
+    python -m benchmarks.bench_asgi_wsgi --clients 32 --requests 100
+
+Starts each server on a fresh, migrated SQLite file, seeds it, then drives a
+mixed read/write load (list pages, single lookups, creates) from ``--clients``
+concurrent connections. Needs gunicorn, uvicorn and uvicorn-worker installed.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
+
+from .common import ROOT, report
+
+SERVERS = {
+    'wsgi': ['-m', 'gunicorn', 'string_analyzer.wsgi:application', '--threads', '8'],
+    'asgi': ['-m', 'gunicorn', 'string_analyzer.asgi:application', '-k', 'uvicorn_worker.UvicornWorker'],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_env(db_path, asgi):
+    env = dict(os.environ, SECRET_KEY='benchmark', DEBUG='1', SQLITE_PATH=db_path)
+    env['ANALYZER_ASYNC_VIEWS'] = '1' if asgi else '0'
+    return env
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def client(port, requests, seeded, latencies, statuses, lock):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    local_latencies, local_statuses = [], []
+    for i in range(requests):
+        kind = i % 4
+        start = time.perf_counter()
+        if kind == 0:
+            conn.request('POST', '/strings/', json.dumps({'value': f'bench {uuid.uuid4()}'}), {'Content-Type': 'application/json'})
+        elif kind == 1:
+            conn.request('GET', '/strings/' + urllib.parse.quote(seeded[i % len(seeded)]))
+        else:
+            conn.request('GET', '/strings?is_palindrome=false&limit=20')
+        response = conn.getresponse()
+        response.read()
+        local_latencies.append(time.perf_counter() - start)
+        local_statuses.append(response.status)
+    conn.close()
+    with lock:
+        latencies.extend(local_latencies)
+        statuses.extend(local_statuses)
+
+
+def run(name, args):
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    env = server_env(db_path, asgi=name == 'asgi')
+    subprocess.run([sys.executable, 'manage.py', 'migrate', '-v', '0'], cwd=ROOT, env=env, check=True)
+
+    port = free_port()
+    command = [sys.executable, *SERVERS[name], '--bind', f'127.0.0.1:{port}', '--workers', str(args.workers), '--log-level', 'warning']
+    server = subprocess.Popen(command, cwd=ROOT, env=env)
+    try:
+        wait_for(port)
+        seeded = [f'seed value {i}' for i in range(args.seed)]
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        for value in seeded:
+            conn.request('POST', '/strings/', json.dumps({'value': value}), {'Content-Type': 'application/json'})
+            conn.getresponse().read()
+        conn.close()
+
+        latencies, statuses, lock = [], [], threading.Lock()
+        threads = [
+            threading.Thread(target=client, args=(port, args.requests, seeded, latencies, statuses, lock))
+            for _ in range(args.clients)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        ok = sum(1 for status in statuses if status < 400)
+        report(f'{name} x{args.clients} clients', latencies, ok=ok, errors=len(statuses) - ok, rps=f'{len(latencies) / elapsed:.0f}')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=100, help='requests per client')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=200, help='strings stored before the run')
+    parser.add_argument('--only', choices=sorted(SERVERS))
+    args = parser.parse_args()
+
+    for name in SERVERS:
+        if args.only in (None, name):
+            run(name, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Rows/sec of POST /bulk/strings against one POST /strings/ per value.
+
+    python -m benchmarks.bench_bulk --rows 5000 --batch 1000
+"""
+import argparse
+import json
+import time
+import uuid
+
+from .common import setup_django, teardown_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    old_name = setup_django()
+    try:
+        from django.test import Client
+
+        client = Client()
+        run = uuid.uuid4().hex
+
+        start = time.perf_counter()
+        for i in range(args.rows):
+            client.post('/strings/', {'value': f'single {run} {i}'}, content_type='application/json')
+        single_rate = args.rows / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for offset in range(0, args.rows, args.batch):
+            values = [f'bulk {run} {i}' for i in range(offset, min(offset + args.batch, args.rows))]
+            client.post('/bulk/strings', json.dumps(values), content_type='application/json')
+        bulk_rate = args.rows / (time.perf_counter() - start)
+
+        print(f'single: {single_rate:.0f} rows/s')
+        print(f'bulk (batch={args.batch}): {bulk_rate:.0f} rows/s ({bulk_rate / single_rate:.1f}x)')
+    finally:
+        teardown_django(old_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Request latency with and without persistent database connections.
+
+    python -m benchmarks.bench_connections --requests 500
+    DEBUG=0 PGDATABASE_NAME=scratch ... python -m benchmarks.bench_connections --pool
+
+Runs gunicorn (one sync worker) once with DB_CONN_MAX_AGE=0, which opens a new
+connection per request, and once with persistent connections, then times
+sequential GET /strings/<value> requests. Uses SQLite unless DEBUG=0 and the
+PGDATABASE_* variables point at a throwaway PostgreSQL database (it is migrated
+and written to). ``--pool`` adds a run with DB_POOL=1 (PostgreSQL + psycopg 3).
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+
+from .bench_asgi_wsgi import free_port, wait_for
+from .common import ROOT, report
+
+
+def run(name, env, args):
+    port = free_port()
+    command = [
+        sys.executable, '-m', 'gunicorn', 'string_analyzer.wsgi:application',
+        '--bind', f'127.0.0.1:{port}', '--workers', '1', '--log-level', 'warning',
+    ]
+    server = subprocess.Popen(command, cwd=ROOT, env=env)
+    try:
+        wait_for(port)
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        value = f'connection bench {name}'
+        conn.request('POST', '/strings/', json.dumps({'value': value}), {'Content-Type': 'application/json'})
+        conn.getresponse().read()
+        path = '/strings/' + urllib.parse.quote(value)
+        latencies = []
+        for _ in range(args.warmup + args.requests):
+            start = time.perf_counter()
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+        conn.close()
+        report(name, latencies[args.warmup:], status=response.status)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--pool', action='store_true', help='also run with the psycopg 3 pool')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'benchmark')
+    env.setdefault('DEBUG', '1')
+    # the response cache would hide the database round trip
+    env['ANALYZER_CACHE_URL'] = 'dummycache://'
+    if env['DEBUG'] in ('1', 'true', 'True'):
+        env['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    subprocess.run([sys.executable, 'manage.py', 'migrate', '-v', '0'], cwd=ROOT, env=env, check=True)
+
+    variants = [
+        ('new connection per request', {'DB_CONN_MAX_AGE': '0'}),
+        ('persistent connection', {'DB_CONN_MAX_AGE': '600'}),
+    ]
+    if args.pool:
+        variants.append(('psycopg pool', {'DB_POOL': '1'}))
+    for name, overrides in variants:
+        run(name, {**env, **overrides}, args)
+
+
+if __name__ == '__main__':
+    main()
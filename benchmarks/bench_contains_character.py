@@ -0,0 +1,66 @@
+"""contains_character through the StringCharacter index against value__icontains.
+
+    python -m benchmarks.bench_contains_character --rows 50000
+"""
+import argparse
+import random
+import string
+import time
+
+from .common import report, setup_django, teardown_django
+
+
+def seed(rows, batch=2000):
+    from analyzer.ingest import bulk_store
+    from analyzer.utils import analyze_string
+
+    alphabet = string.ascii_lowercase + '     '
+    for start in range(0, rows, batch):
+        values = [
+            ''.join(random.choices(alphabet, k=random.randint(20, 200))) + f' {i}'
+            for i in range(start, min(start + batch, rows))
+        ]
+        bulk_store([analyze_string(v) for v in values])
+
+
+def timed(queryset, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(queryset.values_list('id', flat=True))
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    old_name = setup_django()
+    try:
+        from analyzer.models import AnalyzedString
+
+        from django.db import connection
+
+        seed(args.rows)
+        # give the planner statistics, as autovacuum would on PostgreSQL
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        qs = AnalyzedString.objects.all()
+        # 'q' is in most rows, ';' in none: the index wins most on selective characters
+        for char in ('q', ';'):
+            ilike = qs.filter(value__icontains=char)
+            indexed = qs.containing(char)
+            for name, query in (('icontains', ilike), ('index', indexed)):
+                report(f'{name} {char!r} all rows', timed(query, args.repeat))
+            for name, query in (('icontains', ilike), ('index', indexed)):
+                page = query.order_by('created_at', 'id')[:100]
+                report(f'{name} {char!r} first page', timed(page, args.repeat))
+    finally:
+        teardown_django(old_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Queries and latency per POST /strings/ under concurrent writers.
+
+    python -m benchmarks.bench_create --writers 8 --requests 200 --duplicates 0.2
+"""
+import argparse
+import random
+import threading
+import time
+import uuid
+
+from .common import report, setup_django, teardown_django
+
+
+def count_queries_per_create(client):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        client.post('/strings/', {'value': f'query count {uuid.uuid4()}'}, content_type='application/json')
+    statements = [query['sql'].split(None, 1)[0].upper() for query in ctx.captured_queries]
+    return {verb: statements.count(verb) for verb in sorted(set(statements))}
+
+
+def writer(values, latencies, statuses, lock):
+    from django.db import connection
+    from django.test import Client
+
+    client = Client()
+    local_latencies, local_statuses = [], []
+    for value in values:
+        start = time.perf_counter()
+        response = client.post('/strings/', {'value': value}, content_type='application/json')
+        local_latencies.append(time.perf_counter() - start)
+        local_statuses.append(response.status_code)
+    connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        statuses.extend(local_statuses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help='requests per writer')
+    parser.add_argument('--duplicates', type=float, default=0.1, help='share of resubmitted values')
+    args = parser.parse_args()
+
+    old_name = setup_django()
+    try:
+        from django.test import Client
+
+        print(f'statements per create: {count_queries_per_create(Client())}')
+
+        pool = [f'shared value {i}' for i in range(max(1, args.requests // 10))]
+        latencies, statuses, lock = [], [], threading.Lock()
+        threads = []
+        for w in range(args.writers):
+            values = [
+                random.choice(pool) if random.random() < args.duplicates else f'writer {w} value {i} {uuid.uuid4()}'
+                for i in range(args.requests)
+            ]
+            threads.append(threading.Thread(target=writer, args=(values, latencies, statuses, lock)))
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        report(
+            f'create x{args.writers} writers', latencies,
+            created=statuses.count(201), conflicts=statuses.count(409),
+            errors=len(statuses) - statuses.count(201) - statuses.count(409),
+            rps=f'{len(latencies) / elapsed:.0f}',
+        )
+    finally:
+        teardown_django(old_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Peak memory and throughput of GET /export/strings over a large table.
+
+    python -m benchmarks.bench_export --rows 1000000 --format ndjson
+"""
+import argparse
+import resource
+import time
+import tracemalloc
+
+from .common import setup_django, teardown_django
+
+
+def seed(rows, batch=5000):
+    from analyzer.ingest import bulk_store
+    from analyzer.utils import analyze_string
+
+    for start in range(0, rows, batch):
+        bulk_store(
+            [analyze_string(f'export row {i} with some padding text') for i in range(start, min(start + batch, rows))],
+            chunk_size=batch,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    args = parser.parse_args()
+
+    old_name = setup_django()
+    try:
+        from django.test import Client
+
+        seed(args.rows)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = Client().get('/export/strings', {'format': args.format})
+        size = 0
+        for chunk in response.streaming_content:
+            size += len(chunk)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        print(
+            f'exported {args.rows} rows ({size / 1e6:.1f} MB {args.format}) in {elapsed:.1f}s '
+            f'({args.rows / elapsed:.0f} rows/s); python peak {peak / 1e6:.1f} MB; '
+            f'max RSS {rss_before / 1024:.0f} -> {rss_after / 1024:.0f} MB'
+        )
+    finally:
+        teardown_django(old_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Storage and read latency of JSON vs packed character_frequency_map columns.
+
+    python -m benchmarks.bench_frequency_map --rows 50000
+
+Seeds ``--rows`` strings with JSON maps and measures the map column's size, the
+database size (SQLite, after VACUUM), the time to fetch and render a 1000-row
+list page, and a full ``rebuild_stats`` scan. It then runs
+``manage.py pack_frequency_maps`` and measures again.
+"""
+import argparse
+import time
+from io import StringIO
+
+from .common import percentile, setup_django, teardown_django
+from .run import seed
+
+
+def column_bytes(connection, column):
+    from analyzer.models import AnalyzedString
+
+    table = connection.ops.quote_name(AnalyzedString._meta.db_table)
+    column = connection.ops.quote_name(column)
+    size = f'pg_column_size({column})' if connection.vendor == 'postgresql' else f'LENGTH(CAST({column} AS BLOB))'
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COALESCE(SUM({size}), 0) FROM {table}')
+        return cursor.fetchone()[0]
+
+
+def database_bytes(connection):
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('VACUUM')
+        cursor.execute('PRAGMA page_count')
+        pages = cursor.fetchone()[0]
+        cursor.execute('PRAGMA page_size')
+        return pages * cursor.fetchone()[0]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentile(samples, 50)
+
+
+def measure(args):
+    from django.core.management import call_command
+    from django.db import connection
+    from analyzer.models import AnalyzedString
+    from analyzer.renderers import FastJSONRenderer
+    from analyzer.serializers import STRING_COLUMNS, page_data
+
+    qs = AnalyzedString.objects.order_by('created_at', 'id').values(*STRING_COLUMNS)
+    renderer = FastJSONRenderer()
+    return {
+        'map bytes': column_bytes(connection, 'character_frequency_map')
+        + column_bytes(connection, 'character_frequency_packed'),
+        'db bytes': database_bytes(connection),
+        'fetch 1000 rows ms': timed(lambda: list(qs[:1000]), args.repeat) * 1000,
+        'fetch+render 1000 rows ms': timed(
+            lambda: renderer.render({'data': page_data(list(qs[:1000]))}), args.repeat,
+        ) * 1000,
+        'rebuild_stats ms': timed(lambda: call_command('rebuild_stats', stdout=StringIO()), 3) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    old_name = setup_django()
+    try:
+        from django.core.management import call_command
+
+        seed(args.rows)
+        json_results = measure(args)
+        start = time.perf_counter()
+        call_command('pack_frequency_maps', batch_size=2000, stdout=StringIO())
+        print(f'pack_frequency_maps: {time.perf_counter() - start:.1f}s for {args.rows} rows')
+        packed_results = measure(args)
+        for name, before in json_results.items():
+            after = packed_results[name]
+            if before is None:
+                continue
+            print(f'{name:>26}: json={before:12.1f} packed={after:12.1f} ({(after / before - 1) * 100:+.0f}%)')
+    finally:
+        teardown_django(old_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Payload size and latency of a full list page under ?fields=, ?exclude= and ?layout=columnar.
+
+    python -m benchmarks.bench_list_payload --rows 1000
+"""
+import argparse
+import random
+import string
+import time
+
+from .common import report, setup_django, teardown_django
+
+VARIANTS = {
+    'full': {},
+    'exclude map': {'exclude': 'character_frequency_map'},
+    'id,value': {'fields': 'id,value'},
+    'columnar': {'layout': 'columnar'},
+    'columnar id,value': {'layout': 'columnar', 'fields': 'id,value'},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000, help='strings stored (and page size)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    old_name = setup_django()
+    try:
+        from django.conf import settings
+        from django.test import Client
+        from analyzer.cache import get_cache
+        from analyzer.ingest import bulk_store
+        from analyzer.utils import analyze_strings
+
+        settings.ANALYZER_MAX_PAGE_SIZE = max(settings.ANALYZER_MAX_PAGE_SIZE, args.rows)
+        rng = random.Random(1)
+        alphabet = string.ascii_letters + '      '
+        bulk_store(analyze_strings(''.join(rng.choice(alphabet) for _ in range(80)) for _ in range(args.rows)))
+
+        client = Client()
+        for name, params in VARIANTS.items():
+            latencies = []
+            for _ in range(args.repeat):
+                # measure the database and serialization work, not the response cache
+                get_cache().clear()
+                start = time.perf_counter()
+                response = client.get('/strings', {'limit': args.rows, **params})
+                latencies.append(time.perf_counter() - start)
+            report(name, latencies, bytes=len(response.content))
+    finally:
+        teardown_django(old_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Per-request cost of the metrics middleware and its hooks.
+
+    python -m benchmarks.bench_metrics --requests 2000
+
+Times GET /strings/<value> and GET /strings?limit=20 through the test client
+with ANALYZER_METRICS_ENABLED off and on, each in a fresh interpreter. The
+response cache is disabled so every request reaches the database, analysis and
+serialization hooks. ``--json`` prints the raw numbers.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .common import ROOT
+
+ENDPOINTS = {
+    'retrieve': '/strings/metrics%20bench%200',
+    'list': '/strings?limit=20',
+}
+
+
+def measure(requests):
+    from .common import setup_django, teardown_django
+
+    old_name = setup_django()
+    try:
+        from django.test import Client
+        from analyzer.utils import analyze_string
+        from analyzer.ingest import bulk_store
+
+        bulk_store([analyze_string(f'metrics bench {i}') for i in range(100)])
+        client = Client(HTTP_HOST='localhost')
+        results = {}
+        for name, path in ENDPOINTS.items():
+            for _ in range(50):
+                client.get(path)
+            start = time.perf_counter()
+            for _ in range(requests):
+                client.get(path)
+            results[name] = (time.perf_counter() - start) / requests * 1e6
+        return results
+    finally:
+        teardown_django(old_name)
+
+
+def run(enabled, requests):
+    env = dict(os.environ, ANALYZER_METRICS_ENABLED='1' if enabled else '0', ANALYZER_CACHE_URL='dummycache://')
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_metrics', '--child', '--requests', str(requests)],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.requests)))
+        return
+    results = {'off': run(False, args.requests), 'on': run(True, args.requests)}
+    if args.json:
+        print(json.dumps(results))
+        return
+    for name in ENDPOINTS:
+        off, on = results['off'][name], results['on'][name]
+        print(f'{name:>8}: off={off:.0f}us on={on:.0f}us overhead={on - off:+.0f}us ({(on / off - 1) * 100:+.1f}%)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Microbenchmark of the natural-language parser against the original if-chain.
+
+    python -m benchmarks.bench_nl_parser
+"""
+import argparse
+import re
+import timeit
+
+from analyzer.utils import _parse_filters, parse_natural_language_query
+
+
+def original_parse(query):
+    q = query.lower()
+    parsed = {}
+    if 'single word' in q or 'one word' in q or 'single-word' in q:
+        parsed['word_count'] = 1
+    if 'palindrom' in q:
+        parsed['is_palindrome'] = True
+    m = re.search(r'longer than (\d+)', q)
+    if m:
+        parsed['min_length'] = int(m.group(1)) + 1
+    m = re.search(r'shorter than (\d+)', q)
+    if m:
+        n = int(m.group(1))
+        parsed['max_length'] = n - 1 if n > 0 else 0
+    m = re.search(r'at least (\d+)', q)
+    if m:
+        parsed['min_length'] = int(m.group(1))
+    m = re.search(r'more than (\d+) characters', q)
+    if m:
+        parsed['min_length'] = int(m.group(1)) + 1
+    m = re.search(r'contains(?: the)? (?:letter |char |character )?([a-z])', q)
+    if m:
+        parsed['contains_character'] = m.group(1)
+    if 'first vowel' in q:
+        parsed['contains_character'] = 'a'
+    m = re.search(r'containing the letter ([a-z])', q)
+    if m:
+        parsed['contains_character'] = m.group(1)
+    return {'original': query, 'parsed_filters': parsed}
+
+
+QUERIES = [
+    'all single word palindromic strings',
+    'strings longer than 10 characters',
+    'palindromic strings that contain the first vowel',
+    'strings containing the letter z',
+    'one word strings at least 3 characters long that are shorter than 20',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    def run(parse):
+        for query in QUERIES:
+            parse(query)
+
+    def uncached(query):
+        _parse_filters.cache_clear()
+        return parse_natural_language_query(query)
+
+    old = min(timeit.repeat(lambda: run(original_parse), number=args.number, repeat=5))
+    cold = min(timeit.repeat(lambda: run(uncached), number=args.number, repeat=5))
+    warm = min(timeit.repeat(lambda: run(parse_natural_language_query), number=args.number, repeat=5))
+    per_query = args.number * len(QUERIES)
+    print(f'original    {old / per_query * 1e6:6.2f}us/query')
+    print(f'single pass {cold / per_query * 1e6:6.2f}us/query ({old / cold:.1f}x, cache cleared each call)')
+    print(f'cached      {warm / per_query * 1e6:6.2f}us/query ({old / warm:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
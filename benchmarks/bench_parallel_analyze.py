@@ -0,0 +1,52 @@
+"""Throughput of analyze_large_string against input size with 1, 2, 4 and 8 workers.
+
+    python -m benchmarks.bench_parallel_analyze --sizes 1 4 16
+"""
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from analyzer.parallel import analyze_large_string
+from analyzer.utils import analyze_string
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=float, nargs='+', default=[0.25, 1, 4, 16], help='input sizes in MB')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    executors = {
+        n: ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context('spawn'))
+        for n in args.workers
+    }
+    try:
+        for executor in executors.values():
+            # pay process start-up before timing
+            analyze_large_string('warm up the pool', executor)
+        for size in args.sizes:
+            value = ('Lorem ipsum dolor sit amet, Ünïcødé 🙂 ' * int(size * 1_000_000 // 40 + 1))[:int(size * 1_000_000)]
+            serial = best_of(lambda: analyze_string(value), args.repeat)
+            line = [f'{size:>6g} MB  serial {size / serial:7.1f} MB/s']
+            for workers, executor in executors.items():
+                elapsed = best_of(lambda: analyze_large_string(value, executor), args.repeat)
+                line.append(f'{workers}w {size / elapsed:7.1f} MB/s')
+            print('  '.join(line))
+    finally:
+        for executor in executors.values():
+            executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
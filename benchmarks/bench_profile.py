@@ -0,0 +1,86 @@
+"""Worker boot time and per-request overhead of the default and DJANGO_PROFILE=api settings.
+
+    python -m benchmarks.bench_profile --requests 2000
+
+Each profile is measured in a fresh interpreter. Boot covers django.setup(),
+loading the URLconf and building the middleware chain, as a gunicorn worker does;
+requests go to GET /_ops/cache-stats, which touches no database, so the
+timings are framework overhead only. ``--json`` prints the raw numbers.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from .common import ROOT
+
+PROFILES = ('full', 'api')
+
+
+def measure(requests):
+    import time
+
+    start = time.perf_counter()
+    import django
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.urls import get_resolver
+
+    django.setup()
+    get_resolver().url_patterns
+    WSGIHandler()
+    boot = time.perf_counter() - start
+
+    from django.test import Client
+
+    client = Client(HTTP_HOST='localhost')
+    response = client.get('/_ops/cache-stats')
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/_ops/cache-stats')
+    per_request = (time.perf_counter() - start) / requests
+    return {
+        'boot_ms': boot * 1000,
+        'request_us': per_request * 1e6,
+        'modules': len(sys.modules),
+        'middleware': len(settings.MIDDLEWARE),
+        'status': response.status_code,
+        'headers': sorted(response.headers),
+    }
+
+
+def run_profile(profile, requests):
+    env = dict(os.environ, DJANGO_PROFILE=profile, DJANGO_SETTINGS_MODULE='string_analyzer.settings')
+    env.setdefault('SECRET_KEY', 'benchmark')
+    env.setdefault('DEBUG', '1')
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_profile', '--child', '--requests', str(requests)],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.requests)))
+        return
+    results = {profile: run_profile(profile, args.requests) for profile in PROFILES}
+    if args.json:
+        print(json.dumps(results))
+        return
+    for profile, result in results.items():
+        print(
+            f"{profile:>4}: boot={result['boot_ms']:.0f}ms request={result['request_us']:.0f}us "
+            f"modules={result['modules']} middleware={result['middleware']}"
+        )
+
+
+if __name__ == '__main__':
+    main()
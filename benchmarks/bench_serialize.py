@@ -0,0 +1,63 @@
+"""Serialize stored strings with AnalyzedStringSerializer + JSONRenderer (old read path)
+and with .values() + page_data + FastJSONRenderer (new read path).
+
+    python -m benchmarks.bench_serialize --rows 10000 100000
+"""
+import argparse
+import random
+import string
+import time
+
+from .common import setup_django, teardown_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    old_name = setup_django()
+    try:
+        from rest_framework.renderers import JSONRenderer
+        from analyzer.ingest import bulk_store
+        from analyzer.models import AnalyzedString
+        from analyzer.renderers import FastJSONRenderer, orjson
+        from analyzer.serializers import AnalyzedStringSerializer, STRING_COLUMNS, page_data
+        from analyzer.utils import analyze_strings
+
+        rng = random.Random(3)
+        alphabet = string.ascii_letters + 'éü      '
+        stored = 0
+        for rows in sorted(args.rows):
+            values = (''.join(rng.choice(alphabet) for _ in range(rng.randint(5, 60))) for _ in range(rows - stored))
+            bulk_store(analyze_strings(values))
+            stored = AnalyzedString.objects.count()
+            qs = AnalyzedString.objects.order_by('created_at', 'id')[:rows]
+
+            def old():
+                return JSONRenderer().render(AnalyzedStringSerializer(list(qs.all()), many=True).data)
+
+            def new():
+                return FastJSONRenderer().render(page_data(qs.values(*STRING_COLUMNS)))
+
+            timings = {}
+            for name, fn in (('old', old), ('new', new)):
+                samples = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    body = fn()
+                    samples.append(time.perf_counter() - start)
+                timings[name] = (min(samples), body)
+            (old_time, old_body), (new_time, new_body) = timings['old'], timings['new']
+            print(
+                f'{rows} rows: ModelSerializer+JSONRenderer {old_time * 1000:.0f}ms  '
+                f'values+page_data+{"orjson" if orjson else "json"} {new_time * 1000:.0f}ms  '
+                f'({old_time / new_time:.1f}x) identical={old_body == new_body} bytes={len(new_body)}'
+            )
+    finally:
+        teardown_django(old_name)
+
+
+if __name__ == '__main__':
+    main()
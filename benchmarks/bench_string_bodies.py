@@ -0,0 +1,146 @@
+"""Filter scans on a mixed-size corpus with long values inline vs in StringBody.
+
+    python -m benchmarks.bench_string_bodies --rows 20000 --large-share 0.1
+
+Seeds ``--rows`` strings, ``--large-share`` of them ``--large-min``..``--large-max``
+characters long and the rest short, all stored inline. It times filters that
+read the metadata columns of every row (also on a new connection, whose page
+cache is empty), list pages with and without ``value`` and ``rebuild_stats``,
+and sizes the pages a table scan reads. Then it runs
+``manage.py move_string_bodies --threshold`` and measures again.
+"""
+import argparse
+import os
+import random
+import time
+from io import StringIO
+
+from .common import percentile, setup_django, teardown_django
+from .run import WORDS, synthetic_value
+
+BATCH = 2000
+
+
+def corpus_value(index, args):
+    rng = random.Random(-index - 1)
+    value = synthetic_value(index)
+    if rng.random() >= args.large_share:
+        return value
+    target = rng.randint(args.large_min, args.large_max)
+    words = []
+    size = len(value)
+    while size < target:
+        words.append(rng.choice(WORDS))
+        size += len(words[-1]) + 1
+    return ' '.join(words) + ' ' + value
+
+
+def seed(args):
+    from analyzer.ingest import bulk_store
+    from analyzer.utils import analyze_strings
+
+    for start in range(0, args.rows, BATCH):
+        values = (corpus_value(index, args) for index in range(start, min(args.rows, start + BATCH)))
+        bulk_store(analyze_strings(values))
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentile(samples, 50)
+
+
+def get(client, params):
+    def request():
+        response = client.get('/strings', params)
+        assert response.status_code == 200, response.status_code
+    return request
+
+
+def table_bytes(connection):
+    """Size of the pages a scan of the strings table reads, without overflow or TOAST pages."""
+    from analyzer.models import AnalyzedString
+
+    table = AnalyzedString._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_relation_size(%s)', [table])
+        elif connection.vendor == 'sqlite':
+            # needs SQLite built with the dbstat table, as most are
+            cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = %s AND pagetype != 'overflow'", [table])
+        else:
+            return None
+        return cursor.fetchone()[0]
+
+
+def cold(connection, fn):
+    """``fn`` on a new connection, so the database's own page cache starts empty."""
+    def run():
+        connection.close()
+        fn()
+    return run
+
+
+def measure(args, client):
+    from django.core.management import call_command
+    from django.db import connection
+    from analyzer.models import AnalyzedString
+
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM')
+    strings = AnalyzedString.objects.all()
+
+    def scan():
+        strings.filter(unique_characters__gte=20).count()
+    cases = {
+        'scan unique_characters>=20': scan,
+        'scan, new connection': cold(connection, scan),
+        'scan word_count, length>100': lambda: strings.filter(word_count__gte=3, length__gt=100).count(),
+        'list page, metadata only': get(client, {'limit': 100, 'fields': 'id,length,word_count,is_palindrome'}),
+        'list page, length>1000': get(client, {'limit': 100, 'min_length': 1000}),
+        'list page, with value': get(client, {'limit': 100}),
+    }
+    results = {name: timed(fn, args.repeat) * 1000 for name, fn in cases.items()}
+    results['rebuild_stats'] = timed(lambda: call_command('rebuild_stats', stdout=StringIO()), 3) * 1000
+    results['table kB'] = (table_bytes(connection) or 0) / 1024
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--large-share', type=float, default=0.1)
+    parser.add_argument('--large-min', type=int, default=2_000)
+    parser.add_argument('--large-max', type=int, default=50_000)
+    parser.add_argument('--threshold', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    # time the queries, not the response cache
+    os.environ['ANALYZER_CACHE_URL'] = 'dummycache://'
+
+    old_name = setup_django()
+    try:
+        from django.core.management import call_command
+        from django.test import Client
+
+        client = Client(HTTP_HOST='localhost')
+        seed(args)
+        inline = measure(args, client)
+        start = time.perf_counter()
+        call_command('move_string_bodies', threshold=args.threshold, batch_size=500, stdout=StringIO())
+        print(f'move_string_bodies: {time.perf_counter() - start:.1f}s')
+        split = measure(args, client)
+        print(f'{args.rows} rows, {args.large_share:.0%} of {args.large_min}-{args.large_max} characters')
+        for name, before in inline.items():
+            after = split[name]
+            print(f'{name:>28}: inline={before:9.2f} body={after:9.2f} ({before / after if after else 0:.1f}x)')
+    finally:
+        teardown_django(old_name)
+
+
+if __name__ == '__main__':
+    main()
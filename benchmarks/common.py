@@ -0,0 +1,69 @@
+"""Shared helpers for the benchmark scripts.
+
+Run the scripts from the repository root, e.g. ``python -m benchmarks.bench_create``.
+They create a throwaway test database (an SQLite file, or ``test_<name>`` on
+PostgreSQL when ``DEBUG=0`` and the ``PGDATABASE_*`` variables are set) and
+destroy it when done.
+"""
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django(keepdb_path=None):
+    """Configure Django and create the benchmark database. Returns the old db name.
+
+    With ``keepdb_path`` (SQLite only) the database lives in that file and is
+    reused by later runs instead of being recreated.
+    """
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'string_analyzer.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ.setdefault('DEBUG', '1')
+
+    import django
+    from django.conf import settings
+
+    db = settings.DATABASES['default']
+    if db['ENGINE'].endswith('sqlite3'):
+        # a file (not the shared in-memory db) so concurrent writers get real locking
+        db.setdefault('TEST', {})['NAME'] = keepdb_path or os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+        db.setdefault('OPTIONS', {})['timeout'] = 30
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    # 4xx responses (e.g. 409 on duplicates) are expected and would flood the output
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    return connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=bool(keepdb_path))
+
+
+def teardown_django(old_name, keepdb=False):
+    from django.db import connection
+
+    connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples`` (pct in 0-100)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def report(name, samples, **extra):
+    """Print p50/p99 (in ms) for a list of latencies in seconds."""
+    fields = ' '.join(f'{key}={value}' for key, value in extra.items())
+    print(
+        f'{name}: n={len(samples)} '
+        f'p50={percentile(samples, 50) * 1000:.2f}ms '
+        f'p99={percentile(samples, 99) * 1000:.2f}ms {fields}'.rstrip()
+    )
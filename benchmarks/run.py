@@ -0,0 +1,311 @@
+"""Benchmark suite: seed a synthetic corpus, time every hot path, compare with a baseline.
+
+    python -m benchmarks.run --rows 10000 --output results.json
+    python -m benchmarks.run --rows 10000 --output results.json --baseline baseline.json
+    python -m benchmarks.run --rows 1000000 --keepdb /tmp/bench-1m.sqlite3 --only list,nl
+
+Seeds the throwaway database with ``--rows`` synthetic strings (a deterministic
+mix of single words, sentences and palindromes), then measures, through the
+Django test client with the response cache disabled:
+
+- ``analyze/*``: analyze_string on short, sentence and long inputs
+- ``serialize/*``: page_data and rendering of a 1000-row page
+- ``list/*``: GET /strings with every combination of the five filters
+- ``nl/*``: GET /strings/filter-by-natural-language for a set of queries
+- ``retrieve``, ``create``, ``delete``: single-string GET, POST and DELETE
+
+Each case reports p50/p99/mean seconds per operation. With ``--baseline`` the
+p50 of every case is compared with the baseline's and the command exits with
+status 1 when any case is more than ``--threshold`` slower, so CI can fail on
+regressions. Compare runs made on the same machine with the same ``--rows``.
+``--keepdb`` keeps the seeded database (an SQLite file, or ``test_<name>`` on
+PostgreSQL) for the next run; seeding then only tops it up to ``--rows``.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import time
+
+from .common import ROOT, percentile, setup_django, teardown_django
+
+GROUPS = ('analyze', 'serialize', 'list', 'nl', 'retrieve', 'create', 'delete')
+SEED_BATCH = 10_000
+SERIALIZE_ROWS = 1000
+PAGE_SIZE = 100
+LIST_FILTERS = {
+    'is_palindrome': 'true',
+    'min_length': '10',
+    'max_length': '60',
+    'contains_character': 'z',
+    'word_count': '3',
+}
+NL_QUERIES = (
+    'all single word palindromic strings',
+    'strings longer than 10 characters',
+    'strings containing the letter z',
+    'palindromic strings that contain the first vowel',
+    'strings at least 5 characters long and shorter than 40 characters',
+)
+ANALYZE_INPUTS = {
+    'short': ('racecar', 2000),
+    'sentence': ('The quick brown fox jumps over the lazy dog near the riverbank at dawn, ' * 2, 500),
+    'long': ('lorem ipsum dolor sit amet ' * 400, 20),
+}
+WORDS = (
+    'alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike november '
+    'oscar papa quebec romeo sierra tango uniform victor whiskey xray yankee zulu level radar '
+    'kayak civic noon refer rotor stats tenet madam'
+).split()
+
+
+def synthetic_value(index):
+    """The ``index``-th string of the corpus; the base-36 index keeps every value distinct."""
+    rng = random.Random(index)
+    tag = ''
+    n = index
+    while True:
+        n, digit = divmod(n, 36)
+        tag += string.digits[digit] if digit < 10 else string.ascii_lowercase[digit - 10]
+        if not n:
+            break
+    kind = rng.random()
+    if kind < 0.05:
+        half = tag + ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 8)))
+        return half + rng.choice(('', 'x')) + half[::-1]
+    if kind < 0.35:
+        return rng.choice(WORDS) + tag
+    return ' '.join([*rng.choices(WORDS, k=rng.randint(1, 11)), tag])
+
+
+def seed(rows):
+    from analyzer.ingest import bulk_store
+    from analyzer.models import AnalyzedString
+    from analyzer.utils import analyze_strings
+
+    stored = AnalyzedString.objects.count()
+    start = time.perf_counter()
+    for batch_start in range(stored, rows, SEED_BATCH):
+        batch_end = min(rows, batch_start + SEED_BATCH)
+        bulk_store(analyze_strings(synthetic_value(index) for index in range(batch_start, batch_end)))
+        rate = (batch_end - stored) / (time.perf_counter() - start)
+        print(f'seeded {batch_end}/{rows} ({rate:.0f} rows/s)', file=sys.stderr)
+    return AnalyzedString.objects.count()
+
+
+def summarise(samples, per=1):
+    samples = [sample / per for sample in samples]
+    return {
+        'p50': percentile(samples, 50),
+        'p99': percentile(samples, 99),
+        'mean': sum(samples) / len(samples),
+        'n': len(samples),
+    }
+
+
+def measure(fn, repeat, warmup, per=1):
+    """Time ``fn`` ``repeat`` times after ``warmup`` calls; each call does ``per`` operations."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarise(samples, per)
+
+
+def get(client, path, params=None):
+    def request():
+        response = client.get(path, params or {})
+        assert response.status_code == 200, (path, params, response.status_code)
+    return request
+
+
+def bench_analyze(args):
+    from analyzer.utils import analyze_string
+
+    for name, (value, loops) in ANALYZE_INPUTS.items():
+        def run(value=value, loops=loops):
+            for _ in range(loops):
+                analyze_string(value)
+        yield f'analyze/{name}', measure(run, args.repeat, args.warmup, per=loops)
+
+
+def bench_serialize(args):
+    from analyzer.models import AnalyzedString
+    from analyzer.renderers import FastJSONRenderer
+    from analyzer.serializers import STRING_COLUMNS, page_data
+
+    rows = list(AnalyzedString.objects.order_by('created_at', 'id').values(*STRING_COLUMNS)[:SERIALIZE_ROWS])
+    renderer = FastJSONRenderer()
+    yield 'serialize/page_data', measure(lambda: page_data(rows), args.repeat, args.warmup)
+    yield 'serialize/render', measure(lambda: renderer.render({'data': page_data(rows)}), args.repeat, args.warmup)
+
+
+def bench_list(args, client):
+    names = list(LIST_FILTERS)
+    for size in range(len(names) + 1):
+        for combination in itertools.combinations(names, size):
+            params = {'limit': PAGE_SIZE, **{name: LIST_FILTERS[name] for name in combination}}
+            name = 'list/' + ('+'.join(combination) or 'unfiltered')
+            yield name, measure(get(client, '/strings', params), args.repeat, args.warmup)
+
+
+def bench_nl(args, client):
+    for query in NL_QUERIES:
+        params = {'query': query, 'limit': PAGE_SIZE}
+        name = 'nl/' + query.replace(' ', '_')
+        yield name, measure(get(client, '/strings/filter-by-natural-language', params), args.repeat, args.warmup)
+
+
+def bench_retrieve(args, client):
+    from urllib.parse import quote
+    from analyzer.models import AnalyzedString
+
+    values = list(AnalyzedString.objects.order_by('pk').values_list('value', flat=True)[:max(1, args.repeat)])
+    paths = itertools.cycle('/strings/' + quote(value) for value in values)
+    yield 'retrieve', measure(lambda: get(client, next(paths))(), args.repeat, args.warmup)
+
+
+def bench_write(args, client, groups):
+    from urllib.parse import quote
+
+    count = args.warmup + args.repeat
+    values = [f'benchmark write {index} {time.time_ns()}' for index in range(count)]
+    created = iter(values)
+
+    def create():
+        response = client.post('/strings/', {'value': next(created)}, content_type='application/json')
+        assert response.status_code == 201, response.status_code
+    result = measure(create, args.repeat, args.warmup)
+    if 'create' in groups:
+        yield 'create', result
+
+    deleted = iter(values)
+
+    def delete():
+        response = client.delete('/strings/' + quote(next(deleted)))
+        assert response.status_code == 204, response.status_code
+    # deleting everything we created keeps a --keepdb corpus at --rows
+    result = measure(delete, args.repeat, args.warmup)
+    if 'delete' in groups:
+        yield 'delete', result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args, groups):
+    import django
+    from django.db import connection
+    from django.test import Client
+
+    rows = seed(args.rows)
+    client = Client(HTTP_HOST='localhost')
+    results = {}
+    benches = {
+        'analyze': lambda: bench_analyze(args),
+        'serialize': lambda: bench_serialize(args),
+        'list': lambda: bench_list(args, client),
+        'nl': lambda: bench_nl(args, client),
+        'retrieve': lambda: bench_retrieve(args, client),
+    }
+    for group, bench in benches.items():
+        if group in groups:
+            for name, result in bench():
+                results[name] = result
+                print(format_row(name, result), file=sys.stderr)
+    if {'create', 'delete'} & groups:
+        for name, result in bench_write(args, client, groups):
+            results[name] = result
+            print(format_row(name, result), file=sys.stderr)
+    return {
+        'meta': {
+            'rows': rows,
+            'repeat': args.repeat,
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """(name, baseline p50, current p50, ratio, regressed) for every case in both runs."""
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = result['p50'] / base['p50'] if base['p50'] else 1.0
+        rows.append((name, base['p50'], result['p50'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def format_row(name, result):
+    return f"{name:<70} p50={result['p50'] * 1000:9.3f}ms p99={result['p99'] * 1000:9.3f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000, help='strings in the seeded corpus')
+    parser.add_argument('--repeat', type=int, default=30, help='timed iterations per case')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', help=f'comma-separated groups to run (default all: {",".join(GROUPS)})')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='results JSON to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed p50 slowdown (default 0.25 = 25%%)')
+    parser.add_argument('--keepdb', metavar='PATH', help='reuse (and keep) the seeded database; SQLite file path')
+    args = parser.parse_args()
+
+    groups = set(args.only.split(',')) if args.only else set(GROUPS)
+    unknown = groups - set(GROUPS)
+    if unknown:
+        parser.error(f'unknown groups: {", ".join(sorted(unknown))}')
+    # measure the database and serialization work, not the response cache
+    os.environ['ANALYZER_CACHE_URL'] = 'dummycache://'
+
+    old_name = setup_django(keepdb_path=args.keepdb)
+    try:
+        current = run(args, groups)
+    finally:
+        teardown_django(old_name, keepdb=bool(args.keepdb))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    if not args.baseline:
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['meta'].get('rows') != current['meta']['rows']:
+        print(f"warning: baseline has {baseline['meta'].get('rows')} rows, this run {current['meta']['rows']}")
+    regressions = 0
+    for name, base, new, ratio, regressed in compare(baseline, current, args.threshold):
+        regressions += regressed
+        flag = '  REGRESSION' if regressed else ''
+        print(f'{name:<70} {base * 1000:9.3f}ms -> {new * 1000:9.3f}ms ({(ratio - 1) * 100:+6.1f}%){flag}')
+    if regressions:
+        print(f'{regressions} case(s) more than {args.threshold:.0%} slower than the baseline')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
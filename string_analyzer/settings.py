@@ -76,6 +76,22 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# DJANGO_PROFILE=api trims the stack for a deployment that only serves the stateless
+# JSON API: no admin, sessions or messages apps, no session/CSRF/auth/messages/
+# clickjacking middleware and no browsable API.
+DJANGO_PROFILE = env('DJANGO_PROFILE', default='full')
+if DJANGO_PROFILE == 'api':
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS
+        if app not in ("django.contrib.admin", "django.contrib.sessions", "django.contrib.messages")
+    ]
+    MIDDLEWARE = [
+        "django.middleware.security.SecurityMiddleware",
+        "whitenoise.middleware.WhiteNoiseMiddleware",
+        "corsheaders.middleware.CorsMiddleware",
+        "django.middleware.common.CommonMiddleware",
+    ]
+
 ROOT_URLCONF = "string_analyzer.urls"
 
 TEMPLATES = [
@@ -88,6 +104,8 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+            ] if DJANGO_PROFILE != 'api' else [
+                "django.template.context_processors.request",
             ],
         },
     },
@@ -99,7 +117,29 @@ WSGI_APPLICATION = "string_analyzer.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection reuse: keep connections open for DB_CONN_MAX_AGE seconds (0 closes them
+# after every request) and ping them before reuse. The async views run their ORM
+# calls on changing threads, each of which would keep a connection of its own open,
+# so they close them by default (use DB_POOL to reuse connections there).
+DB_CONN_MAX_AGE = env.int(
+    'DB_CONN_MAX_AGE', default=0 if env.bool('ANALYZER_ASYNC_VIEWS', default=False) else 60,
+)
+DB_CONN_HEALTH_CHECKS = env.bool('DB_CONN_HEALTH_CHECKS', default=True)
+
 if not DEBUG:
+    # DB_POOL uses Django's psycopg 3 connection pool (needs ``psycopg[pool]``) instead of
+    # persistent connections; the two cannot be combined.
+    DB_POOL = env.bool('DB_POOL', default=False)
+    DB_STATEMENT_TIMEOUT = env.int('DB_STATEMENT_TIMEOUT', default=0)  # milliseconds, 0 = no limit
+    pg_options = {}
+    if DB_STATEMENT_TIMEOUT:
+        pg_options['options'] = f'-c statement_timeout={DB_STATEMENT_TIMEOUT}'
+    if DB_POOL:
+        pg_options['pool'] = {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            'timeout': env.int('DB_POOL_TIMEOUT', default=10),
+        }
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.postgresql',
@@ -108,13 +148,18 @@ if not DEBUG:
             'PASSWORD': env('PGDATABASE_PASSWORD'),
             'HOST': env('PGDATABASE_HOST'),
             'PORT': env('PGDATABASE_PORT'),
+            'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+            'OPTIONS': pg_options,
         }
     }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'NAME': env('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
         }
     }
 
@@ -165,6 +210,14 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
+if DJANGO_PROFILE == 'api':
+    REST_FRAMEWORK.update({
+        'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+        # no session/basic auth: request.user stays None instead of touching django.contrib.auth
+        'DEFAULT_AUTHENTICATION_CLASSES': [],
+        'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+        'UNAUTHENTICATED_USER': None,
+    })
 
 SPECTACULAR_SETTINGS = {
     'TITLE': 'HNG stage 1 String Analyzer API',
@@ -183,4 +236,54 @@ CSRF_TRUSTED_ORIGINS = [
     "http://127.0.0.1:8000",
     "https://rita-mary-stringanalyzer.up.railway.app"
 ]
-APPEND_SLASH = False
\ No newline at end of file
+APPEND_SLASH = False
+
+# Analyzer tuning
+ANALYZER_BULK_MAX_ITEMS = env.int('ANALYZER_BULK_MAX_ITEMS', default=10000)
+ANALYZER_BULK_CHUNK_SIZE = env.int('ANALYZER_BULK_CHUNK_SIZE', default=500)
+# values this long (chars) are analyzed in a process pool on POST /strings/; 0 disables it
+ANALYZER_PARALLEL_THRESHOLD = env.int('ANALYZER_PARALLEL_THRESHOLD', default=1_000_000)
+# pool processes per web worker; 0: the worker's share of the CPUs (see parallel.pool_size)
+ANALYZER_PROCESS_WORKERS = env.int('ANALYZER_PROCESS_WORKERS', default=0)
+# web worker processes per host, each with its own pool; gunicorn reads the same variable
+ANALYZER_WEB_WORKERS = env.int('WEB_CONCURRENCY', default=1)
+# per-worker Bloom filter of stored ids, consulted by POST /strings/ before analysis
+ANALYZER_BLOOM_ENABLED = env.bool('ANALYZER_BLOOM_ENABLED', default=False)
+ANALYZER_BLOOM_ERROR_RATE = env.float('ANALYZER_BLOOM_ERROR_RATE', default=0.01)
+ANALYZER_BLOOM_MAX_BYTES = env.int('ANALYZER_BLOOM_MAX_BYTES', default=16 * 1024 * 1024)
+ANALYZER_BLOOM_MIN_CAPACITY = env.int('ANALYZER_BLOOM_MIN_CAPACITY', default=100_000)
+# deleted ids stay in the filter (as false positives) until this many deletes trigger a rebuild
+ANALYZER_BLOOM_REBUILD_AFTER_DELETES = env.int('ANALYZER_BLOOM_REBUILD_AFTER_DELETES', default=1000)
+# StatCounter rows per counter; concurrent writers pick one at random (see analyzer.stats)
+ANALYZER_STAT_SHARDS = env.int('ANALYZER_STAT_SHARDS', default=16)
+# store character_frequency_map packed (analyzer.frequency) instead of as a JSON object
+ANALYZER_PACKED_FREQUENCY_MAPS = env.bool('ANALYZER_PACKED_FREQUENCY_MAPS', default=False)
+# values longer than this many characters go to the StringBody side table (0: keep every value inline)
+ANALYZER_BODY_THRESHOLD = env.int('ANALYZER_BODY_THRESHOLD', default=0)
+# serve list/create, retrieve/destroy and NL-filter from the async views (run under ASGI)
+ANALYZER_ASYNC_VIEWS = env.bool('ANALYZER_ASYNC_VIEWS', default=False)
+ANALYZER_EXPORT_CHUNK_SIZE = env.int('ANALYZER_EXPORT_CHUNK_SIZE', default=2000)
+ANALYZER_PAGE_SIZE = env.int('ANALYZER_PAGE_SIZE', default=100)
+ANALYZER_MAX_PAGE_SIZE = env.int('ANALYZER_MAX_PAGE_SIZE', default=1000)
+# Cache-Control max-age (seconds) for single string responses; lists always revalidate
+ANALYZER_HTTP_MAX_AGE = env.int('ANALYZER_HTTP_MAX_AGE', default=60)
+# per-worker request metrics served at /metrics; Server-Timing response headers are opt-in
+ANALYZER_METRICS_ENABLED = env.bool('ANALYZER_METRICS_ENABLED', default=True)
+ANALYZER_SERVER_TIMING = env.bool('ANALYZER_SERVER_TIMING', default=False)
+if ANALYZER_METRICS_ENABLED:
+    # first, so its timings cover the rest of the middleware
+    MIDDLEWARE = ["analyzer.middleware.metrics_middleware", *MIDDLEWARE]
+
+# Response cache for retrieve/list/NL payloads. locmem (per process, LRU) by default;
+# set ANALYZER_CACHE_URL to redis://... or filecache://... to share it between workers
+ANALYZER_CACHE_ALIAS = 'analyzer'
+ANALYZER_CACHE = env.cache_url('ANALYZER_CACHE_URL', default='locmemcache://analyzer')
+ANALYZER_CACHE['TIMEOUT'] = env.int('ANALYZER_CACHE_TIMEOUT', default=300)
+if ANALYZER_CACHE['BACKEND'].endswith(('LocMemCache', 'FileBasedCache')):
+    # Redis evicts by its own maxmemory-policy (use allkeys-lru)
+    ANALYZER_CACHE.setdefault('OPTIONS', {})['MAX_ENTRIES'] = env.int('ANALYZER_CACHE_MAX_ENTRIES', default=10000)
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    ANALYZER_CACHE_ALIAS: ANALYZER_CACHE,
+}